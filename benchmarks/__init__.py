@@ -0,0 +1,3 @@
+"""
+Benchmark suite: synthetic data, a local json-server stand-in and timed runs
+"""
@@ -0,0 +1,232 @@
+"""
+Synthetic data generator for db.json-shaped benchmark datasets
+
+Users and categories are drawn from a Zipf-like distribution, so a few
+users write most posts and a few categories hold most of them, as in real
+feeds. Output is deterministic for a given seed.
+"""
+
+import argparse
+import itertools
+import json
+import random
+from typing import Dict, Any, Iterator, List, Optional
+
+CATEGORY_NAMES = [
+    "Technology", "Health", "Education", "Travel", "Food", "Finance",
+    "Sports", "Music", "Science", "Art", "Gaming", "Politics"
+]
+TITLE_WORDS = [
+    "Getting", "Started", "Python", "Healthy", "Living", "Tips", "Data",
+    "Science", "Web", "Development", "Best", "Practices", "Guide", "Deep",
+    "Dive", "Notes", "Lessons", "Learned", "Introduction", "Advanced"
+]
+SKEW = 1.1
+BATCH_SIZE = 10000
+
+
+def _zipf_weights(count: int, skew: float) -> List[float]:
+    """Cumulative weights of ranks 1..count proportional to 1 / rank**skew"""
+    return list(itertools.accumulate(1.0 / rank ** skew for rank in range(1, count + 1)))
+
+
+def generate_users(count: int) -> List[Dict[str, Any]]:
+    """
+    Generate users
+
+    Args:
+        count: Number of users
+
+    Returns:
+        List of user dictionaries
+    """
+    return [
+        {"id": str(i), "name": f"User {i}", "email": f"user{i}@example.com"}
+        for i in range(1, count + 1)
+    ]
+
+
+def generate_categories(count: int) -> List[Dict[str, Any]]:
+    """
+    Generate categories
+
+    Args:
+        count: Number of categories
+
+    Returns:
+        List of category dictionaries
+    """
+    return [
+        {"id": str(i), "name": CATEGORY_NAMES[i - 1] if i <= len(CATEGORY_NAMES) else f"Category {i}"}
+        for i in range(1, count + 1)
+    ]
+
+
+def iter_posts(
+    count: int,
+    users: int,
+    categories: int,
+    skew: float = SKEW,
+    seed: int = 0
+) -> Iterator[Dict[str, Any]]:
+    """
+    Generate posts one at a time
+
+    Args:
+        count: Number of posts
+        users: Number of users posts are spread over
+        categories: Number of categories posts are spread over
+        skew: Zipf exponent of the user and category distributions
+        seed: Random seed
+
+    Yields:
+        Post dictionaries
+    """
+    rng = random.Random(seed)
+    user_weights = _zipf_weights(users, skew)
+    category_weights = _zipf_weights(categories, skew)
+    names = [c["name"] for c in generate_categories(categories)]
+    user_ids = range(1, users + 1)
+
+    post_id = 1
+    while post_id <= count:
+        size = min(BATCH_SIZE, count - post_id + 1)
+        authors = rng.choices(user_ids, cum_weights=user_weights, k=size)
+        topics = rng.choices(names, cum_weights=category_weights, k=size)
+        for author, topic in zip(authors, topics):
+            views = int(rng.lognormvariate(6, 1.2))
+            yield {
+                "id": str(post_id),
+                "user_id": str(author),
+                "title": " ".join(rng.sample(TITLE_WORDS, rng.randint(2, 6))),
+                "likes": int(views * rng.betavariate(2, 20)),
+                "views": views,
+                "category": topic
+            }
+            post_id += 1
+
+
+def iter_comments(count: int, posts: int, skew: float = SKEW, seed: int = 1) -> Iterator[Dict[str, Any]]:
+    """
+    Generate comments, concentrated on a few popular posts
+
+    Args:
+        count: Number of comments
+        posts: Number of posts comments are spread over
+        skew: Zipf exponent of the post distribution
+        seed: Random seed
+
+    Yields:
+        Comment dictionaries
+    """
+    if not posts:
+        return
+    rng = random.Random(seed)
+    post_weights = _zipf_weights(posts, skew)
+    post_ids = range(1, posts + 1)
+
+    comment_id = 1
+    while comment_id <= count:
+        size = min(BATCH_SIZE, count - comment_id + 1)
+        for post_id in rng.choices(post_ids, cum_weights=post_weights, k=size):
+            yield {
+                "id": str(comment_id),
+                "post_id": str(post_id),
+                "author": f"Reader {rng.randint(1, 1000)}",
+                "content": " ".join(rng.choices(TITLE_WORDS, k=rng.randint(3, 12)))
+            }
+            comment_id += 1
+
+
+def _scale(posts: int, users: Optional[int], categories: Optional[int], comments: Optional[int]) -> tuple:
+    """Fill in dataset dimensions that follow from the post count"""
+    users = users if users is not None else max(10, posts // 100)
+    categories = categories if categories is not None else len(CATEGORY_NAMES)
+    comments = comments if comments is not None else posts
+    return users, categories, comments
+
+
+def generate_db(
+    posts: int = 1000,
+    users: Optional[int] = None,
+    categories: Optional[int] = None,
+    comments: Optional[int] = None,
+    skew: float = SKEW,
+    seed: int = 0
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Generate a db.json-shaped dataset in memory
+
+    Args:
+        posts: Number of posts
+        users: Number of users (default: posts / 100, at least 10)
+        categories: Number of categories (default: 12)
+        comments: Number of comments (default: one per post)
+        skew: Zipf exponent of the user, category and comment distributions
+        seed: Random seed
+
+    Returns:
+        Dictionary with users, posts, categories and comments
+    """
+    users, categories, comments = _scale(posts, users, categories, comments)
+    return {
+        "users": generate_users(users),
+        "posts": list(iter_posts(posts, users, categories, skew, seed)),
+        "categories": generate_categories(categories),
+        "comments": list(iter_comments(comments, posts, skew, seed + 1))
+    }
+
+
+def write_db(
+    path: str,
+    posts: int = 1000,
+    users: Optional[int] = None,
+    categories: Optional[int] = None,
+    comments: Optional[int] = None,
+    skew: float = SKEW,
+    seed: int = 0
+):
+    """
+    Write a db.json-shaped dataset, streaming posts and comments
+
+    Memory stays flat, so this scales to 10^7 posts. The file can be served
+    by json-server or by benchmarks.server.
+
+    Args:
+        path: Output JSON file
+        posts: Number of posts
+        users: Number of users (default: posts / 100, at least 10)
+        categories: Number of categories (default: 12)
+        comments: Number of comments (default: one per post)
+        skew: Zipf exponent of the user, category and comment distributions
+        seed: Random seed
+    """
+    users, categories, comments = _scale(posts, users, categories, comments)
+    collections = {
+        "users": iter(generate_users(users)),
+        "posts": iter_posts(posts, users, categories, skew, seed),
+        "categories": iter(generate_categories(categories)),
+        "comments": iter_comments(comments, posts, skew, seed + 1)
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("{")
+        for index, (name, items) in enumerate(collections.items()):
+            f.write(f'{"," if index else ""}\n  "{name}": [')
+            for position, item in enumerate(items):
+                f.write(f'{"," if position else ""}\n    {json.dumps(item)}')
+            f.write("\n  ]")
+        f.write("\n}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic db.json")
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--users", type=int)
+    parser.add_argument("--categories", type=int)
+    parser.add_argument("--comments", type=int)
+    parser.add_argument("--skew", type=float, default=SKEW)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="benchmarks/db.json")
+    args = parser.parse_args()
+    write_db(args.output, args.posts, args.users, args.categories, args.comments, args.skew, args.seed)
+    print(f"Dataset saved: {args.output}")
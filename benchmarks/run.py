@@ -0,0 +1,390 @@
+"""
+Benchmark runner for the public functions of api_client, analyzer and dashboard
+
+Each benchmark is timed over several runs against a StubServer serving a
+synthetic dataset, then run once more under tracemalloc for peak memory.
+Results are written as JSON so runs can be compared across commits:
+
+    python -m benchmarks.run --posts 100000 --output before.json
+    python -m benchmarks.run --posts 100000 --baseline before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Dict, Any, Callable, List, NamedTuple, Optional
+
+from benchmarks.generate import generate_db
+from benchmarks.server import StubServer
+from src import analyzer, api_client, dashboard
+from src.aggregation import aggregate_posts
+from src.records import PostTable
+
+REPEAT = 5
+WARMUP = 1
+RESULTS_DIR = "benchmarks/results"
+JSON_CHUNK_SIZE = 64 * 1024
+BULK_REPORTS = 1000
+BULK_COMMENTS = 100
+
+
+class Benchmark(NamedTuple):
+    """A timed call and the number of items it processes per run"""
+    name: str
+    func: Callable[[], Any]
+    items: int = 1
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Nearest-rank percentile
+
+    Args:
+        values: Sorted samples
+        q: Percentile between 0 and 100
+
+    Returns:
+        The sample at that rank
+    """
+    rank = max(1, -(-len(values) * q // 100))
+    return values[int(rank) - 1]
+
+
+def measure(benchmark: Benchmark, repeat: int = REPEAT, warmup: int = WARMUP) -> Dict[str, Any]:
+    """
+    Time a benchmark and record its peak traced memory
+
+    Args:
+        benchmark: Benchmark to run
+        repeat: Timed runs
+        warmup: Untimed runs before timing
+
+    Returns:
+        Latency percentiles in milliseconds, throughput in items per
+        second and peak memory in bytes
+    """
+    for _ in range(warmup):
+        benchmark.func()
+
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        benchmark.func()
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+
+    tracemalloc.start()
+    try:
+        benchmark.func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    mean = sum(latencies) / len(latencies)
+    return {
+        "items": benchmark.items,
+        "runs": repeat,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "mean_ms": mean * 1000,
+        "throughput": benchmark.items / mean if mean else None,
+        "peak_memory_bytes": peak
+    }
+
+
+def build_benchmarks(db: Dict[str, List[Dict[str, Any]]]) -> List[Benchmark]:
+    """
+    Declare one benchmark per public function
+
+    Network benchmarks fetch from the stand-in server; analysis benchmarks
+    get the dataset passed in, so they measure computation and export only.
+
+    Args:
+        db: Dataset served by the stand-in
+
+    Returns:
+        Benchmarks in run order
+    """
+    users, posts, comments = db["users"], db["posts"], db["comments"]
+    by_user = analyzer.index_posts_by_user(posts)
+    top_user = max(by_user, key=lambda u: len(by_user[u])) if by_user else users[0]["id"]
+    top_posts = by_user.get(top_user, [])
+    comment_counts: Dict[str, int] = {}
+    for comment in comments:
+        comment_counts[comment["post_id"]] = comment_counts.get(comment["post_id"], 0) + 1
+    top_post = max(comment_counts, key=comment_counts.get) if comment_counts else "1"
+    posts_body = json.dumps(posts).encode("utf-8")
+    chunks = [posts_body[i:i + JSON_CHUNK_SIZE] for i in range(0, len(posts_body), JSON_CHUNK_SIZE)]
+    aggregates = aggregate_posts(posts)
+    table = PostTable(posts)
+    user_report = dashboard.generate_user_report(top_user, top_posts)
+
+    decoders = []
+    for name in api_client.JSON_DECODERS:
+        try:
+            decoders.append((name, api_client._load_json_decoder(name)))
+        except ImportError:
+            pass
+
+    def bulk_comments():
+        items = (("1", "Bench", f"Comment {i}") for i in range(BULK_COMMENTS))
+        for _ in api_client.post_comments(items):
+            pass
+
+    return [
+        # api_client
+        Benchmark("api_client.check_api_status", api_client.check_api_status),
+        Benchmark("api_client.fetch_all_users", api_client.fetch_all_users, len(users)),
+        Benchmark("api_client.fetch_user", lambda: api_client.fetch_user(top_user)),
+        Benchmark("api_client.fetch_all_posts", api_client.fetch_all_posts, len(posts)),
+        Benchmark("api_client.fetch_posts_by_user", lambda: api_client.fetch_posts_by_user(top_user), len(top_posts)),
+        Benchmark("api_client.iter_posts", lambda: sum(1 for _ in api_client.iter_posts()), len(posts)),
+        Benchmark(
+            "api_client.iter_posts[prefetch]",
+            lambda: sum(1 for _ in api_client.iter_posts(prefetch=True)),
+            len(posts)
+        ),
+        Benchmark(
+            "api_client.iter_collection[comments]",
+            lambda: sum(1 for _ in api_client.iter_collection("/comments")),
+            len(comments)
+        ),
+        Benchmark("api_client.fetch_categories", api_client.fetch_categories, len(db["categories"])),
+        Benchmark(
+            "api_client.fetch_comments",
+            lambda: sum(1 for _ in api_client.fetch_comments(top_post)),
+            comment_counts.get(top_post, 0)
+        ),
+        Benchmark("api_client.iter_json_array", lambda: sum(1 for _ in api_client.iter_json_array(chunks)), len(posts)),
+        *(
+            Benchmark(f"api_client.decode_json[{name}]", lambda loads=loads: loads(posts_body), len(posts))
+            for name, loads in decoders
+        ),
+        Benchmark("api_client.post_comment", lambda: api_client.post_comment("1", "Bench", "Comment")),
+        Benchmark("api_client.post_comments", bulk_comments, BULK_COMMENTS),
+        # records: peak memory of decoding all posts to dicts vs streaming them into a table
+        Benchmark("records.decode[dicts]", lambda: json.loads(posts_body), len(posts)),
+        Benchmark(
+            "records.decode[table]",
+            lambda: PostTable.from_posts(api_client.iter_json_array(chunks)),
+            len(posts)
+        ),
+        Benchmark("records.PostTable.from_posts", lambda: PostTable.from_posts(posts), len(posts)),
+        # analyzer
+        Benchmark("analyzer.index_posts_by_user", lambda: analyzer.index_posts_by_user(posts), len(posts)),
+        Benchmark(
+            "analyzer.analyze_user_activity",
+            lambda: analyzer.analyze_user_activity(top_user, top_posts),
+            len(top_posts)
+        ),
+        Benchmark("analyzer.analyze_all_users", lambda: analyzer.analyze_all_users(users, posts), len(posts)),
+        Benchmark(
+            "analyzer.analyze_all_users[table]",
+            lambda: analyzer.analyze_all_users(users, table),
+            len(posts)
+        ),
+        Benchmark("analyzer.analyze_engagement_trends", lambda: analyzer.analyze_engagement_trends(posts), len(posts)),
+        Benchmark(
+            "analyzer.analyze_engagement_trends[pandas]",
+            lambda: analyzer.analyze_engagement_trends(posts, backend="pandas"),
+            len(posts)
+        ),
+        Benchmark(
+            "analyzer.analyze_engagement_trends[table]",
+            lambda: analyzer.analyze_engagement_trends(table),
+            len(posts)
+        ),
+        Benchmark(
+            "analyzer.analyze_engagement_trends[table,pandas]",
+            lambda: analyzer.analyze_engagement_trends(table, backend="pandas"),
+            len(posts)
+        ),
+        # dashboard
+        Benchmark("dashboard.generate_overview_dashboard", dashboard.generate_overview_dashboard, len(posts)),
+        Benchmark(
+            "dashboard.generate_overview_dashboard[aggregates]",
+            lambda: dashboard.generate_overview_dashboard(aggregates=aggregates)
+        ),
+        Benchmark("dashboard.generate_category_report", lambda: dashboard.generate_category_report(posts), len(posts)),
+        Benchmark(
+            "dashboard.generate_category_report[pandas]",
+            lambda: dashboard.generate_category_report(posts, backend="pandas"),
+            len(posts)
+        ),
+        Benchmark(
+            "dashboard.generate_category_report[table]",
+            lambda: dashboard.generate_category_report(table),
+            len(posts)
+        ),
+        Benchmark(
+            "dashboard.generate_category_report[distribution]",
+            lambda: dashboard.generate_category_report(posts, distribution=True),
+            len(posts)
+        ),
+        Benchmark(
+            "dashboard.generate_user_report",
+            lambda: dashboard.generate_user_report(top_user, top_posts),
+            len(top_posts)
+        ),
+        Benchmark(
+            "dashboard.generate_user_report[distribution]",
+            lambda: dashboard.generate_user_report(top_user, top_posts, distribution=True),
+            len(top_posts)
+        ),
+        Benchmark(
+            "dashboard.save_report_json",
+            lambda: dashboard.save_report_json(user_report, "bench_report.json")
+        ),
+        Benchmark(
+            "dashboard.save_report_json[compact]",
+            lambda: dashboard.save_report_json(user_report, "bench_report.json", mode="compact")
+        ),
+        Benchmark(
+            f"dashboard.save_report_json[x{BULK_REPORTS}]",
+            lambda: [dashboard.save_report_json(user_report, f"bench_{i}.json") for i in range(BULK_REPORTS)],
+            BULK_REPORTS
+        ),
+        Benchmark(
+            f"dashboard.save_reports_ndjson[x{BULK_REPORTS}]",
+            lambda: dashboard.save_reports_ndjson((user_report for _ in range(BULK_REPORTS)), "bench_reports.ndjson"),
+            BULK_REPORTS
+        )
+    ]
+
+
+def _commit() -> Optional[str]:
+    """Return the current git commit, if any"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    posts: int = 1000,
+    repeat: int = REPEAT,
+    warmup: int = WARMUP,
+    only: Optional[str] = None,
+    seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Generate a dataset, serve it and run every benchmark against it
+
+    Report files are written to a temporary directory.
+
+    Args:
+        posts: Number of posts in the dataset
+        repeat: Timed runs per benchmark
+        warmup: Untimed runs per benchmark
+        only: Run only benchmarks whose name contains this text
+        seed: Dataset random seed
+
+    Returns:
+        Run metadata and results by benchmark name
+    """
+    db = generate_db(posts, seed=seed)
+    results = {
+        "meta": {
+            "commit": _commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "posts": len(db["posts"]),
+            "users": len(db["users"]),
+            "comments": len(db["comments"]),
+            "repeat": repeat
+        },
+        "benchmarks": {}
+    }
+
+    base_url = api_client.BASE_URL
+    cwd = os.getcwd()
+    with StubServer(db) as server, tempfile.TemporaryDirectory() as workdir:
+        api_client.BASE_URL = server.url
+        os.chdir(workdir)
+        try:
+            for benchmark in build_benchmarks(db):
+                if only and only not in benchmark.name:
+                    continue
+                results["benchmarks"][benchmark.name] = measure(benchmark, repeat, warmup)
+        finally:
+            os.chdir(cwd)
+            api_client.BASE_URL = base_url
+            api_client.close_client()
+    return results
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """
+    Compare two result files benchmark by benchmark
+
+    Args:
+        baseline: Earlier results
+        current: Later results
+
+    Returns:
+        Ratios current/baseline of p50 latency and peak memory per
+        benchmark present in both (below 1.0 is an improvement)
+    """
+    ratios = {}
+    for name, result in current["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if before is None:
+            continue
+        ratios[name] = {
+            "p50": result["p50_ms"] / before["p50_ms"] if before["p50_ms"] else float("inf"),
+            "peak_memory": (
+                result["peak_memory_bytes"] / before["peak_memory_bytes"]
+                if before["peak_memory_bytes"] else float("inf")
+            )
+        }
+    return ratios
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the data harvester benchmarks")
+    parser.add_argument("--posts", type=int, default=1000, help="dataset size (10^3 to 10^6 in process)")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--only", help="run benchmarks whose name contains this text")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.posts, args.repeat, args.warmup, args.only, args.seed)
+    output = args.output or os.path.join(RESULTS_DIR, f"{(results['meta']['commit'] or 'local')[:12]}.json")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"{'benchmark':52} {'p50 ms':>10} {'p99 ms':>10} {'items/s':>12} {'peak KiB':>10}")
+    for name, result in results["benchmarks"].items():
+        throughput = f"{result['throughput']:.0f}" if result["throughput"] else "-"
+        print(
+            f"{name:52} {result['p50_ms']:10.2f} {result['p99_ms']:10.2f} "
+            f"{throughput:>12} {result['peak_memory_bytes'] / 1024:10.0f}"
+        )
+    print(f"\nResults saved: {output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.baseline} (ratio, below 1.0 is better):")
+        for name, ratio in compare(baseline, results).items():
+            print(f"   - {name}: p50 x{ratio['p50']:.2f}, peak memory x{ratio['peak_memory']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+In-process HTTP stand-in for json-server, serving a db.json-shaped dataset
+
+Supported routes, with json-server's semantics:
+    GET  /<collection>                 field filters, _page/_limit, _start/_end/_limit
+    GET  /<collection>/<id>
+    GET  /posts/<id>/comments
+    POST /<collection>                 assigns an id if missing, 500 on duplicates
+
+Responses carry an ETag and honour If-None-Match, and paginated responses
+carry X-Total-Count. Encoded bodies are memoized per URL, so the stand-in
+stays cheap relative to the client being measured.
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+DEFAULT_LIMIT = 10
+BODY_CACHE_MAXSIZE = 256
+
+
+class Database:
+    """
+    Collections with an ID index per collection and a comments-by-post index
+    """
+
+    def __init__(self, data: Dict[str, List[Dict[str, Any]]]):
+        self.lock = threading.Lock()
+        self.collections = {name: list(items) for name, items in data.items()}
+        self.by_id = {
+            name: {str(item.get("id")): item for item in items}
+            for name, items in self.collections.items()
+        }
+        self.comments_by_post = defaultdict(list)
+        for comment in self.collections.get("comments", []):
+            self.comments_by_post[str(comment.get("post_id"))].append(comment)
+        self._bodies: Dict[str, Tuple[int, bytes, Dict[str, str]]] = {}
+
+    def insert(self, name: str, item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Add an item, or return None if its id is taken"""
+        with self.lock:
+            items = self.collections.setdefault(name, [])
+            index = self.by_id.setdefault(name, {})
+            if "id" not in item:
+                item["id"] = str(len(items) + 1)
+                while item["id"] in index:
+                    item["id"] = str(int(item["id"]) + 1)
+            if str(item["id"]) in index:
+                return None
+            items.append(item)
+            index[str(item["id"])] = item
+            if name == "comments":
+                self.comments_by_post[str(item.get("post_id"))].append(item)
+            self._bodies.clear()
+        return item
+
+    def respond(self, target: str) -> Tuple[int, bytes, Dict[str, str]]:
+        """Return status, encoded body and headers for a GET target"""
+        cached = self._bodies.get(target)
+        if cached is not None:
+            return cached
+
+        url = urlsplit(target)
+        parts = [p for p in url.path.split("/") if p]
+        query = dict(parse_qsl(url.query))
+        with self.lock:
+            status, value, headers = self._resolve(parts, query)
+            body = json.dumps(value).encode("utf-8")
+            headers["ETag"] = f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            response = (status, body, headers)
+            if len(self._bodies) >= BODY_CACHE_MAXSIZE:
+                self._bodies.clear()
+            self._bodies[target] = response
+        return response
+
+    def _resolve(self, parts: List[str], query: Dict[str, str]) -> Tuple[int, Any, Dict[str, str]]:
+        """Route a GET path to its data"""
+        if not parts or parts[0] not in self.collections:
+            return 404, {}, {}
+        name = parts[0]
+        if len(parts) == 1:
+            return self._list(self.collections[name], query)
+        item = self.by_id[name].get(parts[1])
+        if item is None:
+            return 404, {}, {}
+        if len(parts) == 2:
+            return 200, item, {}
+        if len(parts) == 3 and name == "posts" and parts[2] == "comments":
+            return self._list(self.comments_by_post.get(parts[1], []), query)
+        return 404, {}, {}
+
+    @staticmethod
+    def _list(items: List[Dict[str, Any]], query: Dict[str, str]) -> Tuple[int, Any, Dict[str, str]]:
+        """Apply field filters and pagination like json-server"""
+        filters = {k: v for k, v in query.items() if not k.startswith("_")}
+        if filters:
+            items = [i for i in items if all(str(i.get(k)) == v for k, v in filters.items())]
+
+        headers = {}
+        if "_page" in query:
+            limit = int(query.get("_limit", DEFAULT_LIMIT))
+            start = (int(query["_page"]) - 1) * limit
+            headers["X-Total-Count"] = str(len(items))
+            items = items[start:start + limit]
+        elif "_start" in query or "_end" in query:
+            start = int(query.get("_start", 0))
+            if "_end" in query:
+                end = int(query["_end"])
+            elif "_limit" in query:
+                end = start + int(query["_limit"])
+            else:
+                end = len(items)
+            headers["X-Total-Count"] = str(len(items))
+            items = items[start:end]
+        elif "_limit" in query:
+            items = items[:int(query["_limit"])]
+        return 200, items, headers
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Request handler bound to a Database through the server"""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, Nagle's
+    # algorithm and delayed ACKs add ~40 ms to every small response
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes, headers: Dict[str, str]):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        status, body, headers = self.server.database.respond(self.path)
+        if status == 200 and self.headers.get("If-None-Match") == headers["ETag"]:
+            self._send(304, b"", {"ETag": headers["ETag"]})
+            return
+        self._send(status, body, headers)
+
+    def do_POST(self):
+        parts = [p for p in urlsplit(self.path).path.split("/") if p]
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            item = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send(400, b"{}", {})
+            return
+        if len(parts) != 1 or not isinstance(item, dict):
+            self._send(404, b"{}", {})
+            return
+        created = self.server.database.insert(parts[0], item)
+        if created is None:
+            self._send(500, json.dumps({"error": "Insert failed, duplicate id"}).encode("utf-8"), {})
+            return
+        self._send(201, json.dumps(created).encode("utf-8"), {})
+
+
+class StubServer:
+    """
+    json-server stand-in running in a background thread
+
+    Use as a context manager; url is set once the server is listening.
+    """
+
+    def __init__(self, data: Dict[str, List[Dict[str, Any]]], host: str = "127.0.0.1", port: int = 0):
+        self.database = Database(data)
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.database = self.database
+        self.url = f"http://{host}:{self._server.server_address[1]}"
+        self._thread = None
+
+    def start(self) -> "StubServer":
+        """Start serving in a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and release the port"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a db.json like json-server")
+    parser.add_argument("db", nargs="?", default="db.json")
+    parser.add_argument("--port", type=int, default=3000)
+    args = parser.parse_args()
+    with open(args.db, encoding="utf-8") as f:
+        server = StubServer(json.load(f), port=args.port)
+    print(f"Serving {args.db} at {server.url}")
+    server.start()
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
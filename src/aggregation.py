@@ -0,0 +1,480 @@
+"""
+Aggregation module that computes post statistics in a single pass
+"""
+
+import math
+from fractions import Fraction
+from typing import Dict, Any, Iterable, List, Optional, Union
+
+from src.sketches import Distribution
+
+Number = Union[int, float]
+
+
+class ExactSum:
+    """
+    Exact sum of a series holding floats, without a Fraction per value
+
+    Integers are summed as an int, finite floats as a few non-overlapping
+    float partials (Shewchuk's algorithm, as used by math.fsum()), and NaN
+    or infinities as a plain float that dominates the result. Values can
+    also be subtracted. The floats in the series are counted, so the sum
+    is an int again once every float has been subtracted.
+    """
+
+    __slots__ = ("integer", "partials", "special", "floats")
+
+    def __init__(self, integer: int = 0):
+        self.integer = integer
+        self.partials: List[float] = []
+        self.special = 0.0
+        self.floats = 0
+
+    def add(self, value: Number):
+        """Add one value exactly"""
+        if isinstance(value, float):
+            self.floats += 1
+        self._add(value)
+
+    def subtract(self, value: Number):
+        """Subtract a value previously added"""
+        if isinstance(value, float):
+            self.floats -= 1
+            if not self.floats:
+                self.partials.clear()
+                self.special = 0.0
+                return
+        self._add(-value)
+
+    def _add(self, value: Number):
+        """Add a value without counting it"""
+        if not isinstance(value, float):
+            self.integer += value
+            return
+        if not math.isfinite(value):
+            self.special += value
+            return
+        partials = self.partials
+        i = 0
+        for partial in partials:
+            if abs(value) < abs(partial):
+                value, partial = partial, value
+            high = value + partial
+            low = partial - (high - value)
+            if low:
+                partials[i] = low
+                i += 1
+            value = high
+        partials[i:] = [value]
+
+    def merge(self, other: "ExactSum"):
+        """Add another exact sum"""
+        self.integer += other.integer
+        self.special += other.special
+        self.floats += other.floats
+        for partial in other.partials:
+            self._add(partial)
+
+    def value(self) -> Union[int, Fraction, float]:
+        """
+        The sum: an int while the series holds no float, a float if it holds
+        NaN or infinity, else a Fraction
+        """
+        if not self.floats:
+            return self.integer
+        if self.special:
+            return self.special
+        return self.integer + sum(map(Fraction, self.partials), Fraction(0))
+
+    def to_list(self) -> List[Any]:
+        """Serialize as [value() as a string, number of floats]"""
+        value = self.value()
+        if isinstance(value, Fraction):
+            value = f"{value.numerator}/{value.denominator}"
+        return [str(value), self.floats]
+
+    @classmethod
+    def from_list(cls, values: List[Any]) -> "ExactSum":
+        """Restore an exact sum serialized with to_list()"""
+        text, floats = values
+        exact = cls()
+        exact.floats = floats
+        if not floats:
+            exact.integer = int(text)
+            return exact
+        if text.lstrip("+-").lower() in ("nan", "inf", "infinity"):
+            exact.special = float(text)
+            return exact
+        value = Fraction(text)
+        exact.integer = math.floor(value)
+        # A sum of floats has a dyadic fractional part, which a few floats
+        # represent exactly
+        rest = value - exact.integer
+        while rest:
+            partial = float(rest)
+            exact._add(partial)
+            rest -= Fraction(partial)
+        return exact
+
+
+class RunningStats:
+    """
+    Running count, sum, min and max of a numeric series in O(1) memory
+
+    total is the plain running sum, like sum(). Once a float is added, an
+    ExactSum is kept alongside, so mean matches statistics.mean() to the
+    last bit; integer series never pay for it.
+
+    Values can be retracted with remove(); min and max become None
+    (unknown) once an extreme value has been removed.
+    """
+
+    __slots__ = ("count", "total", "minimum", "maximum", "exact")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+        # Exact sum once the series holds a float, else None (total is exact)
+        self.exact: Optional[ExactSum] = None
+
+    def add(self, value: Number):
+        """Fold one value into the accumulator"""
+        if self.exact is not None:
+            self.exact.add(value)
+        elif value.__class__ is not int and isinstance(value, float):
+            self.exact = ExactSum(self.total)
+            self.exact.add(value)
+        self.total += value
+        self.count += 1
+        if self.count == 1:
+            self.minimum = self.maximum = value
+            return
+        minimum, maximum = self.minimum, self.maximum
+        if minimum is not None and value < minimum:
+            self.minimum = value
+        if maximum is not None and value > maximum:
+            self.maximum = value
+
+    def remove(self, value: Number):
+        """Retract a value previously passed to add()"""
+        if self.exact is not None:
+            self.exact.subtract(value)
+        self.count -= 1
+        self.total -= value
+        if not self.count:
+            self.total = 0
+            self.exact = None
+            self.minimum = self.maximum = None
+        elif value == self.minimum or value == self.maximum:
+            self.minimum = self.maximum = None
+
+    def merge(self, other: "RunningStats"):
+        """Fold another accumulator, e.g. from a separate batch, into this one"""
+        if not other.count:
+            return
+        if not self.count:
+            self.minimum, self.maximum = other.minimum, other.maximum
+        else:
+            self.minimum = None if None in (self.minimum, other.minimum) else min(self.minimum, other.minimum)
+            self.maximum = None if None in (self.maximum, other.maximum) else max(self.maximum, other.maximum)
+        if self.exact is not None or other.exact is not None:
+            if self.exact is None:
+                self.exact = ExactSum(self.total)
+            self.exact.merge(other.exact if other.exact is not None else ExactSum(other.total))
+        self.count += other.count
+        self.total += other.total
+
+    def to_list(self) -> List[Any]:
+        """Serialize as [count, total, minimum, maximum, ExactSum list or None]"""
+        exact = None if self.exact is None else self.exact.to_list()
+        return [self.count, self.total, self.minimum, self.maximum, exact]
+
+    @classmethod
+    def from_list(cls, values: List[Any]) -> "RunningStats":
+        """Restore an accumulator serialized with to_list()"""
+        stats = cls()
+        stats.count, stats.total, stats.minimum, stats.maximum = values[:4]
+        if len(values) > 4 and values[4] is not None:
+            stats.exact = ExactSum.from_list(values[4])
+        elif isinstance(stats.total, float):
+            stats.exact = ExactSum()
+            stats.exact.add(stats.total)
+        return stats
+
+    @property
+    def mean(self) -> Number:
+        """
+        Arithmetic mean, or 0 for an empty series
+
+        Matches statistics.mean(): an exact mean of integers is an int, and
+        a mean of floats is the exact mean correctly rounded to a float.
+        """
+        return exact_mean(self.total if self.exact is None else self.exact.value(), self.count)
+
+
+class GroupStats:
+    """
+    Likes and views accumulators for one group of posts
+
+    With distributions enabled, likes and views also feed a Distribution
+    (quantile sketch and histogram) each; memory stays fixed per group, but
+    posts can no longer be retracted.
+    """
+
+    __slots__ = ("likes", "views", "likes_distribution", "views_distribution")
+
+    def __init__(self, distributions: bool = False):
+        self.likes = RunningStats()
+        self.views = RunningStats()
+        self.likes_distribution = Distribution() if distributions else None
+        self.views_distribution = Distribution() if distributions else None
+
+    @property
+    def post_count(self) -> int:
+        return self.likes.count
+
+    def add(self, post: Dict[str, Any]):
+        """Fold one post into the group"""
+        likes = post.get("likes", 0)
+        views = post.get("views", 0)
+        self.likes.add(likes)
+        self.views.add(views)
+        if self.likes_distribution is not None:
+            self.likes_distribution.add(likes)
+            self.views_distribution.add(views)
+
+    def remove(self, post: Dict[str, Any]):
+        """Retract a post previously passed to add()"""
+        if self.likes_distribution is not None:
+            raise ValueError("Posts cannot be retracted from distributions")
+        self.likes.remove(post.get("likes", 0))
+        self.views.remove(post.get("views", 0))
+
+    def merge(self, other: "GroupStats"):
+        """Fold another group's accumulators into this one"""
+        if self.likes_distribution is not None:
+            if other.likes_distribution is None:
+                raise ValueError("Cannot merge a group without distributions into one with them")
+            self.likes_distribution.merge(other.likes_distribution)
+            self.views_distribution.merge(other.views_distribution)
+        self.likes.merge(other.likes)
+        self.views.merge(other.views)
+
+    def to_list(self) -> List[Any]:
+        """Serialize as [likes, views] accumulator lists, followed by the distributions if enabled"""
+        values = [self.likes.to_list(), self.views.to_list()]
+        if self.likes_distribution is not None:
+            values += [self.likes_distribution.to_list(), self.views_distribution.to_list()]
+        return values
+
+    @classmethod
+    def from_list(cls, values: List[Any]) -> "GroupStats":
+        """Restore a group serialized with to_list()"""
+        group = cls()
+        group.likes = RunningStats.from_list(values[0])
+        group.views = RunningStats.from_list(values[1])
+        if len(values) > 2:
+            group.likes_distribution = Distribution.from_list(values[2])
+            group.views_distribution = Distribution.from_list(values[3])
+        return group
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the group in the shape used by the reports
+
+        Returns:
+            Dictionary with post_count, avg/total likes and views, plus
+            likes_distribution and views_distribution (see
+            Distribution.summary()) if enabled
+        """
+        summary = {
+            "post_count": self.post_count,
+            "avg_likes": self.likes.mean,
+            "avg_views": self.views.mean,
+            "total_likes": self.likes.total,
+            "total_views": self.views.total
+        }
+        if self.likes_distribution is not None:
+            summary["likes_distribution"] = self.likes_distribution.summary()
+            summary["views_distribution"] = self.views_distribution.summary()
+        return summary
+
+
+class PostAggregates:
+    """
+    Overall, per-user and per-category statistics over a post collection
+
+    Memory is proportional to the number of users and categories, not to
+    the number of posts. With distributions enabled, every group also
+    keeps fixed-size likes and views distributions. Per-user groups can be
+    left out, and the running engagement ratio series is only kept on
+    request, since each of them costs time per post.
+    """
+
+    def __init__(self, distributions: bool = False, users: bool = True, engagement: bool = False):
+        """
+        Args:
+            distributions: Keep likes and views distributions per group
+            users: Keep per-user groups
+            engagement: Keep the running engagement ratio series
+        """
+        self.distributions = distributions
+        self.per_user = users
+        self.engagement = RunningStats() if engagement else None
+        self.users: Dict[Any, GroupStats] = {}
+        self.categories: Dict[str, GroupStats] = {}
+
+    @property
+    def post_count(self) -> int:
+        return sum(group.post_count for group in self.categories.values())
+
+    @property
+    def overall(self) -> GroupStats:
+        """Likes and views over every post, merged from the category groups"""
+        overall = GroupStats(self.distributions)
+        for group in self.categories.values():
+            overall.merge(group)
+        return overall
+
+    def add(self, post: Dict[str, Any]):
+        """Fold one post into every group it belongs to"""
+        if self.engagement is not None:
+            self.engagement.add(engagement_ratio(post))
+
+        if self.per_user:
+            user_id = post.get("user_id")
+            user = self.users.get(user_id)
+            if user is None:
+                user = self.users[user_id] = GroupStats(self.distributions)
+            user.add(post)
+
+        category = post.get("category", "Uncategorized")
+        group = self.categories.get(category)
+        if group is None:
+            group = self.categories[category] = GroupStats(self.distributions)
+        group.add(post)
+
+    def remove(self, post: Dict[str, Any]):
+        """
+        Retract a post previously passed to add(), e.g. the old version of
+        an edited post; groups left empty are dropped
+        """
+        if self.engagement is not None:
+            self.engagement.remove(engagement_ratio(post))
+        keys = [(self.categories, post.get("category", "Uncategorized"))]
+        if self.per_user:
+            keys.insert(0, (self.users, post.get("user_id")))
+        for groups, key in keys:
+            group = groups[key]
+            group.remove(post)
+            if not group.post_count:
+                del groups[key]
+
+    def merge(self, other: "PostAggregates"):
+        """Fold aggregates computed over another batch of posts into this one"""
+        if self.per_user and not other.per_user:
+            raise ValueError("Cannot merge aggregates without per-user groups into ones with them")
+        if self.engagement is not None and other.engagement is None:
+            raise ValueError("Cannot merge aggregates without engagement into ones with it")
+        if self.engagement is not None:
+            self.engagement.merge(other.engagement)
+        sources = [(self.categories, other.categories)]
+        if self.per_user:
+            sources.insert(0, (self.users, other.users))
+        for target, source in sources:
+            for key, stats in source.items():
+                group = target.get(key)
+                if group is None:
+                    group = target[key] = GroupStats(self.distributions)
+                group.merge(stats)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize to JSON-compatible data; group keys may be non-strings"""
+        return {
+            "distributions": self.distributions,
+            "per_user": self.per_user,
+            "engagement": None if self.engagement is None else self.engagement.to_list(),
+            "users": [[key, group.to_list()] for key, group in self.users.items()],
+            "categories": [[key, group.to_list()] for key, group in self.categories.items()]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PostAggregates":
+        """Restore aggregates serialized with to_dict()"""
+        engagement = data.get("engagement")
+        aggregates = cls(data.get("distributions", False), data.get("per_user", True), engagement is not None)
+        if engagement is not None:
+            aggregates.engagement = RunningStats.from_list(engagement)
+        aggregates.users = {key: GroupStats.from_list(group) for key, group in data["users"]}
+        aggregates.categories = {key: GroupStats.from_list(group) for key, group in data["categories"]}
+        return aggregates
+
+
+def exact_mean(total: Union[Number, Fraction], count: int) -> Number:
+    """
+    Divide a total by a count the way statistics.mean() would
+
+    The result matches statistics.mean() exactly only if total is exact:
+    an int, or a Fraction for series holding floats.
+
+    Args:
+        total: Sum of the series
+        count: Number of values in the series
+
+    Returns:
+        The mean, as an int when integers divide exactly, or 0 if count is 0
+    """
+    if not count:
+        return 0
+    if isinstance(total, Fraction):
+        return float(total / count)
+    if isinstance(total, int):
+        quotient, remainder = divmod(total, count)
+        if not remainder:
+            return quotient
+    return total / count
+
+
+def engagement_ratio(post: Dict[str, Any]) -> float:
+    """
+    Calculate likes per view for a post
+
+    Args:
+        post: Post dictionary with 'likes' and 'views' fields
+
+    Returns:
+        Likes divided by views, or 0 if the post has no views
+    """
+    views = post.get("views", 0)
+    return post.get("likes", 0) / views if views > 0 else 0
+
+
+def aggregate_posts(
+    posts: Iterable[Dict[str, Any]],
+    aggregates: Optional[PostAggregates] = None,
+    distributions: bool = False,
+    users: bool = True,
+    engagement: bool = False
+) -> PostAggregates:
+    """
+    Compute all post statistics in one pass
+
+    Args:
+        posts: Post dictionaries, e.g. a list or a lazy iter_posts() stream
+        aggregates: Existing aggregates to extend instead of starting fresh
+        distributions: Also sketch likes and views quantiles and
+            histograms per group; ignored when extending aggregates
+        users: Keep per-user groups; ignored when extending aggregates
+        engagement: Keep the engagement ratio series; ignored when
+            extending aggregates
+
+    Returns:
+        Aggregates over the given posts
+    """
+    if aggregates is None:
+        aggregates = PostAggregates(distributions, users, engagement)
+    for post in posts:
+        aggregates.add(post)
+    return aggregates
@@ -2,105 +2,282 @@
 Analyzer module that combines data fetching, processing, and storage
 """
 
-import tablib
-import os
-import statistics
-from typing import Dict, Any, List
-from src.api_client import fetch_user, fetch_all_posts
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from operator import itemgetter
+from typing import Dict, Any, List, Iterable, Optional
+from src.aggregation import GroupStats, engagement_ratio
+from src.api_client import fetch_user, fetch_all_users, fetch_all_posts, fetch_posts_by_user
+from src.export import check_export_format, write_table
+from src.metrics import timed
+from src.records import PostTable
 
+USER_POSTS_HEADERS = ['post_index', 'title', 'likes', 'views', 'category']
+ENGAGEMENT_HEADERS = ['post_id', 'title', 'views', 'likes', 'engagement_ratio']
 
-def analyze_user_activity(user_id: str) -> Dict[str, Any]:
+REPORT_BACKENDS = ("python", "pandas")
+
+
+def load_backend(backend: str):
+    """
+    Resolve a report backend name
+
+    Args:
+        backend: "python" for row-wise reports, "pandas" for the
+            vectorized columnar backend
+
+    Returns:
+        The src.columnar module for "pandas", None for "python"
+    """
+    if backend not in REPORT_BACKENDS:
+        raise ValueError(f"Unknown report backend: {backend!r}")
+    if backend == "pandas":
+        from src import columnar
+        return columnar
+    return None
+
+
+def index_posts_by_user(posts: Iterable[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Group posts by author in a single pass
+
+    Build this once from a full snapshot and pass index.get(user_id, [])
+    to analyze_user_activity() for each user.
+
+    Args:
+        posts: Post dictionaries containing a 'user_id' field, or a
+            PostTable, which is partitioned into one PostTable per user
+
+    Returns:
+        Mapping of user ID to that user's posts, in original order
+    """
+    if isinstance(posts, PostTable):
+        return posts.group_by("user_id")
+    index = {}
+    for post in posts:
+        index.setdefault(post.get("user_id"), []).append(post)
+    return index
+
+
+def analyze_user_activity(
+    user_id: str,
+    posts: Optional[List[Dict[str, Any]]] = None,
+    backend: str = "python",
+    compress: bool = False,
+    source: Optional[Any] = None,
+    export_format: str = "csv"
+) -> Dict[str, Any]:
     """
     Analyze a user's activity by fetching their posts and saving the results
     
     Args:
         user_id: User identifier
+        posts: The user's posts, e.g. from index_posts_by_user(); fetched
+            with fetch_posts_by_user() if omitted
+        backend: "python" or "pandas", see load_backend()
+        compress: Write a gzip-compressed .csv.gz file
+        source: Data source with api_client-style fetch methods, e.g. a
+            SnapshotStore; the live API if omitted
+        export_format: "csv", "parquet" or "arrow", see src.export
         
     Returns:
-        Analysis results with stats and CSV export path
+        Analysis results with stats and export path
     """
+    load_backend(backend)
+    check_export_format(export_format)
+
     # Fetch data
-    user = fetch_user(user_id)
-    all_posts = fetch_all_posts()
-    posts = [p for p in all_posts if p.get("user_id") == user_id]
+    with timed("analyze_user_activity", "fetch"):
+        user = source.fetch_user(user_id) if source is not None else fetch_user(user_id)
+        if posts is None:
+            posts = source.fetch_posts_by_user(user_id) if source is not None else fetch_posts_by_user(user_id)
     if not posts:
         return {"error": "No posts found"}
+
+    return _write_user_activity(user, user_id, posts, backend, compress, export_format)
+
+
+def _write_user_activity(
+    user: Dict[str, Any],
+    user_id: str,
+    posts: List[Dict[str, Any]],
+    backend: str,
+    compress: bool,
+    export_format: str = "csv"
+) -> Dict[str, Any]:
+    """Compute one user's stats and write their posts table, without fetching"""
+    columnar = load_backend(backend)
+    csv_path = f'data/user_{user_id}_posts.csv'
+
+    if columnar is not None:
+        with timed("analyze_user_activity", "aggregate"):
+            frame = columnar.posts_frame(posts)
+            likes, avg_likes = columnar.column_stats(frame["likes"])
+            views, avg_views = columnar.column_stats(frame["views"])
+            table = columnar.user_posts_frame(frame)
+        with timed("analyze_user_activity", "export"):
+            csv_path = columnar.write_table(table, csv_path, compress, export_format)
+        return {
+            "user": user.get("name"),
+            "total_posts": len(frame),
+            "total_likes": likes,
+            "avg_likes": avg_likes,
+            "total_views": views,
+            "avg_views": avg_views,
+            "path": csv_path
+        }
     
-    # Extract metrics
-    likes = [p.get("likes", 0) for p in posts]
-    views = [p.get("views", 0) for p in posts]
-    
-    # Calculate statistics
+    # Calculate statistics and create data for export in one pass
+    with timed("analyze_user_activity", "aggregate"):
+        stats = GroupStats()
+        rows = []
+
+        for i, post in enumerate(posts):
+            stats.add(post)
+            rows.append([
+                i,
+                post.get('title', f'Post {i}'),
+                post.get('likes', 0),
+                post.get('views', 0),
+                post.get('category', 'Uncategorized')
+            ])
+
+        # Sort by likes (descending, stable)
+        rows.sort(key=itemgetter(2), reverse=True)
+
     analysis = {
         "user": user.get("name"),
-        "total_posts": len(posts),
-        "total_likes": sum(likes),
-        "avg_likes": statistics.mean(likes) if likes else 0,
-        "total_views": sum(views),
-        "avg_views": statistics.mean(views) if views else 0,
+        "total_posts": stats.post_count,
+        "total_likes": stats.likes.total,
+        "avg_likes": stats.likes.mean,
+        "total_views": stats.views.total,
+        "avg_views": stats.views.mean,
     }
-    
-    # Create data for export
-    dataset = tablib.Dataset()
-    dataset.headers = ['post_index', 'title', 'likes', 'views', 'category']
-    
-    for i, post in enumerate(posts):
-        dataset.append([
-            i,
-            post.get('title', f'Post {i}'),
-            post.get('likes', 0),
-            post.get('views', 0),
-            post.get('category', 'Uncategorized')
-        ])
-    
-    # Sort by likes (descending)
-    dataset = dataset.sort('likes', reverse=True)
 
     # Export CSV file
-    csv_output = dataset.export('csv')
-    csv_path = f'data/user_{user_id}_posts.csv'
-    os.makedirs('data', exist_ok=True)
-    with open(csv_path, 'w', encoding='utf-8') as csvfile:
-        csvfile.write(csv_output)
-    
-    analysis['path'] = csv_path
+    with timed("analyze_user_activity", "export"):
+        analysis['path'] = write_table(csv_path, USER_POSTS_HEADERS, rows, compress, export_format)
     return analysis
 
 
-def analyze_engagement_trends() -> str:
+def _write_user_activity_task(task: tuple) -> Dict[str, Any]:
+    """Unpack a pool task for _write_user_activity"""
+    return _write_user_activity(*task)
+
+
+def analyze_all_users(
+    users: Optional[List[Dict[str, Any]]] = None,
+    posts: Optional[Iterable[Dict[str, Any]]] = None,
+    max_workers: int = 4,
+    use_processes: bool = False,
+    backend: str = "python",
+    compress: bool = False,
+    source: Optional[Any] = None,
+    export_format: str = "csv"
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Analyze every user's activity and write all per-user CSVs concurrently
+
+    Posts are partitioned by user in a single pass, then each user's
+    data/user_{id}_posts.csv is written by a worker pool. No per-user
+    requests are made.
+
+    Args:
+        users: User dictionaries; fetched with fetch_all_users() if omitted
+        posts: All posts, e.g. a lazy iter_posts() stream; fetched with
+            fetch_all_posts() if omitted
+        max_workers: Number of pool workers writing CSVs
+        use_processes: Use a process pool instead of a thread pool, for
+            CPU-bound backends
+        backend: "python" or "pandas", see load_backend()
+        compress: Write gzip-compressed .csv.gz files
+        source: Data source with api_client-style fetch methods, e.g. a
+            SnapshotStore; the live API if omitted
+        export_format: "csv", "parquet" or "arrow", see src.export
+
+    Returns:
+        Summary index mapping each user ID to its analysis; users without
+        posts have total_posts 0 and no path
+    """
+    load_backend(backend)
+    check_export_format(export_format)
+
+    # Fetch data
+    with timed("analyze_all_users", "fetch"):
+        if users is None:
+            users = source.fetch_all_users() if source is not None else fetch_all_users()
+        if posts is None:
+            posts = source.iter_posts() if source is not None else fetch_all_posts()
+    with timed("analyze_all_users", "aggregate"):
+        index = index_posts_by_user(posts)
+
+    summary = {}
+    tasks = []
+    for user in users:
+        user_posts = index.get(user["id"])
+        if user_posts:
+            tasks.append((user, user["id"], user_posts, backend, compress, export_format))
+        else:
+            summary[user["id"]] = {"user": user.get("name"), "total_posts": 0}
+
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with timed("analyze_all_users", "export"), executor_class(max_workers=max_workers) as executor:
+        chunksize = max(1, len(tasks) // (max_workers * 4))
+        for task, analysis in zip(tasks, executor.map(_write_user_activity_task, tasks, chunksize=chunksize)):
+            summary[task[1]] = analysis
+
+    return {user["id"]: summary[user["id"]] for user in users}
+
+
+def analyze_engagement_trends(
+    posts: Optional[Iterable[Dict[str, Any]]] = None,
+    backend: str = "python",
+    compress: bool = False,
+    source: Optional[Any] = None,
+    export_format: str = "csv"
+) -> str:
     """
     Analyze engagement trends across all posts
+
+    Rows are streamed to disk as posts arrive, so a lazy posts iterable
+    keeps memory flat. Both backends use this path: a per-post ratio has
+    nothing to vectorize beyond the division, and building a DataFrame
+    for it was slower and took far more memory.
     
+    Args:
+        posts: Posts to analyze, e.g. a lazy iter_posts() stream;
+            fetched with fetch_all_posts() if omitted
+        backend: "python" or "pandas", see load_backend()
+        compress: Write a gzip-compressed .csv.gz file
+        source: Data source with api_client-style fetch methods, e.g. a
+            SnapshotStore; the live API if omitted
+        export_format: "csv", "parquet" or "arrow", see src.export
+
     Returns:
-        Path to engagement data CSV file
+        Path to engagement data file
     """
+    load_backend(backend)
+    check_export_format(export_format)
+
     # Fetch data
-    posts = fetch_all_posts()
-    
-    # Create data for export
-    dataset = tablib.Dataset()
-    dataset.headers = ['post_id', 'title', 'views', 'likes', 'engagement_ratio']
+    with timed("analyze_engagement_trends", "fetch"):
+        if posts is None:
+            posts = source.iter_posts() if source is not None else fetch_all_posts()
+
+    csv_path = 'data/engagement_trends.csv'
     
-    for post in posts:
-        views = post.get("views", 0)
-        likes = post.get("likes", 0)
-        engagement_ratio = likes / views if views > 0 else 0
-        
-        dataset.append([
+    # Stream rows to the export file
+    rows = (
+        [
             post.get('id', ''),
             post.get('title', 'Untitled'),
-            views,
-            likes,
-            round(engagement_ratio, 4)
-        ])
-    
-    # Export CSV file
-    csv_path = 'data/engagement_trends.csv'
-    os.makedirs('data', exist_ok=True)
-    with open(csv_path, 'w', encoding='utf-8') as csvfile:
-        csvfile.write(dataset.export('csv'))
-    
-    return csv_path
+            post.get('views', 0),
+            post.get('likes', 0),
+            round(engagement_ratio(post), 4)
+        ]
+        for post in posts
+    )
+    with timed("analyze_engagement_trends", "export"):
+        return write_table(csv_path, ENGAGEMENT_HEADERS, rows, compress, export_format)
 
 
 def calculate_average_title_length(posts: List[Dict[str, Any]]) -> float:
@@ -2,44 +2,596 @@
 API client module for fetching data from APIs
 """
 
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import asyncio
+import codecs
 import json
-from typing import Dict, Any, List, Iterator
+import random
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from typing import Dict, Any, List, Iterable, Iterator, Awaitable, Callable, Hashable, Optional, Tuple
+from urllib.parse import urlencode
+
+from src.http_cache import HttpCache, HTTP_CACHE_PATH, HTTP_CACHE_MAX_BYTES
+from src import metrics
+from src.http_client import HttpClient, POOL_MAXSIZE
+from src.ratelimit import AdaptiveLimiter
 
 BASE_URL = "http://localhost:3000"
 TIMEOUT = 3
 
-_session = None
+CACHE_MAXSIZE = 128
+CACHE_TTL = 300.0
+POSTS_PAGE_SIZE = 500
+STREAM_CHUNK_SIZE = 512
+STREAM_MAX_BUFFER = 1024 * 1024
+HTTP_CACHE_MAX_STREAM_BYTES = 8 * 1024 * 1024
+BULK_CONCURRENCY = 8
+BULK_RETRIES = 3
+BULK_BACKOFF = 0.5
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+# Tried in order when no decoder is configured explicitly
+JSON_DECODERS = ("orjson", "msgspec", "json")
+
+POSTS_HEADERS = {
+    "Accept": "application/json",
+    "User-Agent": "DataHarvester/1.0"
+}
+
+_client = None
+_client_lock = threading.Lock()
+_cache = None
+_http_cache = None
+_flights = None
+_json_decoder = "json"
+_json_loads: Callable[[bytes], Any] = json.loads
+_record_decoders: Dict[Tuple[str, ...], Callable[[bytes], Any]] = {}
+
+# Maps digits to "0" and every other byte to " ", to find long digit runs
+_DIGIT_CLASSES = bytes(0x30 if 0x30 <= b <= 0x39 else 0x20 for b in range(256))
+_WIDE_INTEGER = b"0" * 20
+
+_JSON_WHITESPACE = " \t\n\r"
+# Incomplete array elements longer than this are scanned for their end
+# rather than decoded again with every chunk
+_JSON_SCAN_AFTER = 4096
+_JSON_STRUCTURAL = re.compile(r'[\[\]{}"]')
+_JSON_STRING_SPECIAL = re.compile(r'["\\]')
+_JSON_SCALAR_END = re.compile(r'[,\]\s]')
+
+
+class FetchCache:
+    """
+    In-memory LRU cache with a TTL for decoded API responses
+
+    Cached values are shared between callers, so they must be treated as
+    read-only.
+    """
+
+    def __init__(self, maxsize: int = CACHE_MAXSIZE, ttl: float = CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for key, calling loader on a miss
+
+        Args:
+            key: Cache key, the resource path
+            loader: Zero-argument callable that fetches the value
+
+        Returns:
+            Cached or freshly loaded value
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(key, None)
+            self.misses += 1
+
+        value = loader()
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, prefix: Optional[str] = None) -> int:
+        """
+        Drop cached entries
+
+        Args:
+            prefix: Only drop keys starting with this path, or all if None
+
+        Returns:
+            Number of entries dropped
+        """
+        with self._lock:
+            keys = [k for k in self._entries if prefix is None or k.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current entry count"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self._entries)}
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical fetches into one request
+
+    While a load for a key is in flight, further callers for that key
+    wait for it and share its result or exception instead of sending their
+    own request. Nothing is kept once the load finishes; FetchCache does
+    the caching. Shared results must be treated as read-only.
+    """
+
+    def __init__(self):
+        self.coalesced = 0
+        self._calls: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, loader: Callable[[], Any], url: Optional[str] = None) -> Any:
+        """
+        Load a value in this thread, or wait for the thread already loading it
+
+        Args:
+            key: Identity of the request, e.g. URL and parameters
+            loader: Zero-argument callable that fetches the value
+            url: Request URL, labels http_coalesced_total when metrics
+                are enabled
+
+        Returns:
+            Loaded value
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event()}
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            _record_coalesced(url)
+            call["done"].wait()
+            if "error" in call:
+                raise call["error"]
+            return call["value"]
+
+        try:
+            call["value"] = loader()
+            return call["value"]
+        except BaseException as error:
+            call["error"] = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+
+    async def do_async(self, key: Hashable, loader: Callable[[], Awaitable[Any]], url: Optional[str] = None) -> Any:
+        """
+        Await a value, sharing one task between the coroutines of an event loop
 
-def get_session() -> requests.Session:
-    """Get or create a shared session"""
-    global _session
-    if _session is None:
-        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
-        _session = requests.Session()
-        _session.mount("http://", adapter)
-        _session.mount("https://", adapter)
-    return _session
+        The load runs in its own task, so cancelling one caller doesn't
+        cancel it for the others.
+
+        Args:
+            key: Identity of the request, e.g. URL and parameters
+            loader: Zero-argument callable returning the awaitable fetch
+            url: Request URL, labels http_coalesced_total when metrics
+                are enabled
+
+        Returns:
+            Loaded value
+        """
+        # Tasks belong to one event loop, so loops don't share loads
+        key = (asyncio.get_running_loop(), key)
+        with self._lock:
+            task = self._calls.get(key)
+            shared = task is not None
+            if shared:
+                self.coalesced += 1
+            else:
+                task = self._calls[key] = asyncio.ensure_future(loader())
+                task.add_done_callback(lambda _: self._forget(key, task))
+        if shared:
+            _record_coalesced(url)
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, call: Any):
+        """Drop a finished call, unless a newer one took its key"""
+        with self._lock:
+            if self._calls.get(key) is call:
+                del self._calls[key]
+
+
+def _record_coalesced(url: Optional[str]):
+    """Count a request answered by another caller's fetch"""
+    if url is not None and metrics.enabled():
+        metrics.increment("http_coalesced_total", endpoint=metrics.endpoint(url))
+
+
+def get_single_flight() -> SingleFlight:
+    """Get or create the SingleFlight shared by every fetch"""
+    global _flights
+    with _client_lock:
+        if _flights is None:
+            _flights = SingleFlight()
+        return _flights
+
+
+@contextmanager
+def cache_scope(maxsize: int = CACHE_MAXSIZE, ttl: float = CACHE_TTL) -> Iterator[FetchCache]:
+    """
+    Share fetched resources between every caller inside the block
+
+    Fetches are not cached outside a scope. Scopes nest; the previous
+    cache is restored on exit.
+
+    Args:
+        maxsize: Maximum number of cached resources
+        ttl: Seconds before a cached resource is fetched again
+
+    Yields:
+        The active FetchCache
+    """
+    global _cache
+    previous = _cache
+    _cache = FetchCache(maxsize=maxsize, ttl=ttl)
+    try:
+        yield _cache
+    finally:
+        _cache = previous
+
+
+def invalidate_cache(prefix: Optional[str] = None) -> int:
+    """
+    Drop entries from the active cache scope
+
+    Args:
+        prefix: Only drop resources whose path starts with this, e.g. "/posts"
+
+    Returns:
+        Number of entries dropped
+    """
+    if _cache is None:
+        return 0
+    return _cache.invalidate(prefix)
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Return hit/miss counts for the active cache scope"""
+    if _cache is None:
+        return {"hits": 0, "misses": 0, "size": 0}
+    return _cache.stats()
+
+
+def _cached(key: str, loader: Callable[[], Any]) -> Any:
+    """Route a fetch through the active cache scope, if any"""
+    if _cache is None:
+        return loader()
+    return _cache.get(key, loader)
+
+def enable_http_cache(path: str = HTTP_CACHE_PATH, max_bytes: int = HTTP_CACHE_MAX_BYTES) -> HttpCache:
+    """
+    Revalidate fetches with ETag/Last-Modified against an on-disk cache
+
+    Args:
+        path: SQLite file holding cached responses
+        max_bytes: Total body size kept before least recently used
+            responses are evicted
+
+    Returns:
+        The active HttpCache
+    """
+    global _http_cache
+    disable_http_cache()
+    _http_cache = HttpCache(path, max_bytes)
+    return _http_cache
+
+
+def disable_http_cache():
+    """Stop using and close the on-disk HTTP cache"""
+    global _http_cache
+    if _http_cache is not None:
+        _http_cache.close()
+        _http_cache = None
+
+
+def _cache_key(url: str, params: Optional[Dict[str, Any]]) -> str:
+    """Build the HTTP cache key for a request"""
+    return f"{url}?{urlencode(sorted(params.items()))}" if params else url
+
+
+def _conditional_headers(cached, headers: Optional[Dict[str, str]]) -> Dict[str, str]:
+    """Add If-None-Match/If-Modified-Since validators from a cached response"""
+    headers = dict(headers or {})
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
+    return headers
+
+
+def _needs_stdlib(body: bytes) -> bool:
+    """
+    Whether body may hold an integer wider than 64 bits
+
+    The fast parsers turn those into floats (or reject them), so such
+    bodies go to the stdlib. A run of 20 digits inside a string or a long
+    float triggers this as well, which only costs speed.
+    """
+    return body.translate(_DIGIT_CLASSES).find(_WIDE_INTEGER) != -1
+
+
+def _load_json_decoder(name: str) -> Callable[[bytes], Any]:
+    """Import one of JSON_DECODERS and return its bytes-to-value function"""
+    if name == "json":
+        return json.loads
+    if name == "orjson":
+        import orjson
+        fast, error = orjson.loads, orjson.JSONDecodeError
+    elif name == "msgspec":
+        import msgspec
+        fast, error = msgspec.json.Decoder().decode, msgspec.DecodeError
+    else:
+        raise ValueError(f"Unknown JSON decoder {name!r}, expected one of {JSON_DECODERS}")
+
+    def loads(body: bytes) -> Any:
+        if _needs_stdlib(body):
+            return json.loads(body)
+        try:
+            return fast(body)
+        except error:
+            # NaN and Infinity are valid for the stdlib but rejected by the
+            # fast parsers
+            return json.loads(body)
+
+    return loads
+
+
+def configure_json_decoder(name: Optional[str] = None) -> str:
+    """
+    Select the parser used for JSON response bodies
+
+    Bodies are parsed straight from bytes, without decoding them to text
+    first. Bodies the chosen parser rejects, or could lose precision on,
+    are parsed by the stdlib instead, so every decoder returns the same
+    result.
+
+    Args:
+        name: "orjson", "msgspec" or "json"; None picks the first of
+            JSON_DECODERS that is installed
+
+    Returns:
+        Name of the selected decoder
+
+    Raises:
+        ImportError: If the requested decoder is not installed
+    """
+    global _json_decoder, _json_loads
+    if name is None:
+        for candidate in JSON_DECODERS:
+            try:
+                loads = _load_json_decoder(candidate)
+            except ImportError:
+                continue
+            name = candidate
+            break
+    else:
+        loads = _load_json_decoder(name)
+    _json_decoder, _json_loads = name, loads
+    _record_decoders.clear()
+    return name
+
+
+def get_json_decoder() -> str:
+    """Return the name of the selected JSON decoder"""
+    return _json_decoder
+
+
+def decode_json(body: bytes) -> Any:
+    """
+    Parse a JSON response body with the selected decoder
+
+    Args:
+        body: Raw UTF-8 encoded body
+
+    Returns:
+        Decoded value
+    """
+    return _json_loads(body)
+
+
+def _project(items: Any, fields: Tuple[str, ...]) -> Any:
+    """Keep only fields in each object of a decoded array"""
+    if not isinstance(items, list):
+        return items
+    return [
+        {key: item[key] for key in fields if key in item} if isinstance(item, dict) else item
+        for item in items
+    ]
+
+
+def _record_decoder(fields: Tuple[str, ...]) -> Callable[[bytes], Any]:
+    """
+    Build a decoder of JSON arrays of objects that keeps only fields
+
+    With msgspec the array is decoded into a Struct type of just those
+    fields, so the others are skipped by the parser and never allocated.
+    Other decoders parse the whole body and drop them afterwards.
+    """
+    decode = _record_decoders.get(fields)
+    if decode is not None:
+        return decode
+
+    if _json_decoder == "msgspec":
+        import msgspec
+
+        record = msgspec.defstruct("Record", [(key, Any, msgspec.UNSET) for key in fields])
+        decoder = msgspec.json.Decoder(List[record])
+        unset = msgspec.UNSET
+
+        def decode(body: bytes) -> Any:
+            if _needs_stdlib(body):
+                return _project(json.loads(body), fields)
+            try:
+                records = decoder.decode(body)
+            except msgspec.DecodeError:
+                # Not an array of objects, or values only the stdlib accepts
+                return _project(_json_loads(body), fields)
+            return [
+                {key: value for key, value in zip(fields, msgspec.structs.astuple(r)) if value is not unset}
+                for r in records
+            ]
+    else:
+        def decode(body: bytes) -> Any:
+            return _project(_json_loads(body), fields)
+
+    return _record_decoders.setdefault(fields, decode)
+
+
+def _decode(url: str, decode: Callable[[], Any]) -> Any:
+    """Decode a response body, timing it when metrics are enabled"""
+    if not metrics.enabled():
+        return decode()
+    started = time.perf_counter()
+    value = decode()
+    metrics.observe("http_decode_seconds", time.perf_counter() - started, endpoint=metrics.endpoint(url))
+    return value
+
+
+def _get_json(url: str, params: Optional[Dict[str, Any]] = None,
+              headers: Optional[Dict[str, str]] = None,
+              fields: Optional[Tuple[str, ...]] = None, **kwargs) -> Any:
+    """
+    GET a JSON resource with the shared client, revalidating cached copies
+
+    Without an enabled HTTP cache this is a plain GET. With one, stored
+    validators are sent and a 304 reuses the cached body. Given fields,
+    an array body is decoded into objects holding only those fields.
+    Concurrent calls with the same arguments share one request and its
+    decoded value, see SingleFlight.
+    """
+    key = (
+        _cache_key(url, params),
+        tuple(sorted((headers or {}).items())),
+        None if fields is None else tuple(fields),
+        tuple(sorted(kwargs.items()))
+    )
+    return get_single_flight().do(key, lambda: _load_json(url, params, headers, fields, **kwargs), url)
+
+
+def _load_json(url: str, params: Optional[Dict[str, Any]],
+               headers: Optional[Dict[str, str]],
+               fields: Optional[Tuple[str, ...]], **kwargs) -> Any:
+    """Send the GET behind _get_json()"""
+    get = get_client().get
+    decode = _json_loads if fields is None else _record_decoder(tuple(fields))
+    request_kwargs = dict(kwargs)
+    if params is not None:
+        request_kwargs["params"] = params
+
+    if _http_cache is None:
+        if headers is not None:
+            request_kwargs["headers"] = headers
+        response = get(url, **request_kwargs)
+        response.raise_for_status()
+        body = response.content
+        return _decode(url, lambda: decode(body))
+
+    http_cache = _http_cache
+    key = _cache_key(url, params)
+    # Projections of one body are kept apart in the decoded-body memo
+    memo_key = key if fields is None else f"{key}#{','.join(fields)}"
+    cached = http_cache.lookup(key)
+    response = get(url, headers=_conditional_headers(cached, headers), **request_kwargs)
+    if response.status_code == 304 and cached is not None:
+        try:
+            return http_cache.decoded(key, cached, decode, memo_key)
+        except KeyError:
+            # Evicted since lookup(), fetch the body again
+            response = get(url, headers=_conditional_headers(None, headers), **request_kwargs)
+    response.raise_for_status()
+
+    body = response.content
+    value = _decode(url, lambda: decode(body))
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        http_cache.store(key, etag, last_modified, body)
+        http_cache.remember(memo_key, etag, last_modified, value, len(body))
+    return value
+
+
+def get_client() -> HttpClient:
+    """Get or create the shared HTTP client, with an adaptive rate limiter"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient(timeout=TIMEOUT, limiter=AdaptiveLimiter(POOL_MAXSIZE))
+        return _client
+
+
+def configure_client(**options) -> HttpClient:
+    """
+    Replace the shared HTTP client with a newly configured one
+
+    Args:
+        **options: HttpClient options, e.g. pool_maxsize, timeout, retries,
+            headers, keep_alive or http2; a new AdaptiveLimiter is used
+            unless limiter is given, and limiter=None disables limiting
+
+    Returns:
+        The new shared client
+    """
+    global _client
+    options.setdefault("timeout", TIMEOUT)
+    if "limiter" not in options:
+        options["limiter"] = AdaptiveLimiter(options.get("pool_maxsize", POOL_MAXSIZE))
+    client = HttpClient(**options)
+    with _client_lock:
+        previous, _client = _client, client
+    if previous is not None:
+        previous.close()
+    return client
 
 
 def fetch_all_users() -> List[Dict[str, Any]]:
     """
-    Fetch all users, with session
+    Fetch all users
     
     Returns:
         List of user dictionaries
     """
-    session = get_session()
-    response = session.get(f"{BASE_URL}/users")
-    response.raise_for_status()
-    return response.json()
+    def load():
+        return _get_json(f"{BASE_URL}/users")
+
+    return _cached("/users", load)
 
 
 def fetch_user(user_id: str) -> Dict[str, Any]:
     """
-    Fetch a single user by ID, with retry session
+    Fetch a single user by ID, retried by the shared client on
+    connection errors
     
     Args:
         user_id: User identifier
@@ -47,18 +599,10 @@ def fetch_user(user_id: str) -> Dict[str, Any]:
     Returns:
         User data dictionary
     """
-    session = requests.Session()
-    retry_strategy = Retry(total=1, backoff_factor=1)
-    adapter = HTTPAdapter(max_retries=retry_strategy)
-    session.mount("http://", adapter)
-    session.mount("https://", adapter)
-    
-    try:
-        response = session.get(f"{BASE_URL}/users/{user_id}", timeout=TIMEOUT)
-        response.raise_for_status()
-        return response.json()
-    finally:
-        session.close()
+    def load():
+        return _get_json(f"{BASE_URL}/users/{user_id}")
+
+    return _cached(f"/users/{user_id}", load)
 
 
 def fetch_all_posts() -> List[Dict[str, Any]]:
@@ -68,42 +612,371 @@ def fetch_all_posts() -> List[Dict[str, Any]]:
     Returns:
         List of all post dictionaries
     """
-    response = requests.get(
-        f"{BASE_URL}/posts",
-        headers = {
-            "Accept": "application/json",
-            "User-Agent": "DataHarvester/1.0"
-        },
-        timeout=TIMEOUT
-    )
-    response.raise_for_status()
-    return response.json()
+    def load():
+        return _get_json(f"{BASE_URL}/posts", headers=POSTS_HEADERS)
+
+    return _cached("/posts", load)
+
+
+def fetch_posts_by_user(user_id: str) -> List[Dict[str, Any]]:
+    """
+    Fetch only the posts written by one user, filtered by the API
+
+    Args:
+        user_id: User identifier
+
+    Returns:
+        List of the user's post dictionaries
+    """
+    def load():
+        return _get_json(f"{BASE_URL}/posts", params={"user_id": user_id}, headers=POSTS_HEADERS)
+
+    return _cached(f"/posts?user_id={user_id}", load)
+
+
+def iter_collection(
+    resource: str,
+    page_size: int = POSTS_PAGE_SIZE,
+    prefetch: bool = False,
+    headers: Optional[Dict[str, str]] = None,
+    start: int = 0,
+    fields: Optional[Tuple[str, ...]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream a json-server collection page by page
+
+    Pages are requested with _page/_limit, or with _start/_limit when
+    starting at an offset. Only one page (two with prefetch) is held in
+    memory at a time.
+
+    Args:
+        resource: Collection path, e.g. "/posts"
+        page_size: Number of items requested per page
+        prefetch: Fetch the next page in the background while the
+            current one is consumed
+        headers: Extra request headers
+        start: Number of leading items to skip
+        fields: Keep only these fields of each item, e.g.
+            records.POST_FIELDS
+
+    Yields:
+        Item dictionaries
+    """
+    def fetch_page(page: int) -> List[Dict[str, Any]]:
+        if start:
+            params = {"_start": start + (page - 1) * page_size, "_limit": page_size}
+        else:
+            params = {"_page": page, "_limit": page_size}
+        return _get_json(f"{BASE_URL}{resource}", params=params, headers=headers, fields=fields)
+
+    if not prefetch:
+        page = 1
+        while True:
+            items = fetch_page(page)
+            yield from items
+            if len(items) < page_size:
+                return
+            page += 1
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        page = 1
+        pending = executor.submit(fetch_page, page)
+        while True:
+            items = pending.result()
+            if len(items) < page_size:
+                yield from items
+                return
+            page += 1
+            pending = executor.submit(fetch_page, page)
+            yield from items
+
+
+def iter_posts(
+    page_size: int = POSTS_PAGE_SIZE,
+    prefetch: bool = False,
+    start: int = 0,
+    fields: Optional[Tuple[str, ...]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream all posts page by page, see iter_collection()
+
+    Args:
+        page_size: Number of posts requested per page
+        prefetch: Fetch the next page in the background while the
+            current one is consumed
+        start: Number of leading posts to skip
+        fields: Keep only these fields of each post, e.g.
+            records.POST_FIELDS
+
+    Yields:
+        Post dictionaries
+    """
+    return iter_collection("/posts", page_size, prefetch, POSTS_HEADERS, start, fields)
+
+
+def fetch_categories() -> List[Dict[str, Any]]:
+    """
+    Fetch all post categories
+
+    Returns:
+        List of category dictionaries
+    """
+    def load():
+        return _get_json(f"{BASE_URL}/categories")
+
+    return _cached("/categories", load)
+
+
+class JsonArrayParser:
+    """
+    Push parser for a JSON array arriving in byte chunks
+
+    Elements are decoded as soon as their bytes have arrived, and consumed
+    text is dropped from the buffer, so memory is bounded by the largest
+    single element rather than by the whole array. A small incomplete
+    element is simply decoded again when the next chunk arrives. Beyond
+    _JSON_SCAN_AFTER characters, new text is instead scanned for the
+    element's end (tracking nesting depth and strings, with their escapes)
+    from where the previous scan stopped, and the element is decoded once
+    that end has arrived, so parsing stays linear in the element's size.
+    """
+
+    def __init__(self, max_buffer: int = STREAM_MAX_BUFFER):
+        """
+        Args:
+            max_buffer: Maximum number of characters buffered for one
+                element
+        """
+        self.max_buffer = max_buffer
+        self.done = False
+        self._decoder = json.JSONDecoder()
+        self._text = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._state = "start"
+        # Where the scan of an incomplete element stopped, or None
+        self._scan: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+
+    def feed(self, chunk: bytes) -> Iterator[Any]:
+        """
+        Add a chunk, yielding the elements it completes
+
+        Exhaust the returned iterator before feeding the next chunk.
+
+        Raises:
+            ValueError: If the input is not a JSON array or an element
+                exceeds max_buffer
+        """
+        if self.done:
+            return iter(())
+        self._buffer += self._text.decode(chunk)
+        return self._parse(False)
+
+    def close(self) -> Iterator[Any]:
+        """
+        End the input, yielding any elements still buffered
+
+        Raises:
+            ValueError: If the array is truncated or malformed
+        """
+        if self.done:
+            return iter(())
+        self._buffer += self._text.decode(b"", final=True)
+        return self._parse(True)
+
+    def _parse(self, eof: bool) -> Iterator[Any]:
+        """Yield the complete elements of the buffer and drop their text"""
+        buffer = self._buffer
+        size = len(buffer)
+        raw_decode = self._decoder.raw_decode
+        state = self._state
+        pos = 0
+        try:
+            while True:
+                while pos < size and buffer[pos] in _JSON_WHITESPACE:
+                    pos += 1
+                if pos == size:
+                    break
+
+                if state == "start":
+                    if buffer[pos] != "[":
+                        raise ValueError("Expected a JSON array")
+                    pos += 1
+                    state = "first"
+                elif state != "value" and buffer[pos] == "]":
+                    self.done = True
+                    break
+                elif state == "separator":
+                    if buffer[pos] != ",":
+                        raise ValueError(f"Expected ',' or ']' in JSON array, got {buffer[pos]!r}")
+                    pos += 1
+                    state = "value"
+                else:
+                    if self._scan is not None and not eof and not self._scanned_to_end(buffer, pos):
+                        break
+                    try:
+                        value, end = raw_decode(buffer, pos)
+                    except json.JSONDecodeError:
+                        if eof or self._scan is not None:
+                            raise
+                        if size - pos < _JSON_SCAN_AFTER:
+                            break
+                        # Incomplete and large: scan for its end instead of
+                        # decoding it again with every chunk
+                        self._scan, self._depth, self._in_string = pos, 0, False
+                        if self._scanned_to_end(buffer, pos):
+                            raise
+                        break
+                    # A number cut off at the end of the buffer may continue
+                    # in the next chunk, e.g. "3" followed by ".5"
+                    if not eof and isinstance(value, (int, float)) and (
+                            end == size or buffer[end] in "0123456789.eE+-"):
+                        break
+                    self._scan = None
+                    state = "separator"
+                    pos = end
+                    yield value
+        finally:
+            self._state = state
+
+        self._buffer = buffer = buffer[pos:]
+        if self._scan is not None:
+            self._scan -= pos
+        if self.done:
+            return
+        if eof:
+            raise ValueError("Truncated JSON array")
+        if len(buffer) > self.max_buffer:
+            raise ValueError(f"JSON array element exceeds {self.max_buffer} characters")
+
+    def _scanned_to_end(self, buffer: str, start: int) -> bool:
+        """Continue scanning the element at start; True once its end has arrived"""
+        pos = self._scan
+        if buffer[start] not in '[{"':
+            match = _JSON_SCALAR_END.search(buffer, pos)
+            self._scan = len(buffer) if match is None else match.start()
+            return match is not None
+
+        depth, in_string = self._depth, self._in_string
+        complete = False
+        while True:
+            if in_string:
+                match = _JSON_STRING_SPECIAL.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                pos = match.start()
+                if buffer[pos] == "\\":
+                    if pos + 1 == len(buffer):
+                        break
+                    pos += 2
+                    continue
+                pos += 1
+                in_string = False
+            else:
+                match = _JSON_STRUCTURAL.search(buffer, pos)
+                if match is None:
+                    pos = len(buffer)
+                    break
+                pos = match.end()
+                char = match.group()
+                if char == '"':
+                    in_string = True
+                    continue
+                depth += 1 if char in "[{" else -1
+            if depth == 0:
+                complete = True
+                break
+        self._scan, self._depth, self._in_string = pos, depth, in_string
+        return complete
+
+
+def iter_json_array(chunks: Iterable[bytes], max_buffer: int = STREAM_MAX_BUFFER) -> Iterator[Any]:
+    """
+    Incrementally parse a JSON array from byte chunks, see JsonArrayParser
+
+    Args:
+        chunks: UTF-8 encoded pieces of a JSON array
+        max_buffer: Maximum number of characters buffered for one element
+
+    Yields:
+        Decoded array elements
+
+    Raises:
+        ValueError: If the input is not a JSON array, is truncated, or
+            an element exceeds max_buffer
+    """
+    parser = JsonArrayParser(max_buffer)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.done:
+            return
+    yield from parser.close()
 
 
 def fetch_comments(post_id: str) -> Iterator[Dict[str, Any]]:
     """
     Fetch comments for a specific post, with streaming
+
+    Comments are parsed incrementally and yielded as their bytes arrive.
     
     Args:
         post_id: Post identifier
         
-    Returns:
-        List of comment dictionaries
+    Yields:
+        Comment dictionaries
     """
-    response = requests.get(f"{BASE_URL}/posts/{post_id}/comments", stream=True)
-    response.raise_for_status()
+    url = f"{BASE_URL}/posts/{post_id}/comments"
+    client = get_client()
+    if _http_cache is None:
+        response = client.get(url, stream=True)
+        try:
+            response.raise_for_status()
+            yield from iter_json_array(client.iter_bytes(response, STREAM_CHUNK_SIZE))
+        finally:
+            response.close()
+        return
 
-    # Accumulate chunks
-    chunks = []
-    for chunk in response.iter_content(chunk_size=512):
-        if chunk:
-            chunks.append(chunk)
+    http_cache = _http_cache
+    cached = http_cache.lookup(url)
+    response = client.get(url, headers=_conditional_headers(cached, None), stream=True)
+    try:
+        if response.status_code == 304 and cached is not None:
+            try:
+                comments = http_cache.decoded(url, cached, decode_json)
+            except KeyError:
+                # Evicted since lookup(), fetch the body again
+                response.close()
+                response = client.get(url, headers=_conditional_headers(None, None), stream=True)
+            else:
+                yield from comments
+                return
+        response.raise_for_status()
+
+        # Keep a copy of the body for the cache only while it stays small,
+        # so large threads still stream in bounded memory
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        body = [] if etag or last_modified else None
+        size = 0
 
-    # Parse complete response and yield individual comments
-    content = b''.join(chunks).decode('utf-8')
-    comments = json.loads(content)
-    for comment in comments:
-        yield comment
+        def tee(chunks):
+            nonlocal body, size
+            for chunk in chunks:
+                if body is not None:
+                    size += len(chunk)
+                    if size <= HTTP_CACHE_MAX_STREAM_BYTES:
+                        body.append(chunk)
+                    else:
+                        body = None
+                yield chunk
+
+        yield from iter_json_array(tee(client.iter_bytes(response, STREAM_CHUNK_SIZE)))
+        if body is not None:
+            http_cache.store(url, etag, last_modified, b"".join(body))
+    finally:
+        response.close()
 
 
 def post_comment(post_id: str, author: str, content: str) -> Dict[str, Any]:
@@ -118,16 +991,113 @@ def post_comment(post_id: str, author: str, content: str) -> Dict[str, Any]:
     Returns:
         Created comment data
     """
-    response = requests.post(
+    response = get_client().post(
         f"{BASE_URL}/comments",
         json={"post_id": post_id, "author": author, "content": content},
-        headers={"Content-Type": "application/json; charset=utf-8"},
-        timeout=TIMEOUT
+        headers={"Content-Type": "application/json; charset=utf-8"}
     )
     response.raise_for_status()
     return response.json()
 
 
+def _post_comment_once(item: Tuple[str, str, str], retries: int, backoff: float) -> Dict[str, Any]:
+    """
+    Create one comment, retrying transient failures without duplicating it
+
+    The comment gets a client-generated ID. Before resending after an
+    ambiguous failure, that ID is looked up, so a comment the server
+    already stored is reported as created instead of posted twice.
+    """
+    post_id, author, content = item
+    comment_id = uuid.uuid4().hex
+    client = get_client()
+    body = {"id": comment_id, "post_id": post_id, "author": author, "content": content}
+    result = {"post_id": post_id, "id": comment_id, "ok": False, "attempts": 0}
+
+    for attempt in range(retries + 1):
+        if attempt:
+            time.sleep(backoff * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+            try:
+                existing = client.get(f"{BASE_URL}/comments/{comment_id}")
+                if existing.status_code == 200:
+                    result.update(ok=True, comment=existing.json())
+                    return result
+            except client.errors:
+                pass
+
+        result["attempts"] = attempt + 1
+        try:
+            response = client.post(
+                f"{BASE_URL}/comments",
+                json=body,
+                headers={"Content-Type": "application/json; charset=utf-8"}
+            )
+        except client.errors as e:
+            result["error"] = str(e)
+            continue
+
+        if response.status_code in RETRYABLE_STATUSES:
+            result["error"] = f"HTTP {response.status_code}"
+            continue
+        try:
+            response.raise_for_status()
+        except client.errors as e:
+            result["error"] = str(e)
+            return result
+        result.pop("error", None)
+        result.update(ok=True, comment=response.json())
+        return result
+
+    return result
+
+
+def post_comments(
+    items: Iterable[Tuple[str, str, str]],
+    concurrency: int = BULK_CONCURRENCY,
+    retries: int = BULK_RETRIES,
+    backoff: float = BULK_BACKOFF
+) -> Iterator[Dict[str, Any]]:
+    """
+    Post many comments over the pooled client with bounded concurrency
+
+    Items are read lazily and results are yielded as requests complete,
+    so neither side is held in memory. Transient failures (connection
+    errors and 429/5xx responses) are retried with jittered exponential
+    backoff; a retry never creates a duplicate comment.
+
+    Args:
+        items: (post_id, author, content) tuples
+        concurrency: Maximum number of requests in flight
+        retries: Retries per comment after the first attempt
+        backoff: Base delay in seconds before the first retry
+
+    Yields:
+        Per-item report with index, post_id, id, ok, attempts and either
+        the created comment or an error message, in completion order
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        running = {}
+        index = 0
+        exhausted = False
+        while True:
+            while not exhausted and len(running) < concurrency:
+                item = next(items, None)
+                if item is None:
+                    exhausted = True
+                    break
+                running[executor.submit(_post_comment_once, item, retries, backoff)] = index
+                index += 1
+            if not running:
+                return
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                result = future.result()
+                result["index"] = running.pop(future)
+                yield result
+
+
 def check_api_status() -> bool:
     """
     Check if the API is responding
@@ -135,15 +1105,36 @@ def check_api_status() -> bool:
     Returns:
         True if API is healthy, False otherwise
     """
+    client = get_client()
     try:
-        response = requests.get(f"{BASE_URL}/users", timeout=5)
+        response = client.get(f"{BASE_URL}/users", timeout=5)
         return response.status_code == 200
-    except requests.exceptions.RequestException:
+    except client.errors:
         return False
 
-def close_session():
-    """Close and clean up global session"""
-    global _session
-    if _session is not None:
-        _session.close()
-        _session = None
+def close_client():
+    """Close and clean up the shared HTTP client"""
+    global _client
+    with _client_lock:
+        previous, _client = _client, None
+    if previous is not None:
+        previous.close()
+
+
+def get_session():
+    """
+    Get the session of the shared HTTP client
+
+    Deprecated: use get_client(), whose requests go through its rate limiter.
+
+    Returns:
+        The shared requests.Session, or httpx.Client when http2 is enabled
+    """
+    return get_client().transport
+
+
+# Deprecated alias of close_client()
+close_session = close_client
+
+
+configure_json_decoder()
@@ -0,0 +1,272 @@
+"""
+Asynchronous API client module built on a shared httpx.AsyncClient
+
+Every request goes through the adaptive rate limiter of the shared
+src.api_client client, so async and threaded fetches are paced together.
+"""
+
+import asyncio
+import weakref
+import httpx
+from contextlib import asynccontextmanager
+from typing import Dict, Any, List, Iterable, AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+from src.api_client import (
+    BASE_URL,
+    TIMEOUT,
+    STREAM_CHUNK_SIZE,
+    JsonArrayParser,
+    decode_json,
+    get_client,
+    get_single_flight
+)
+from src.ratelimit import backoff_delay
+
+CONCURRENCY = 20
+
+T = TypeVar("T")
+
+# One client per event loop; entries go away with their loop
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """
+    Get or create the async client shared within the running event loop
+
+    Pooled connections belong to the loop that opened them, so every loop,
+    e.g. every asyncio.run(), gets its own client. Call
+    close_async_client() before the loop ends to close its connections
+    right away.
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        limits = httpx.Limits(max_connections=CONCURRENCY, max_keepalive_connections=CONCURRENCY)
+        # Requests queued behind a full pool wait for a free connection
+        timeout = httpx.Timeout(TIMEOUT, pool=None)
+        client = _clients[loop] = httpx.AsyncClient(base_url=BASE_URL, timeout=timeout, limits=limits)
+    return client
+
+
+async def close_async_client():
+    """Close and clean up the running event loop's async client"""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+@asynccontextmanager
+async def _limited(request: httpx.Request, idempotent: bool = True) -> AsyncIterator[httpx.Response]:
+    """
+    Send a request under the shared rate limiter, see HttpClient
+
+    The response is streamed and keeps its limiter permit until the block
+    ends, so bodies still being read count against the concurrency limit.
+    Idempotent requests answered with 429 or one of the shared client's
+    retry statuses are retried after a jittered backoff.
+    """
+    client = get_async_client()
+    shared = get_client()
+    limiter = shared.limiter
+    attempts = shared.retries + 1 if idempotent and limiter is not None else 1
+    for number in range(attempts):
+        started = await limiter.acquire_async() if limiter is not None else None
+        try:
+            response = await client.send(request, stream=True)
+        except BaseException:
+            if limiter is not None:
+                limiter.release(started)
+            raise
+        if number + 1 < attempts and response.status_code in shared.retry_statuses:
+            shared.release_permit(started, response)
+            await response.aclose()
+            await asyncio.sleep(backoff_delay(number, shared.backoff_factor))
+            continue
+        try:
+            yield response
+        finally:
+            await response.aclose()
+            if limiter is not None:
+                shared.release_permit(started, response)
+        return
+
+
+async def _get_json(path: str, headers: Optional[Dict[str, str]] = None) -> Any:
+    """
+    GET a JSON resource; concurrent calls for the same path in one event
+    loop share one request and its decoded value, see SingleFlight
+    """
+    async def load():
+        request = get_async_client().build_request("GET", path, headers=headers)
+        async with _limited(request) as response:
+            response.raise_for_status()
+            return decode_json(await response.aread())
+
+    key = (path, tuple(sorted((headers or {}).items())))
+    return await get_single_flight().do_async(key, load, f"{BASE_URL}{path}")
+
+
+async def fetch_all_users() -> List[Dict[str, Any]]:
+    """
+    Fetch all users
+
+    Returns:
+        List of user dictionaries
+    """
+    return await _get_json("/users")
+
+
+async def fetch_user(user_id: str) -> Dict[str, Any]:
+    """
+    Fetch a single user by ID
+
+    Args:
+        user_id: User identifier
+
+    Returns:
+        User data dictionary
+    """
+    return await _get_json(f"/users/{user_id}")
+
+
+async def fetch_all_posts() -> List[Dict[str, Any]]:
+    """
+    Fetch all posts from the API
+
+    Returns:
+        List of all post dictionaries
+    """
+    return await _get_json(
+        "/posts",
+        headers={
+            "Accept": "application/json",
+            "User-Agent": "DataHarvester/1.0"
+        }
+    )
+
+
+async def fetch_comments(post_id: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Fetch comments for a specific post, with streaming
+
+    The body is parsed incrementally, see JsonArrayParser, so each comment
+    is yielded as soon as it has arrived.
+
+    Args:
+        post_id: Post identifier
+
+    Yields:
+        Comment dictionaries
+    """
+    parser = JsonArrayParser()
+    request = get_async_client().build_request("GET", f"/posts/{post_id}/comments")
+    async with _limited(request) as response:
+        response.raise_for_status()
+        async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+            for comment in parser.feed(chunk):
+                yield comment
+            if parser.done:
+                break
+
+    for comment in parser.close():
+        yield comment
+
+
+async def post_comment(post_id: str, author: str, content: str) -> Dict[str, Any]:
+    """
+    Post a new comment to a post
+
+    Args:
+        post_id: Post identifier
+        author: Comment author name
+        content: Comment content
+
+    Returns:
+        Created comment data
+    """
+    request = get_async_client().build_request(
+        "POST",
+        "/comments",
+        json={"post_id": post_id, "author": author, "content": content}
+    )
+    async with _limited(request, idempotent=False) as response:
+        response.raise_for_status()
+        return decode_json(await response.aread())
+
+
+async def gather_limited(
+    func: Callable[[Any], Awaitable[T]],
+    items: Iterable[Any],
+    concurrency: int = CONCURRENCY
+) -> List[T]:
+    """
+    Run func over items with at most `concurrency` calls in flight
+
+    Only `concurrency` tasks exist at any time, so large inputs do not
+    create one task per item up front.
+
+    Args:
+        func: Coroutine function taking one item
+        items: Inputs to fan out over
+        concurrency: Maximum number of concurrent calls
+
+    Returns:
+        Results in the same order as items
+    """
+    items = list(items)
+    results = [None] * len(items)
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < len(items):
+            index = next_index
+            next_index += 1
+            results[index] = await func(items[index])
+
+    workers = [asyncio.create_task(worker()) for _ in range(min(concurrency, len(items)))]
+    try:
+        await asyncio.gather(*workers)
+    except BaseException:
+        for task in workers:
+            task.cancel()
+        raise
+    return results
+
+
+async def fetch_users(user_ids: Iterable[str], concurrency: int = CONCURRENCY) -> List[Dict[str, Any]]:
+    """
+    Fetch many users concurrently
+
+    Args:
+        user_ids: User identifiers
+        concurrency: Maximum number of requests in flight
+
+    Returns:
+        User dictionaries in the same order as user_ids
+    """
+    return await gather_limited(fetch_user, user_ids, concurrency)
+
+
+async def fetch_comments_for_posts(
+    post_ids: Iterable[str],
+    concurrency: int = CONCURRENCY
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Fetch the comments of many posts concurrently
+
+    Args:
+        post_ids: Post identifiers
+        concurrency: Maximum number of requests in flight
+
+    Returns:
+        Mapping of post ID to its list of comments
+    """
+    post_ids = list(post_ids)
+
+    async def collect(post_id: str) -> List[Dict[str, Any]]:
+        return [comment async for comment in fetch_comments(post_id)]
+
+    comments = await gather_limited(collect, post_ids, concurrency)
+    return dict(zip(post_ids, comments))
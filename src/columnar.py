@@ -0,0 +1,260 @@
+"""
+Columnar report backend that computes analyses with pandas
+
+Posts are loaded into a DataFrame once and the user and category reports
+are derived from column operations; engagement trends stay on the
+streamed row-wise path, see analyzer.analyze_engagement_trends(). CSV
+output is byte-identical to the row-wise tablib path in analyzer and
+dashboard. int64 columns are summed by numpy; float, bool and other
+object columns are summed in order with Python semantics, as the row-wise
+path does, since numpy sums floats pairwise and skips NaN. Integers
+outside int64, or whose sums could overflow it, are kept as Python ints
+in object columns, so their totals stay exact.
+"""
+
+import numpy as np
+import pandas as pd
+from array import array
+from typing import Dict, Any, Iterable, Optional, Tuple
+
+from src.aggregation import RunningStats, exact_mean
+from src.export import atomic_open, output_path, write_arrow_table
+from src.records import PostTable
+
+CSV_LINE_TERMINATOR = "\r\n"
+
+_INT64 = np.iinfo(np.int64)
+
+# Placeholder for absent fields, distinct from an explicit null
+_MISSING = object()
+
+
+def _column(posts: Any, key: str, default: Any) -> pd.Series:
+    """
+    Build one column, keeping Python value formatting for mixed types
+
+    Uniformly int or float columns get a native dtype; anything else stays
+    object so each value is written to CSV exactly as tablib would.
+    """
+    if isinstance(posts, PostTable):
+        values = posts.column(key, default)
+        if isinstance(values, array):
+            return pd.Series(np.frombuffer(values, dtype=np.int64), copy=True)
+    else:
+        values = [post.get(key, default) for post in posts]
+    types = set(map(type, values))
+    if types == {int} and _INT64.min <= min(values) and max(values) <= _INT64.max:
+        return pd.Series(values, dtype=np.int64)
+    if types == {float}:
+        return pd.Series(values, dtype=np.float64)
+    return pd.Series(values, dtype=object)
+
+
+def _summable(column: pd.Series) -> pd.Series:
+    """Switch an int64 column to Python ints if a sum of it could overflow"""
+    if column.dtype != np.int64 or column.empty:
+        return column
+    bound = max(abs(int(column.min())), abs(int(column.max()))) * len(column)
+    return column.astype(object) if bound > _INT64.max else column
+
+
+def posts_frame(posts: Iterable[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Load posts into a DataFrame with the columns the reports use
+
+    Missing fields get the same defaults as the row-wise reports; absent
+    titles are filled in per report.
+
+    Args:
+        posts: Post dictionaries or a PostTable, whose columns are used
+            without rebuilding the posts
+
+    Returns:
+        DataFrame with id, user_id, title, likes, views and category columns
+    """
+    posts = posts if isinstance(posts, (list, PostTable)) else list(posts)
+    return pd.DataFrame({
+        "id": _column(posts, "id", ""),
+        "user_id": _column(posts, "user_id", None),
+        "title": _column(posts, "title", _MISSING),
+        "likes": _summable(_column(posts, "likes", 0)),
+        "views": _summable(_column(posts, "views", 0)),
+        "category": _column(posts, "category", "Uncategorized"),
+    })
+
+
+def _fill_missing(column: pd.Series, default) -> pd.Series:
+    """Replace absent values with default(row_number)"""
+    if column.dtype != object:
+        return column
+    values = column.tolist()
+    return pd.Series([default(i) if value is _MISSING else value for i, value in enumerate(values)], dtype=object)
+
+
+def user_posts_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build one user's post table sorted by likes, descending
+
+    Args:
+        frame: The user's posts loaded with posts_frame()
+
+    Returns:
+        DataFrame with post_index, title, likes, views and category
+    """
+    index = pd.RangeIndex(len(frame))
+    titles = _fill_missing(frame["title"], lambda i: f"Post {i}")
+    table = pd.DataFrame({
+        "post_index": index,
+        "title": titles,
+        "likes": frame["likes"],
+        "views": frame["views"],
+        "category": frame["category"],
+    })
+    if table["likes"].dtype == np.int64:
+        return table.sort_values("likes", ascending=False, kind="stable")
+    # Sort other likes with Python's comparisons, so NaN lands where the
+    # row-wise path's list.sort() puts it
+    likes = table["likes"].tolist()
+    return table.iloc[sorted(range(len(likes)), key=likes.__getitem__, reverse=True)]
+
+
+def _group_sums(grouped, column: pd.Series, counts: list) -> list:
+    """
+    Per-group (total, mean) pairs with the row-wise path's semantics
+
+    int64 groups are summed by numpy, which is exact for them; any other
+    dtype goes through column_stats(), so float totals, NaN and bools come
+    out exactly as the row-wise report computes them.
+    """
+    if column.dtype == np.int64:
+        totals = grouped[column.name].sum().tolist()
+        return [(total, exact_mean(total, count)) for total, count in zip(totals, counts)]
+    return [column_stats(pd.Series(values, dtype=object)) for values in grouped[column.name].agg(list)]
+
+
+def category_performance_frame(frame: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]:
+    """
+    Group posts by category and compute counts, totals and means
+
+    Args:
+        frame: Posts loaded with posts_frame()
+
+    Returns:
+        Tuple of the category performance table and per-category stats
+    """
+    grouped = frame.groupby("category", sort=False, dropna=False)
+    sizes = grouped.size()
+    counts = sizes.tolist()
+    # groupby turns a None category into NaN
+    categories = [None if pd.isna(cat) else cat for cat in sizes.index.tolist()]
+
+    rows = []
+    category_stats = {}
+    for cat, post_count, (total_likes, avg_likes), (total_views, avg_views) in zip(
+        categories,
+        counts,
+        _group_sums(grouped, frame["likes"], counts),
+        _group_sums(grouped, frame["views"], counts)
+    ):
+        stats = {
+            "post_count": post_count,
+            "avg_likes": avg_likes,
+            "avg_views": avg_views,
+            "total_likes": total_likes,
+            "total_views": total_views
+        }
+        category_stats[cat] = stats
+        rows.append([
+            cat,
+            post_count,
+            round(stats["avg_likes"], 2),
+            round(stats["avg_views"], 2),
+            total_likes,
+            total_views
+        ])
+
+    table = pd.DataFrame(rows, columns=['category', 'post_count', 'avg_likes', 'avg_views', 'total_likes', 'total_views'],
+                         dtype=object)
+    return table, category_stats
+
+
+def column_stats(column: pd.Series) -> Tuple[Any, Any]:
+    """
+    Total and mean of a column as plain Python numbers
+
+    Computed like RunningStats on the row-wise path: int64 columns are
+    summed by numpy, others in row order with Python semantics.
+
+    Args:
+        column: Numeric column
+
+    Returns:
+        Tuple of the column total and its mean, see exact_mean()
+    """
+    if column.dtype == np.int64:
+        total = column.sum().item()
+        return total, exact_mean(total, len(column))
+    stats = RunningStats()
+    for value in column.tolist():
+        stats.add(value)
+    return stats.total, stats.mean
+
+
+def _nan_as_text(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Spell NaN floats "nan", as csv.writer does
+
+    to_csv() writes every missing value as an empty field, which is right
+    for None but not for NaN.
+    """
+    replaced = {}
+    for name in frame.columns:
+        column = frame[name]
+        missing = np.flatnonzero(column.isna().to_numpy())
+        if not len(missing):
+            continue
+        values = column.astype(object).tolist()
+        for i in missing.tolist():
+            if isinstance(values[i], float):
+                values[i] = "nan"
+        replaced[name] = pd.Series(values, index=column.index, dtype=object)
+    return frame.assign(**replaced) if replaced else frame
+
+
+def write_csv(frame: pd.DataFrame, path: str, compress: bool = False, buffer_size: Optional[int] = None) -> str:
+    """
+    Write a report table as CSV in the same format as tablib's export
+
+    Args:
+        frame: Report table
+        path: Output file path
+        compress: Gzip the output and append .gz to the path
+        buffer_size: Write buffer size in bytes, see src.export
+
+    Returns:
+        Path to the written file
+    """
+    path = output_path(path, compress)
+    with atomic_open(path, compress, buffer_size) as csvfile:
+        _nan_as_text(frame).to_csv(csvfile, index=False, lineterminator=CSV_LINE_TERMINATOR)
+    return path
+
+
+def write_table(frame: pd.DataFrame, path: str, compress: bool = False, export_format: str = "csv") -> str:
+    """
+    Write a report table in the requested export format
+
+    Args:
+        frame: Report table
+        path: CSV output path; Parquet and Arrow exports replace the
+            extension, see src.export.columnar_path()
+        compress: Gzip CSV output, or compress Arrow IPC record batches
+        export_format: One of src.export.EXPORT_FORMATS
+
+    Returns:
+        Path to the written file
+    """
+    if export_format == "csv":
+        return write_csv(frame, path, compress)
+    import pyarrow as pa
+    return write_arrow_table(pa.Table.from_pandas(frame, preserve_index=False), path, export_format, compress)
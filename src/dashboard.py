@@ -2,106 +2,153 @@
 Dashboard module for generating comprehensive reports and visualizations
 """
 
-import tablib
-import json
-import os
-import statistics
-from typing import Dict, Any
-from src.api_client import fetch_user, fetch_all_users, fetch_all_posts
+from typing import Dict, Any, Iterable, List, Optional
+from src.aggregation import GroupStats, PostAggregates, aggregate_posts
+from src.analyzer import analyze_user_activity, load_backend
+from src.api_client import fetch_user, fetch_all_users, fetch_all_posts, fetch_posts_by_user
+from src.export import ReportWriter, check_export_format, write_csv, write_json, write_table
+from src.metrics import timed
 
+REPORTS_DIR = 'reports'
 
-def generate_overview_dashboard() -> Dict[str, Any]:
+OVERVIEW_HEADERS = ['metric', 'value']
+CATEGORY_HEADERS = ['category', 'post_count', 'avg_likes', 'avg_views', 'total_likes', 'total_views']
+DISTRIBUTION_HEADERS = ['p50_likes', 'p90_likes', 'p99_likes', 'p50_views', 'p90_views', 'p99_views']
+
+
+def generate_overview_dashboard(
+    aggregates: Optional[PostAggregates] = None,
+    compress: bool = False,
+    source: Optional[Any] = None
+) -> Dict[str, Any]:
     """
     Generate a dashboard with overview statistics and data exports
     
+    Args:
+        aggregates: Precomputed post aggregates shared with other reports;
+            computed from fetch_all_posts() if omitted
+        compress: Write a gzip-compressed .csv.gz file
+        source: Data source with api_client-style fetch methods, e.g. a
+            SnapshotStore; the live API if omitted
+
     Returns:
         Dashboard data with CSV file paths
     """
     # Fetch data
-    users = fetch_all_users()
-    posts = fetch_all_posts()
+    with timed("generate_overview_dashboard", "fetch"):
+        users = source.fetch_all_users() if source is not None else fetch_all_users()
+        if aggregates is None:
+            posts = source.iter_posts() if source is not None else fetch_all_posts()
+    if aggregates is None:
+        with timed("generate_overview_dashboard", "aggregate"):
+            aggregates = aggregate_posts(posts, users=False)
+    post_count = aggregates.post_count
     
     # Calculate metrics
     dashboard = {
         "total_users": len(users),
-        "total_posts": len(posts),
-        "avg_posts_per_user": len(posts) / len(users) if users else 0
+        "total_posts": post_count,
+        "avg_posts_per_user": post_count / len(users) if users else 0
     }
     
-    # Create data for overview metrics
-    overview_dataset = tablib.Dataset()
-    overview_dataset.headers = ['metric', 'value', 'type']
-    overview_dataset.append(['Total Users', dashboard["total_users"], 'count'])
-    overview_dataset.append(['Total Posts', dashboard["total_posts"], 'count'])
-    overview_dataset.append(['Avg Posts/User', round(dashboard["avg_posts_per_user"], 2), 'average'])
-
-    # Select only metric and value columns for export
-    export_dataset = tablib.Dataset()
-    export_dataset.headers = ['metric', 'value']
-    for row in overview_dataset:
-        export_dataset.append([row[0], row[1]])
+    # Create data for overview metrics (metric and value columns)
+    overview_rows = [
+        ['Total Users', dashboard["total_users"]],
+        ['Total Posts', dashboard["total_posts"]],
+        ['Avg Posts/User', round(dashboard["avg_posts_per_user"], 2)]
+    ]
     
     # Export CSV file
-    overview_csv = 'data/overview_metrics.csv'
-    os.makedirs('data', exist_ok=True)
-    with open(overview_csv, 'w', encoding='utf-8') as csvfile:
-        csvfile.write(export_dataset.export('csv'))
+    with timed("generate_overview_dashboard", "export"):
+        overview_csv = write_csv('data/overview_metrics.csv', OVERVIEW_HEADERS, overview_rows, compress)
     
     dashboard['overview_path'] = overview_csv
     
     return dashboard
 
 
-def generate_category_report() -> Dict[str, Any]:
+def generate_category_report(
+    posts: Optional[Iterable[Dict[str, Any]]] = None,
+    aggregates: Optional[PostAggregates] = None,
+    backend: str = "python",
+    compress: bool = False,
+    source: Optional[Any] = None,
+    distribution: bool = False,
+    export_format: str = "csv"
+) -> Dict[str, Any]:
     """
     Generate report analyzing posts by category
     
+    Args:
+        posts: Posts to analyze, e.g. a lazy iter_posts() stream;
+            fetched with fetch_all_posts() if omitted
+        aggregates: Precomputed post aggregates shared with other reports,
+            used instead of posts
+        backend: "python" or "pandas", see load_backend(); only applies
+            when aggregating posts without distributions
+        compress: Write a gzip-compressed .csv.gz file
+        source: Data source with api_client-style fetch methods, e.g. a
+            SnapshotStore; the live API if omitted
+        distribution: Add likes and views medians, p90/p99 and histograms
+            per category, from fixed-size sketches; aggregates must then be
+            computed with distributions=True
+        export_format: "csv", "parquet" or "arrow", see src.export
+
     Returns:
-        Category analysis report with CSV data
+        Category analysis report with the export path
     """
-    # Fetch data
-    posts = fetch_all_posts()
-    
-    # Aggregate by category
-    category_data = {}
-    for post in posts:
-        cat = post.get("category", "Uncategorized")
-        if cat not in category_data:
-            category_data[cat] = {"likes": [], "views": [], "post_count": 0}
-        
-        category_data[cat]["likes"].append(post.get("likes", 0))
-        category_data[cat]["views"].append(post.get("views", 0))
-        category_data[cat]["post_count"] += 1
-    
-    # Calculate averages
-    performance_dataset = tablib.Dataset()
-    performance_dataset.headers = ['category', 'post_count', 'avg_likes', 'avg_views', 'total_likes', 'total_views']
-    
-    category_stats = {}
-    for cat, data in category_data.items():
-        stats = {
-            "post_count": data["post_count"],
-            "avg_likes": statistics.mean(data["likes"]) if data["likes"] else 0,
-            "avg_views": statistics.mean(data["views"]) if data["views"] else 0,
-            "total_likes": sum(data["likes"]),
-            "total_views": sum(data["views"])
+    columnar = load_backend(backend)
+    check_export_format(export_format)
+    performance_csv = 'data/category_performance.csv'
+    if distribution and aggregates is not None and not aggregates.distributions:
+        raise ValueError("aggregates were computed without distributions")
+
+    if aggregates is None and posts is None:
+        with timed("generate_category_report", "fetch"):
+            posts = source.iter_posts() if source is not None else fetch_all_posts()
+
+    if aggregates is None and columnar is not None and not distribution:
+        with timed("generate_category_report", "aggregate"):
+            table, category_stats = columnar.category_performance_frame(columnar.posts_frame(posts))
+        with timed("generate_category_report", "export"):
+            performance_csv = columnar.write_table(table, performance_csv, compress, export_format)
+        return {
+            "categories": category_stats,
+            "path": performance_csv
         }
-        category_stats[cat] = stats
-
-        performance_dataset.append([
-            cat,
-            stats['post_count'],
-            round(stats['avg_likes'], 2),
-            round(stats['avg_views'], 2),
-            stats['total_likes'],
-            stats['total_views']
-        ])
+
+    # Aggregate by category
+    with timed("generate_category_report", "aggregate"):
+        if aggregates is None:
+            aggregates = aggregate_posts(posts, distributions=distribution, users=False)
+
+        # Summarize each category
+        performance_rows = []
+        category_stats = {}
+        for cat, group in aggregates.categories.items():
+            stats = group.summary()
+            if not distribution:
+                stats.pop("likes_distribution", None)
+                stats.pop("views_distribution", None)
+            category_stats[cat] = stats
+
+            row = [
+                cat,
+                stats['post_count'],
+                round(stats['avg_likes'], 2),
+                round(stats['avg_views'], 2),
+                stats['total_likes'],
+                stats['total_views']
+            ]
+            if distribution:
+                for key in ('likes_distribution', 'views_distribution'):
+                    row.extend(stats[key][q] for q in ('p50', 'p90', 'p99'))
+            performance_rows.append(row)
     
     # Export CSV file
-    performance_csv = 'data/category_performance.csv'
-    os.makedirs('data', exist_ok=True)
-    with open(performance_csv, 'w', encoding='utf-8') as csvfile:
-        csvfile.write(performance_dataset.export('csv'))
+    headers = CATEGORY_HEADERS + DISTRIBUTION_HEADERS if distribution else CATEGORY_HEADERS
+    with timed("generate_category_report", "export"):
+        performance_csv = write_table(performance_csv, headers, performance_rows, compress, export_format)
     
     report = {
         "categories": category_stats,
@@ -111,26 +158,41 @@ def generate_category_report() -> Dict[str, Any]:
     return report
 
 
-def generate_user_report(user_id: str) -> Dict[str, Any]:
+def generate_user_report(
+    user_id: str,
+    posts: Optional[List[Dict[str, Any]]] = None,
+    source: Optional[Any] = None,
+    distribution: bool = False
+) -> Dict[str, Any]:
     """
     Generate detailed report for a specific user
     
     Args:
         user_id: User identifier
+        posts: The user's posts, e.g. from index_posts_by_user(); fetched
+            with fetch_posts_by_user() if omitted
+        source: Data source with api_client-style fetch methods, e.g. a
+            SnapshotStore; the live API if omitted
+        distribution: Add likes and views medians, p90/p99 and histograms,
+            see generate_category_report()
         
     Returns:
         User report with statistics and path to existing CSV file
     """
-    from src.analyzer import analyze_user_activity
+    if distribution and posts is None:
+        with timed("generate_user_report", "fetch"):
+            posts = source.fetch_posts_by_user(user_id) if source is not None else fetch_posts_by_user(user_id)
 
     # Get data from analysis
-    analysis = analyze_user_activity(user_id)
+    analysis = analyze_user_activity(user_id, posts, source=source)
+    with timed("generate_user_report", "fetch"):
+        user = source.fetch_user(user_id) if source is not None else fetch_user(user_id)
     if "error" in analysis:
-        return {"user": fetch_user(user_id), "post_count": 0}
+        return {"user": user, "post_count": 0}
     
     # Repackage the analysis results in report format
     report = {
-        "user": fetch_user(user_id),
+        "user": user,
         "post_count": analysis["total_posts"],
         "path": analysis["path"],
         "total_likes": analysis["total_likes"],
@@ -138,25 +200,50 @@ def generate_user_report(user_id: str) -> Dict[str, Any]:
         "avg_likes": analysis["avg_likes"],
         "avg_views": analysis["avg_views"]
     }
+
+    if distribution:
+        with timed("generate_user_report", "aggregate"):
+            stats = GroupStats(distributions=True)
+            for post in posts:
+                stats.add(post)
+            report["likes_distribution"] = stats.likes_distribution.summary()
+            report["views_distribution"] = stats.views_distribution.summary()
     
     return report
 
 
-def save_report_json(report_data: Dict[str, Any], filename: str) -> str:
+def save_report_json(report_data: Dict[str, Any], filename: str, mode: str = "pretty", compress: bool = False) -> str:
     """
     Save report data to JSON file
+
+    The file is written atomically, so readers never see a partial report.
     
     Args:
         report_data: Report data to save
         filename: Output filename
+        mode: "pretty", "compact" or "ndjson", see src.export.dumps_json()
+        compress: Gzip the output and append .gz to the path
         
     Returns:
         Path to saved file
     """
-    os.makedirs('reports', exist_ok=True)
-    filepath = f'reports/{filename}'
-    
-    with open(filepath, 'w') as f:
-        json.dump(report_data, f, indent=2)
-    
-    return filepath
+    with timed("save_report_json", "export"):
+        return write_json(f'{REPORTS_DIR}/{filename}', report_data, mode, compress)
+
+
+def save_reports_ndjson(reports: Iterable[Dict[str, Any]], filename: str, compress: bool = False) -> str:
+    """
+    Save many reports as one newline-delimited JSON file, one per line
+
+    Args:
+        reports: Report data to save, e.g. a generator of user reports
+        filename: Output filename, e.g. "user_reports.ndjson"
+        compress: Gzip the output and append .gz to the path
+
+    Returns:
+        Path to saved file
+    """
+    with timed("save_reports_ndjson", "export"), ReportWriter(f'{REPORTS_DIR}/{filename}', compress) as writer:
+        for report in reports:
+            writer.write(report)
+    return writer.path
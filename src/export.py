@@ -0,0 +1,395 @@
+"""
+Export module for streaming report data to disk
+
+Reports are written as CSV by default. Parquet and Arrow IPC exports
+("parquet", "arrow") store typed columns that readers can column-prune or
+memory-map; they need the optional pyarrow package.
+"""
+
+import csv
+import gzip
+import io
+import json
+import math
+import os
+import threading
+import uuid
+from contextlib import contextmanager, ExitStack
+from typing import Any, BinaryIO, Iterable, Iterator, List, Optional, Sequence, TextIO, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+CSV_BUFFER_SIZE = 64 * 1024
+EXPORT_FORMATS = ("csv", "parquet", "arrow")
+COLUMNAR_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+# Rows converted to Arrow at a time, so Python row lists never pile up
+ARROW_BATCH_SIZE = 64 * 1024
+PARQUET_COMPRESSION = "zstd"
+ARROW_COMPRESSION = "lz4"
+# "pretty" is indented, "compact" and "ndjson" are single-line
+JSON_MODES = ("pretty", "compact", "ndjson")
+
+
+def check_export_format(export_format: str):
+    """
+    Validate an export format name
+
+    Args:
+        export_format: One of EXPORT_FORMATS
+
+    Raises:
+        ValueError: If the format is unknown
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format!r}")
+
+
+def output_path(path: str, compress: bool = False) -> str:
+    """
+    Return the final path of an export, with .gz appended when compressed
+
+    Args:
+        path: Uncompressed output path
+        compress: Whether the export is gzip-compressed
+
+    Returns:
+        Output file path
+    """
+    return f"{path}.gz" if compress and not path.endswith(".gz") else path
+
+
+def columnar_path(path: str, export_format: str) -> str:
+    """
+    Return the path of a Parquet or Arrow export of a CSV report
+
+    Args:
+        path: CSV output path, e.g. "data/engagement_trends.csv"
+        export_format: "parquet" or "arrow"
+
+    Returns:
+        Same path with the format's extension, e.g.
+        "data/engagement_trends.parquet"
+    """
+    return os.path.splitext(path)[0] + COLUMNAR_EXTENSIONS[export_format]
+
+
+@contextmanager
+def atomic_path(path: str) -> Iterator[str]:
+    """
+    Yield a temporary path that is renamed over path once fully written
+
+    For writers that open files themselves; see atomic_open().
+
+    Args:
+        path: Final file path
+
+    Yields:
+        Temporary path in the same directory
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+@contextmanager
+def atomic_open(
+    path: str,
+    compress: bool = False,
+    buffer_size: Optional[int] = None,
+    binary: bool = False
+) -> Iterator[Union[TextIO, BinaryIO]]:
+    """
+    Open a UTF-8 text file that only appears at path once fully written
+
+    Data goes to a temporary file in the same directory, which is renamed
+    over path when the block exits cleanly and removed if it raises.
+    Newlines are written as given.
+
+    Args:
+        path: Final file path
+        compress: Gzip the output
+        buffer_size: Write buffer size in bytes, CSV_BUFFER_SIZE if None
+        binary: Yield a byte stream instead of a text stream
+
+    Yields:
+        Writable text (or byte) stream
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+
+    raw = open(tmp_path, 'xb', buffering=buffer_size or CSV_BUFFER_SIZE)
+    try:
+        stream = gzip.GzipFile(fileobj=raw, mode='wb', mtime=0) if compress else raw
+        if not binary:
+            stream = io.TextIOWrapper(stream, encoding='utf-8', newline='')
+        yield stream
+        stream.close()
+        if compress:
+            raw.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        raw.close()
+        os.remove(tmp_path)
+        raise
+
+
+def write_csv(
+    path: str,
+    headers: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    compress: bool = False,
+    buffer_size: Optional[int] = None
+) -> str:
+    """
+    Stream rows to a CSV file as they are produced
+
+    Output matches tablib's CSV export byte for byte. Rows are consumed
+    lazily, so a generator keeps memory flat regardless of row count.
+
+    Args:
+        path: Output file path
+        headers: Column names
+        rows: Row sequences, e.g. a generator
+        compress: Gzip the output and append .gz to the path
+        buffer_size: Write buffer size in bytes, CSV_BUFFER_SIZE if None
+
+    Returns:
+        Path to the written file
+    """
+    path = output_path(path, compress)
+    with atomic_open(path, compress, buffer_size) as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        writer.writerows(rows)
+    return path
+
+
+def write_arrow_table(table, path: str, export_format: str, compress: bool = False) -> str:
+    """
+    Atomically write a pyarrow Table as Parquet or Arrow IPC
+
+    Parquet is always compressed (PARQUET_COMPRESSION). Arrow IPC files
+    are left uncompressed so they can be memory-mapped, unless compress
+    is set (ARROW_COMPRESSION).
+
+    Args:
+        table: pyarrow.Table
+        path: CSV output path; the extension is replaced, see columnar_path()
+        export_format: "parquet" or "arrow"
+        compress: Compress Arrow IPC record batches
+
+    Returns:
+        Path to the written file
+    """
+    path = columnar_path(path, export_format)
+    with atomic_path(path) as tmp_path:
+        if export_format == "parquet":
+            import pyarrow.parquet as pq
+            pq.write_table(table, tmp_path, compression=PARQUET_COMPRESSION)
+        else:
+            import pyarrow.feather as feather
+            feather.write_feather(table, tmp_path, compression=ARROW_COMPRESSION if compress else "uncompressed")
+    return path
+
+
+def write_columnar(
+    path: str,
+    headers: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    export_format: str,
+    compress: bool = False
+) -> str:
+    """
+    Write rows as a typed Parquet or Arrow IPC file
+
+    Rows are converted to Arrow columns ARROW_BATCH_SIZE at a time, so
+    only compact column buffers are held until the file is written. Column
+    types are inferred from the values; a column mixing ints and floats
+    becomes float64 and None becomes null.
+
+    Args:
+        path: CSV output path; the extension is replaced, see columnar_path()
+        headers: Column names
+        rows: Row sequences, e.g. a generator
+        export_format: "parquet" or "arrow"
+        compress: Compress Arrow IPC record batches
+
+    Returns:
+        Path to the written file
+    """
+    import pyarrow as pa
+
+    def to_table(batch: List[Sequence[Any]]):
+        columns = zip(*batch) if batch else [()] * len(headers)
+        return pa.Table.from_arrays([pa.array(list(column)) for column in columns], names=list(headers))
+
+    tables = []
+    batch: List[Sequence[Any]] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == ARROW_BATCH_SIZE:
+            tables.append(to_table(batch))
+            batch = []
+    if batch or not tables:
+        tables.append(to_table(batch))
+    table = pa.concat_tables(tables, promote_options="permissive")
+    return write_arrow_table(table, path, export_format, compress)
+
+
+def write_table(
+    path: str,
+    headers: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    compress: bool = False,
+    export_format: str = "csv"
+) -> str:
+    """
+    Write rows in the requested export format
+
+    Args:
+        path: CSV output path; Parquet and Arrow exports replace the
+            extension, see columnar_path()
+        headers: Column names
+        rows: Row sequences, e.g. a generator
+        compress: Gzip CSV output, or compress Arrow IPC record batches
+        export_format: One of EXPORT_FORMATS
+
+    Returns:
+        Path to the written file
+    """
+    check_export_format(export_format)
+    if export_format == "csv":
+        return write_csv(path, headers, rows, compress)
+    return write_columnar(path, headers, rows, export_format, compress)
+
+
+def _non_finite(value: Any) -> bool:
+    """Return True if value holds a NaN or infinite float at any depth"""
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_non_finite(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return any(_non_finite(item) for item in value)
+    return False
+
+
+def dumps_json(value: Any, mode: str = "compact") -> bytes:
+    """
+    Serialize a report to UTF-8 JSON
+
+    "pretty" gives exactly the bytes json.dump(value, f, indent=2) always
+    wrote. "compact" and "ndjson" use orjson when it is installed: non-ASCII
+    text is kept as is, non-string keys become strings and floats may be
+    spelled differently from json.dumps (1e16 instead of 1e+16), but both
+    parse to the same values. Values orjson would change or can't handle
+    fall back to the stdlib: NaN and Infinity, which orjson writes as null,
+    and integers wider than 64 bits.
+
+    Args:
+        value: JSON-compatible report data
+        mode: "pretty" for two-space indentation, "compact" or "ndjson"
+            for a single line
+
+    Returns:
+        Encoded JSON, without a trailing newline
+    """
+    if mode not in JSON_MODES:
+        raise ValueError(f"Unknown JSON mode: {mode!r}")
+    if mode == "pretty":
+        return json.dumps(value, indent=2).encode("utf-8")
+    if orjson is not None:
+        try:
+            data = orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+        else:
+            # Only a null in the output can hide a non-finite float
+            if b"null" not in data or not _non_finite(value):
+                return data
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def write_json(path: str, value: Any, mode: str = "pretty", compress: bool = False) -> str:
+    """
+    Atomically write one report as a JSON file
+
+    Args:
+        path: Output file path
+        value: JSON-compatible report data
+        mode: One of JSON_MODES; "pretty" files end without a newline,
+            as they always have, "compact" and "ndjson" ones with one
+        compress: Gzip the output and append .gz to the path
+
+    Returns:
+        Path to the written file
+    """
+    data = dumps_json(value, mode)
+    if mode != "pretty":
+        data += b"\n"
+    path = output_path(path, compress)
+    with atomic_open(path, compress, binary=True) as f:
+        f.write(data)
+    return path
+
+
+class ReportWriter:
+    """
+    Newline-delimited JSON file that many reports are appended to
+
+    Every write() adds one compact line, so thousands of reports cost one
+    file instead of one file each. The file is written to a temporary path
+    and only appears at its final path on close(); if the writer is used
+    as a context manager and the block raises, nothing is left behind.
+    write() may be called from several threads.
+    """
+
+    def __init__(self, path: str, compress: bool = False, buffer_size: Optional[int] = None):
+        """
+        Args:
+            path: Final file path, e.g. "reports/user_reports.ndjson"
+            compress: Gzip the output and append .gz to the path
+            buffer_size: Write buffer size in bytes, CSV_BUFFER_SIZE if None
+        """
+        self.path = output_path(path, compress)
+        self.count = 0
+        self._lock = threading.Lock()
+        self._stack = ExitStack()
+        self._file = self._stack.enter_context(atomic_open(self.path, compress, buffer_size, binary=True))
+
+    def write(self, report: Any):
+        """Append one report as a line"""
+        line = dumps_json(report, "ndjson") + b"\n"
+        with self._lock:
+            self._file.write(line)
+            self.count += 1
+
+    def close(self) -> str:
+        """
+        Finish the file and move it into place
+
+        Returns:
+            Path to the written file
+        """
+        self._stack.close()
+        return self.path
+
+    def __enter__(self) -> "ReportWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        # Passes the exception into atomic_open(), which removes the temporary file
+        self._stack.__exit__(exc_type, exc, traceback)
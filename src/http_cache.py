@@ -0,0 +1,228 @@
+"""
+Persistent HTTP response cache for conditional requests, stored in SQLite
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+HTTP_CACHE_PATH = ".cache/http_cache.sqlite"
+HTTP_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Body bytes whose decoded values are kept in memory; a decoded body takes
+# a few times the size of its JSON
+DECODED_MAX_BYTES = 8 * 1024 * 1024
+# Access times buffered before they are written in one transaction
+TOUCH_BATCH = 1000
+
+
+class CachedResponse(NamedTuple):
+    """Validators of a stored response; its body is only read after a 304"""
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+
+class HttpCache:
+    """
+    Size-bounded on-disk store of response bodies keyed by request URL
+
+    lookup() reads just the validators, so a request the server answers
+    with 200 never reads the stored body. Entries are evicted least
+    recently used first once the total body size exceeds max_bytes; the
+    access times of bodies served after a 304 are buffered and written in
+    batches. Decoded bodies are also kept in memory up to
+    DECODED_MAX_BYTES, so a 304 revalidation within one process usually
+    skips the download, the body read and the JSON decode.
+    """
+
+    def __init__(self, path: str = HTTP_CACHE_PATH, max_bytes: int = HTTP_CACHE_MAX_BYTES,
+                 decoded_max_bytes: int = DECODED_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.decoded_max_bytes = decoded_max_bytes
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        # url -> ((etag, last_modified), value, body size)
+        self._decoded = OrderedDict()
+        self._decoded_bytes = 0
+        # url -> access time not yet written
+        self._touched: Dict[str, float] = {}
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, "
+            "body BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._db.commit()
+
+    def lookup(self, url: str) -> Optional[CachedResponse]:
+        """
+        Return the validators stored for url, without reading its body
+
+        Args:
+            url: Request URL including query string
+
+        Returns:
+            The cached validators, or None
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT etag, last_modified FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        return None if row is None else CachedResponse(row[0], row[1])
+
+    def load(self, url: str) -> Optional[bytes]:
+        """
+        Read the stored body for url, marking it recently used
+
+        Args:
+            url: Request URL including query string
+
+        Returns:
+            Raw response body, or None if it has been evicted
+        """
+        with self._lock:
+            row = self._db.execute("SELECT body FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            self._touch(url)
+        return bytes(row[0])
+
+    def _touch(self, url: str):
+        """Buffer an access time; call with the lock held"""
+        self._touched[url] = time.time()
+        if len(self._touched) >= TOUCH_BATCH:
+            self._flush_touched()
+            self._db.commit()
+
+    def _flush_touched(self):
+        """Write buffered access times; call with the lock held"""
+        if self._touched:
+            self._db.executemany(
+                "UPDATE responses SET accessed = ? WHERE url = ?",
+                [(accessed, url) for url, accessed in self._touched.items()]
+            )
+            self._touched.clear()
+
+    def store(self, url: str, etag: Optional[str], last_modified: Optional[str], body: bytes):
+        """
+        Save a response body and evict old entries beyond max_bytes
+
+        Args:
+            url: Request URL including query string
+            etag: ETag response header
+            last_modified: Last-Modified response header
+            body: Raw response body
+        """
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._flush_touched()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, len(body), time.time())
+            )
+            total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                for old_url, size in self._db.execute(
+                    "SELECT url, size FROM responses ORDER BY accessed"
+                ).fetchall():
+                    if total <= self.max_bytes:
+                        break
+                    self._db.execute("DELETE FROM responses WHERE url = ?", (old_url,))
+                    total -= size
+            self._db.commit()
+
+    def decoded(self, url: str, cached: CachedResponse, decode: Callable[[bytes], Any] = json.loads,
+                memo_key: Optional[str] = None) -> Any:
+        """
+        Return the decoded body of a cached response after a 304
+
+        Each stored version is decoded at most once per process while it
+        stays in the in-memory memo.
+
+        Args:
+            url: Request URL including query string
+            cached: Validators returned by lookup()
+            decode: Body decoder
+            memo_key: Memo key, if url's body is decoded in several ways
+
+        Returns:
+            Decoded body
+
+        Raises:
+            KeyError: The body was evicted since lookup()
+        """
+        memo_key = url if memo_key is None else memo_key
+        with self._lock:
+            entry = self._decoded.get(memo_key)
+            if entry is not None and entry[0] == tuple(cached):
+                self.not_modified += 1
+                self._decoded.move_to_end(memo_key)
+                self._touch(url)
+                return entry[1]
+        body = self.load(url)
+        if body is None:
+            raise KeyError(url)
+        with self._lock:
+            self.not_modified += 1
+        value = decode(body)
+        self.remember(memo_key, cached.etag, cached.last_modified, value, len(body))
+        return value
+
+    def remember(self, url: str, etag: Optional[str], last_modified: Optional[str], value: Any, size: int):
+        """
+        Keep a decoded body in memory for later 304 revalidations
+
+        Least recently used values are dropped once the bodies they were
+        decoded from exceed decoded_max_bytes.
+
+        Args:
+            url: Memo key, usually the request URL
+            etag: ETag of the body
+            last_modified: Last-Modified of the body
+            value: Decoded body
+            size: Size of the raw body in bytes
+        """
+        with self._lock:
+            previous = self._decoded.pop(url, None)
+            if previous is not None:
+                self._decoded_bytes -= previous[2]
+            if size > self.decoded_max_bytes:
+                return
+            self._decoded[url] = ((etag, last_modified), value, size)
+            self._decoded_bytes += size
+            while self._decoded_bytes > self.decoded_max_bytes:
+                self._decoded_bytes -= self._decoded.popitem(last=False)[1][2]
+
+    def stats(self) -> Dict[str, int]:
+        """Return entry count, stored bytes and number of 304 responses served"""
+        with self._lock:
+            count, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        return {"entries": count, "bytes": size, "not_modified": self.not_modified}
+
+    def clear(self):
+        """Remove every stored response"""
+        with self._lock:
+            self._touched.clear()
+            self._db.execute("DELETE FROM responses")
+            self._db.commit()
+            self._decoded.clear()
+            self._decoded_bytes = 0
+
+    def close(self):
+        """Write buffered access times and close the database connection"""
+        with self._lock:
+            self._flush_touched()
+            self._db.commit()
+            self._db.close()
@@ -0,0 +1,287 @@
+"""
+HTTP client module with one pooled, configurable transport for src.api_client
+"""
+
+import requests
+import threading
+import time
+import weakref
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Any, Callable, Iterator, Optional, Tuple, Type
+
+from src import metrics
+from src.ratelimit import AdaptiveLimiter, THROTTLE_STATUSES, backoff_delay, parse_retry_after
+
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 20
+TIMEOUT = 3
+RETRIES = 1
+BACKOFF_FACTOR = 1.0
+RETRY_STATUSES = (502, 503, 504)
+
+DEFAULT_HEADERS = {
+    "User-Agent": "DataHarvester/1.0"
+}
+
+
+class HttpClient:
+    """
+    A single pooled HTTP transport shared by every request of a process
+
+    The transport is a requests.Session by default, or an httpx.Client when
+    http2 is enabled (which needs the optional h2 package). Connections are
+    kept alive and reused across calls and threads. Idempotent requests are
+    retried on connection errors and, with requests, on retry_statuses;
+    POSTs are never retried by the transport.
+
+    With a limiter, every request waits for its permit, and GETs answered
+    with 429 or one of retry_statuses are retried here rather than by the
+    transport, after a jittered backoff and any Retry-After pause, so the
+    limiter sees each throttled attempt. Streamed responses hold their
+    permit until their body has been read with iter_bytes().
+
+    When metrics are enabled, every request records its count, status,
+    latency and response bytes per endpoint, see src.metrics.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = POOL_CONNECTIONS,
+        pool_maxsize: int = POOL_MAXSIZE,
+        timeout: float = TIMEOUT,
+        retries: int = RETRIES,
+        backoff_factor: float = BACKOFF_FACTOR,
+        retry_statuses: Tuple[int, ...] = RETRY_STATUSES,
+        headers: Optional[Dict[str, str]] = None,
+        keep_alive: bool = True,
+        http2: bool = False,
+        limiter: Optional[AdaptiveLimiter] = None
+    ):
+        self.timeout = timeout
+        self.http2 = http2
+        self.limiter = limiter
+        # Permits of streamed responses whose bodies are still being read
+        self._permits: "weakref.WeakKeyDictionary[Any, weakref.finalize]" = weakref.WeakKeyDictionary()
+        self._permits_lock = threading.Lock()
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.retry_statuses = tuple(sorted(set(retry_statuses) | {429}))
+        if limiter is not None:
+            # Status retries move out of the transport into _limited()
+            retry_statuses = ()
+        headers = {**DEFAULT_HEADERS, **(headers or {})}
+        if not keep_alive:
+            headers["Connection"] = "close"
+
+        if http2:
+            import httpx
+
+            limits = httpx.Limits(
+                max_connections=pool_maxsize,
+                max_keepalive_connections=pool_maxsize if keep_alive else 0
+            )
+            self._transport = httpx.Client(
+                http2=True,
+                limits=limits,
+                timeout=timeout,
+                headers=headers,
+                transport=httpx.HTTPTransport(http2=True, limits=limits, retries=retries)
+            )
+            self.errors: Tuple[Type[Exception], ...] = (httpx.HTTPError,)
+        else:
+            retry = Retry(
+                total=retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=retry_statuses,
+                allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+                raise_on_status=False
+            )
+            adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+            self._transport = requests.Session()
+            self._transport.headers.update(headers)
+            self._transport.mount("http://", adapter)
+            self._transport.mount("https://", adapter)
+            self.errors = (requests.exceptions.RequestException,)
+
+    def get(
+        self,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        stream: bool = False,
+        timeout: Optional[float] = None
+    ):
+        """
+        Send a GET request
+
+        Args:
+            url: Absolute request URL
+            params: Query parameters
+            headers: Headers added to the client's defaults
+            stream: Return before the body is read; read it with
+                iter_bytes() and close the response afterwards
+            timeout: Override of the client timeout in seconds
+
+        Returns:
+            requests.Response or httpx.Response
+        """
+        timeout = self.timeout if timeout is None else timeout
+        if not self.http2:
+            send = lambda: self._transport.get(url, params=params, headers=headers, stream=stream, timeout=timeout)
+        else:
+            request = self._transport.build_request("GET", url, params=params, headers=headers, timeout=timeout)
+            send = lambda: self._transport.send(request, stream=stream)
+        return self._send("GET", url, send, stream, True)
+
+    def post(
+        self,
+        url: str,
+        json: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Optional[float] = None
+    ):
+        """
+        Send a POST request with a JSON body
+
+        Args:
+            url: Absolute request URL
+            json: Body, encoded as JSON
+            headers: Headers added to the client's defaults
+            timeout: Override of the client timeout in seconds
+
+        Returns:
+            requests.Response or httpx.Response
+        """
+        timeout = self.timeout if timeout is None else timeout
+        send = lambda: self._transport.post(url, json=json, headers=headers, timeout=timeout)
+        return self._send("POST", url, send, False, False)
+
+    def _send(self, method: str, url: str, send: Callable[[], Any], stream: bool, idempotent: bool):
+        """Send a request through the limiter, if any, recording metrics when enabled"""
+        if metrics.enabled():
+            attempt = lambda: self._record(method, url, send, stream)
+        else:
+            attempt = send
+        if self.limiter is None:
+            return attempt()
+        return self._limited(attempt, stream, idempotent)
+
+    def _limited(self, attempt: Callable[[], Any], stream: bool, idempotent: bool):
+        """
+        Send with a limiter permit per attempt, retrying idempotent requests
+        on retry_statuses
+
+        A streamed response keeps its permit until iter_bytes() has read
+        its body, so bodies still being read count against the concurrency
+        limit.
+        """
+        attempts = self.retries + 1 if idempotent else 1
+        for number in range(attempts):
+            started = self.limiter.acquire()
+            try:
+                response = attempt()
+            except BaseException:
+                self.limiter.release(started)
+                raise
+            if number + 1 < attempts and response.status_code in self.retry_statuses:
+                self.release_permit(started, response)
+                response.close()
+                time.sleep(backoff_delay(number, self.backoff_factor))
+                continue
+            if not stream:
+                self.release_permit(started, response)
+                return response
+            # Released by iter_bytes(), or when the response is collected
+            # if its body is never read
+            permit = weakref.finalize(response, self.limiter.release, started, *self._throttling(response))
+            with self._permits_lock:
+                self._permits[response] = permit
+            return response
+
+    def release_permit(self, started: float, response: Any):
+        """
+        Return the limiter permit of a request, reporting throttling and
+        Retry-After from its response
+
+        Args:
+            started: Value returned by the limiter's acquire()
+            response: Response the request received
+        """
+        self.limiter.release(started, *self._throttling(response))
+
+    def _throttling(self, response: Any) -> Tuple[bool, Optional[float]]:
+        """Whether a response is throttled, and its Retry-After in seconds"""
+        status = response.status_code
+        retry_after = None
+        if status in THROTTLE_STATUSES or status in self.retry_statuses:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+        return status in THROTTLE_STATUSES, retry_after
+
+    def _record(self, method: str, url: str, send: Callable[[], Any], stream: bool):
+        """Send a request and record its metrics; streamed bodies are counted in iter_bytes()"""
+        route = metrics.endpoint(url)
+        started = time.perf_counter()
+        try:
+            response = send()
+        except self.errors:
+            metrics.increment("http_requests_total", method=method, endpoint=route, status="error")
+            raise
+        finally:
+            metrics.observe("http_request_duration_seconds", time.perf_counter() - started, method=method, endpoint=route)
+        metrics.increment("http_requests_total", method=method, endpoint=route, status=response.status_code)
+        if not stream:
+            metrics.increment("http_response_bytes_total", len(response.content), method=method, endpoint=route)
+        return response
+
+    def iter_bytes(self, response, chunk_size: int) -> Iterator[bytes]:
+        """
+        Read a streamed response body in chunks
+
+        Args:
+            response: Response from get(..., stream=True)
+            chunk_size: Bytes per chunk
+
+        Returns:
+            Iterator of body chunks
+        """
+        if self.http2:
+            chunks = response.iter_bytes(chunk_size)
+        else:
+            chunks = response.iter_content(chunk_size=chunk_size)
+        if metrics.enabled():
+            chunks = self._count_bytes(chunks, metrics.endpoint(str(response.url)))
+        if self._permits:
+            with self._permits_lock:
+                permit = self._permits.pop(response, None)
+            if permit is not None:
+                chunks = self._release_after(chunks, permit)
+        return chunks
+
+    @staticmethod
+    def _release_after(chunks: Iterator[bytes], permit: Callable[[], Any]) -> Iterator[bytes]:
+        """Pass chunks through, returning the limiter permit once the body is read"""
+        try:
+            yield from chunks
+        finally:
+            permit()
+
+    @staticmethod
+    def _count_bytes(chunks: Iterator[bytes], route: str) -> Iterator[bytes]:
+        """Pass chunks through, recording how many bytes were read"""
+        size = 0
+        try:
+            for chunk in chunks:
+                size += len(chunk)
+                yield chunk
+        finally:
+            metrics.increment("http_response_bytes_total", size, method="GET", endpoint=route)
+
+    @property
+    def transport(self):
+        """The underlying requests.Session, or httpx.Client with http2"""
+        return self._transport
+
+    def close(self):
+        """Close every pooled connection"""
+        self._transport.close()
@@ -0,0 +1,294 @@
+"""
+Incremental aggregation module that folds only new or changed posts into
+persisted accumulators
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from typing import Dict, Any, Iterable, Optional, Set, Tuple
+
+from src import api_client
+from src.aggregation import GroupStats, PostAggregates, RunningStats
+
+AGGREGATES_STATE_PATH = "data/aggregates_state.sqlite"
+STATE_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY, value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS posts (
+    id TEXT PRIMARY KEY, fingerprint TEXT NOT NULL, contribution TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS groups (
+    seq INTEGER PRIMARY KEY, kind TEXT NOT NULL, key TEXT NOT NULL, data TEXT NOT NULL,
+    UNIQUE (kind, key)
+);
+"""
+
+
+def post_fingerprint(post: Dict[str, Any]) -> str:
+    """
+    Hash a post's content
+
+    Args:
+        post: Post dictionary
+
+    Returns:
+        Short hex digest that changes whenever any field changes
+    """
+    encoded = json.dumps(post, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+def _contribution(post: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields of a post that aggregates depend on, kept for retraction"""
+    contribution = {"user_id": post.get("user_id"), "likes": post.get("likes", 0), "views": post.get("views", 0)}
+    if "category" in post:
+        contribution["category"] = post["category"]
+    return contribution
+
+
+def _group_keys(post: Dict[str, Any]) -> Tuple[Tuple[str, Any], Tuple[str, Any]]:
+    """The (kind, key) of the user and category groups a post belongs to"""
+    return ("users", post.get("user_id")), ("categories", post.get("category", "Uncategorized"))
+
+
+class IncrementalAggregates:
+    """
+    Post aggregates plus the state needed to update them incrementally
+
+    The state lives in SQLite: a watermark (how many posts of the
+    collection have been seen, and the last post ID), one row per group of
+    the aggregates, and one row per post with a content hash and the values
+    it contributed. Post rows are looked up by ID as posts arrive, never
+    loaded as a whole, and save() only writes the posts and groups that
+    changed, so a run costs O(changes) plus O(groups) to load the
+    aggregates. New posts are folded in; edited posts have their old
+    values retracted first. Deleted posts are retracted by a full scan,
+    which also runs whenever the post before the watermark is no longer
+    the last one seen, e.g. because earlier posts were deleted and the
+    collection shifted.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: SQLite state file; None keeps the state in memory
+        """
+        self.path = path
+        self.aggregates = PostAggregates(engagement=True)
+        self.offset = 0
+        self.last_post_id = None
+
+        if path is not None:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path or ":memory:")
+        self._db.executescript(_SCHEMA)
+        # Groups touched since the last save, new ones in creation order,
+        # and the groups created meanwhile
+        self._dirty: Dict[Tuple[str, Any], None] = {}
+        self._created: Set[Tuple[str, Any]] = set()
+
+    def upsert(self, post: Dict[str, Any]) -> str:
+        """
+        Fold one post in, retracting its previous version if it changed
+
+        Args:
+            post: Post dictionary with an 'id' field
+
+        Returns:
+            "new", "changed" or "unchanged"
+        """
+        post_id = str(post.get("id"))
+        fingerprint = post_fingerprint(post)
+        previous = self._db.execute(
+            "SELECT fingerprint, contribution FROM posts WHERE id = ?", (post_id,)
+        ).fetchone()
+        if previous is not None and previous[0] == fingerprint:
+            return "unchanged"
+
+        if previous is not None:
+            old = json.loads(previous[1])
+            self.aggregates.remove(old)
+            self._dirty.update(dict.fromkeys(_group_keys(old)))
+        for kind, key in _group_keys(post):
+            if key not in getattr(self.aggregates, kind):
+                self._created.add((kind, key))
+                self._dirty.pop((kind, key), None)
+            self._dirty[kind, key] = None
+        self.aggregates.add(post)
+        self._db.execute(
+            "INSERT OR REPLACE INTO posts VALUES (?, ?, ?)",
+            (post_id, fingerprint, json.dumps(_contribution(post), separators=(",", ":")))
+        )
+        return "changed" if previous is not None else "new"
+
+    def refresh(
+        self,
+        changed_posts: Optional[Iterable[Dict[str, Any]]] = None,
+        full_scan: bool = False,
+        page_size: int = api_client.POSTS_PAGE_SIZE
+    ) -> Dict[str, int]:
+        """
+        Bring the aggregates up to date
+
+        By default only posts past the watermark are fetched, after checking
+        that the post just before it is still the last one seen. Edited
+        posts are picked up from changed_posts, or by a full_scan that
+        re-reads the whole collection but only re-aggregates posts whose
+        hash changed, and retracts posts that are gone. A watermark that no
+        longer holds triggers a full scan.
+
+        Args:
+            changed_posts: Posts known to be new or edited since the last run
+            full_scan: Re-read every post and compare content hashes
+            page_size: Page size for the streamed collection
+
+        Returns:
+            Number of new, changed and unchanged posts seen, and of
+            deleted posts retracted
+        """
+        counts = {"new": 0, "changed": 0, "unchanged": 0, "deleted": 0}
+        for post in changed_posts or ():
+            counts[self.upsert(post)] += 1
+
+        if not full_scan and not self._watermark_holds():
+            full_scan = True
+        if not full_scan:
+            for post in api_client.iter_posts(page_size=page_size, start=self.offset):
+                counts[self.upsert(post)] += 1
+                self.offset += 1
+                self.last_post_id = post.get("id")
+            return counts
+
+        # Remember every ID of the scan, so posts gone from the collection
+        # can be retracted afterwards
+        self._db.execute("CREATE TEMP TABLE IF NOT EXISTS seen (id TEXT PRIMARY KEY)")
+        self._db.execute("DELETE FROM seen")
+        self.offset, self.last_post_id = 0, None
+        for post in api_client.iter_posts(page_size=page_size):
+            counts[self.upsert(post)] += 1
+            self._db.execute("INSERT OR IGNORE INTO seen VALUES (?)", (str(post.get("id")),))
+            self.offset += 1
+            self.last_post_id = post.get("id")
+        counts["deleted"] = self._retract_unseen()
+        return counts
+
+    def _watermark_holds(self) -> bool:
+        """Check that the post before the watermark is still the last one seen"""
+        if not self.offset:
+            return True
+        posts = api_client.iter_posts(page_size=1, start=self.offset - 1)
+        post = next(iter(posts), None)
+        if hasattr(posts, "close"):
+            posts.close()
+        return post is not None and post.get("id") == self.last_post_id
+
+    def _retract_unseen(self) -> int:
+        """Retract and forget stored posts missing from the last full scan"""
+        rows = self._db.execute(
+            "SELECT id, contribution FROM posts WHERE id NOT IN (SELECT id FROM seen)"
+        ).fetchall()
+        for post_id, contribution in rows:
+            old = json.loads(contribution)
+            self.aggregates.remove(old)
+            self._dirty.update(dict.fromkeys(_group_keys(old)))
+            self._db.execute("DELETE FROM posts WHERE id = ?", (post_id,))
+        self._db.execute("DELETE FROM seen")
+        return len(rows)
+
+    def save(self):
+        """Commit the changed posts and groups and the watermark in one transaction"""
+        meta = {
+            "version": STATE_VERSION,
+            "offset": self.offset,
+            "last_post_id": self.last_post_id,
+            "distributions": self.aggregates.distributions,
+            "engagement": self.aggregates.engagement.to_list()
+        }
+        with self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                ((key, json.dumps(value)) for key, value in meta.items())
+            )
+            for kind, key in self._dirty:
+                encoded_key = json.dumps(key)
+                group = getattr(self.aggregates, kind).get(key)
+                if group is None or (kind, key) in self._created:
+                    # Recreated groups move to the end, as they did in memory
+                    self._db.execute("DELETE FROM groups WHERE kind = ? AND key = ?", (kind, encoded_key))
+                if group is not None:
+                    self._db.execute(
+                        "INSERT INTO groups (kind, key, data) VALUES (?, ?, ?) "
+                        "ON CONFLICT (kind, key) DO UPDATE SET data = excluded.data",
+                        (kind, encoded_key, json.dumps(group.to_list()))
+                    )
+        self._dirty.clear()
+        self._created.clear()
+
+    @classmethod
+    def load(cls, path: str = AGGREGATES_STATE_PATH) -> "IncrementalAggregates":
+        """
+        Open persisted state, or start empty if there is none
+
+        Only the watermark and the groups are read; post rows stay on disk.
+
+        Args:
+            path: SQLite state file
+
+        Returns:
+            Incremental aggregates
+        """
+        incremental = cls(path)
+        db = incremental._db
+        meta = {key: json.loads(value) for key, value in db.execute("SELECT key, value FROM meta")}
+        if meta.get("version") != STATE_VERSION:
+            with db:
+                for table in ("meta", "posts", "groups"):
+                    db.execute(f"DELETE FROM {table}")
+            return incremental
+
+        incremental.offset = meta["offset"]
+        incremental.last_post_id = meta["last_post_id"]
+        aggregates = incremental.aggregates = PostAggregates(meta["distributions"], engagement=True)
+        aggregates.engagement = RunningStats.from_list(meta["engagement"])
+        for kind, key, data in db.execute("SELECT kind, key, data FROM groups ORDER BY seq"):
+            getattr(aggregates, kind)[json.loads(key)] = GroupStats.from_list(json.loads(data))
+        return incremental
+
+    def close(self):
+        """Close the database connection, dropping unsaved changes"""
+        self._db.close()
+
+
+def refresh_aggregates(
+    path: str = AGGREGATES_STATE_PATH,
+    changed_posts: Optional[Iterable[Dict[str, Any]]] = None,
+    full_scan: bool = False
+) -> PostAggregates:
+    """
+    Load persisted aggregates, fold in new or changed posts and save them
+
+    The result can be passed to generate_overview_dashboard() and
+    generate_category_report().
+
+    Args:
+        path: SQLite state file
+        changed_posts: Posts known to be new or edited since the last run
+        full_scan: Re-read every post and compare content hashes
+
+    Returns:
+        Up-to-date post aggregates
+    """
+    incremental = IncrementalAggregates.load(path)
+    try:
+        incremental.refresh(changed_posts, full_scan)
+        incremental.save()
+    finally:
+        incremental.close()
+    return incremental.aggregates
@@ -2,12 +2,29 @@
 Main application orchestrator, coordinates the data harvesting workflow
 """
 
+import argparse
 import os
+from typing import Optional
 
-from src.api_client import check_api_status, fetch_all_users
+from src import metrics
+from src.aggregation import aggregate_posts
+from src.export import atomic_open, EXPORT_FORMATS, JSON_MODES
+from src.pipeline import Pipeline
+from src.profiling import StageProfiler, PROFILE_DIR, TOP_N
+from src.records import PostTable, POST_FIELDS
+from src.api_client import (
+    check_api_status,
+    fetch_all_users,
+    iter_posts,
+    cache_scope,
+    enable_http_cache,
+    disable_http_cache,
+    close_client
+)
 from src.analyzer import (
     analyze_user_activity,
-    analyze_engagement_trends
+    analyze_engagement_trends,
+    index_posts_by_user
 )
 from src.dashboard import (
     generate_overview_dashboard,
@@ -17,10 +34,30 @@ from src.dashboard import (
 )
 
 
-def main():
+METRICS_FORMATS = {"json": "data/metrics.json", "prometheus": "data/metrics.prom"}
+
+
+def main(
+    metrics_format: Optional[str] = None,
+    profiler: Optional[StageProfiler] = None,
+    distributions: bool = False,
+    export_format: str = "csv",
+    report_mode: str = "pretty"
+):
     """
     Main application entry point.
     Orchestrates data fetching, analysis, and dashboard generation.
+
+    Args:
+        metrics_format: "json" or "prometheus" to record HTTP and report
+            phase metrics and save them at the end of the run
+        profiler: Profile each stage with cProfile and tracemalloc; stages
+            then run one at a time
+        distributions: Add likes and views quantiles and histograms to the
+            user and category reports
+        export_format: "csv", "parquet" or "arrow" for the engagement
+            trends, user posts and category performance tables
+        report_mode: "pretty", "compact" or "ndjson" for the JSON reports
     """
     print("Data Harvester Application")
     print("=" * 50)
@@ -33,49 +70,213 @@ def main():
     
     # Create necessary directories
     os.makedirs("data", exist_ok=True)
-    
-    print("\nFetching users...")
-    users = fetch_all_users()
-    print(f"Found {len(users)} users")
+
+    registry = metrics.enable_metrics() if metrics_format is not None else None
+
+    # Revalidate unchanged resources from earlier runs instead of downloading them
+    http_cache = enable_http_cache()
+
+    # Share every fetched resource across the stages of this run
+    try:
+        with cache_scope() as cache:
+            run_stages(profiler, distributions, export_format, report_mode)
+            stats = cache.stats()
+        http_stats = http_cache.stats()
+    finally:
+        disable_http_cache()
+        close_client()
+        metrics.disable_metrics()
+    print(f"Fetch cache: {stats['hits']} hits, {stats['misses']} misses")
+    print(f"HTTP cache: {http_stats['not_modified']} not modified, {http_stats['entries']} stored responses")
+
+    if registry is not None:
+        print(f"Metrics saved: {save_metrics(registry, metrics_format)}")
+    if profiler is not None:
+        print(f"Profiles saved: {profiler.directory} (summary: {profiler.save_summary()})")
+
+    print("\n" + "=" * 50)
+    print("All operations completed successfully!")
+
+
+def save_metrics(registry: metrics.MetricsRegistry, metrics_format: str) -> str:
+    """
+    Write recorded metrics to data/
+
+    Args:
+        registry: Registry to dump
+        metrics_format: "json" or "prometheus"
+
+    Returns:
+        Path to the metrics file
+    """
+    path = METRICS_FORMATS[metrics_format]
+    with atomic_open(path) as f:
+        f.write(registry.to_json() if metrics_format == "json" else registry.to_prometheus())
+    return path
+
+
+def build_pipeline(
+    max_workers: int = 4,
+    distributions: bool = False,
+    export_format: str = "csv",
+    report_mode: str = "pretty",
+    prefetch: bool = True
+) -> Pipeline:
+    """
+    Declare the harvest stages and the data each one needs
+
+    Users and posts are fetched once; the report stages that consume them
+    run concurrently. Posts are streamed page by page into a compact
+    PostTable, so the decoded post dicts never all exist at once.
+
+    Args:
+        max_workers: Number of stages run at the same time
+        distributions: Sketch likes and views distributions for the user
+            and category reports
+        export_format: "csv", "parquet" or "arrow" for the report tables
+        report_mode: "pretty", "compact" or "ndjson" for the JSON reports
+        prefetch: Fetch the next page of posts in the background while
+            the current one is stored
+
+    Returns:
+        Pipeline ready to run
+    """
+    def user_activity(users, posts_by_user):
+        if not users:
+            return None
+        user_id = users[0]["id"]
+        return analyze_user_activity(user_id, posts_by_user.get(user_id, []), export_format=export_format)
+
+    def user_report(users, posts_by_user):
+        if not users:
+            return None
+        user_id = users[0]["id"]
+        report = generate_user_report(user_id, posts_by_user.get(user_id, []), distribution=distributions)
+        return report, save_report_json(report, f"user_{user_id}_report.json", report_mode)
+
+    def category_report(aggregates):
+        report = generate_category_report(
+            aggregates=aggregates,
+            distribution=distributions,
+            export_format=export_format
+        )
+        return report, save_report_json(report, "category_report.json", report_mode)
+
+    pipeline = Pipeline(max_workers=max_workers)
+    pipeline.stage("users", fetch_all_users)
+    pipeline.stage("posts", lambda: PostTable.from_posts(iter_posts(prefetch=prefetch, fields=POST_FIELDS)))
+    pipeline.stage("posts_by_user", index_posts_by_user, deps=["posts"])
+    pipeline.stage("aggregates", lambda posts: aggregate_posts(posts, distributions=distributions, users=False), deps=["posts"])
+    pipeline.stage("user_activity", user_activity, deps=["users", "posts_by_user"])
+    pipeline.stage(
+        "engagement_trends",
+        lambda posts: analyze_engagement_trends(posts, export_format=export_format),
+        deps=["posts"]
+    )
+    pipeline.stage("overview_dashboard", generate_overview_dashboard, deps=["aggregates"])
+    pipeline.stage("user_report", user_report, deps=["users", "posts_by_user"])
+    pipeline.stage("category_report", category_report, deps=["aggregates"])
+    return pipeline
+
+
+def run_stages(
+    profiler: Optional[StageProfiler] = None,
+    distributions: bool = False,
+    export_format: str = "csv",
+    report_mode: str = "pretty"
+):
+    """
+    Run the fetch, analysis and report stages of a harvest and print results
+
+    Args:
+        profiler: Profile each stage, running them one at a time
+        distributions: Add likes and views distributions to the reports
+        export_format: "csv", "parquet" or "arrow" for the report tables
+        report_mode: "pretty", "compact" or "ndjson" for the JSON reports
+    """
+    # Profiled stages run one at a time and fetch posts in their own
+    # thread, so the profiles show the work rather than threads waiting
+    pipeline = build_pipeline(
+        max_workers=1 if profiler is not None else 4,
+        distributions=distributions,
+        export_format=export_format,
+        report_mode=report_mode,
+        prefetch=profiler is None
+    )
+    result = pipeline.run(wrap=profiler)
+
+    users = result["users"]
+    print(f"\nFound {len(users)} users")
     for user in users:
         print(f"   - {user['name']} (ID: {user['id']})")
-    
-    # Analyze first user activity
-    if users:
-        user_id = users[0]["id"]
-        print(f"\nAnalyzing activity for {users[0]['name']}...")
-        activity = analyze_user_activity(user_id)
+
+    activity = result["user_activity"]
+    if activity is not None:
+        print(f"\nActivity for {users[0]['name']}:")
         if "error" not in activity:
             print(f"Total posts: {activity['total_posts']}")
             print(f"Average likes: {activity['avg_likes']:.1f}")
-            
-    print("\nAnalyzing engagement trends...")
-    trends_csv = analyze_engagement_trends()
-    print(f"Trends data saved: {trends_csv}")
-    
-    print("\nGenerating overview dashboard...")
-    dashboard = generate_overview_dashboard()
-    print(f"Total users: {dashboard['total_users']}")
+
+    print(f"\nTrends data saved: {result['engagement_trends']}")
+
+    dashboard = result["overview_dashboard"]
+    print(f"\nTotal users: {dashboard['total_users']}")
     print(f"Total posts: {dashboard['total_posts']}")
-    
-    if users:
-        print(f"\nGenerating user report for {users[0]['name']}...")
-        user_report = generate_user_report(users[0]["id"])
-        report_path = save_report_json(user_report, f"user_{users[0]['id']}_report.json")
-        print(f"User report saved: {report_path}")
+
+    if result["user_report"] is not None:
+        user_report, report_path = result["user_report"]
+        print(f"\nUser report saved: {report_path}")
         if "path" in user_report:
             print(f"Engagement data: {user_report['path']}")
-    
-    print("\nGenerating category report...")
-    category_report = generate_category_report()
-    report_path = save_report_json(category_report, "category_report.json")
-    print(f"Category report saved: {report_path}")
+
+    category_report, report_path = result["category_report"]
+    print(f"\nCategory report saved: {report_path}")
     print(f"Category data: {category_report['path']}")
-    
-    print("\n" + "=" * 50)
-    print("All operations completed successfully!")
+
+    print("\nStage timings:")
+    for name in pipeline.stages:
+        print(f"   - {name}: {result.timings[name] * 1000:.1f} ms")
+    critical_path = " -> ".join(result.critical_path(pipeline.stages))
+    print(f"Total: {result.wall_time * 1000:.1f} ms (critical path: {critical_path})")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Harvest the API and generate reports")
+    parser.add_argument(
+        "--metrics",
+        choices=sorted(METRICS_FORMATS),
+        help="record HTTP and report phase metrics and save them in this format"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="profile each stage with cProfile and tracemalloc (stages run one at a time)"
+    )
+    parser.add_argument("--profile-dir", default=PROFILE_DIR, help="directory for .prof files and summary.txt")
+    parser.add_argument("--profile-top", type=int, default=TOP_N, help="hot functions and allocation sites per stage")
+    parser.add_argument(
+        "--distributions",
+        action="store_true",
+        help="add likes and views quantiles and histograms to the user and category reports"
+    )
+    parser.add_argument(
+        "--export-format",
+        choices=EXPORT_FORMATS,
+        default="csv",
+        help="file format of the report tables; parquet and arrow need pyarrow"
+    )
+    parser.add_argument(
+        "--report-mode",
+        choices=JSON_MODES,
+        default="pretty",
+        help="layout of the JSON reports; compact and ndjson are single-line"
+    )
+    args = parser.parse_args()
+    main(
+        args.metrics,
+        StageProfiler(args.profile_dir, args.profile_top) if args.profile else None,
+        args.distributions,
+        args.export_format,
+        args.report_mode
+    )
 
@@ -0,0 +1,319 @@
+"""
+Metrics module with an in-process registry of counters, gauges and histograms
+
+Metrics are off by default: until enable_metrics() is called, every
+recording function returns after a single check. The registry can be
+dumped as JSON or in the Prometheus text exposition format.
+
+Recorded metrics:
+    http_requests_total{method,endpoint,status}        counter
+    http_response_bytes_total{method,endpoint}         counter
+    http_request_duration_seconds{method,endpoint}     histogram, time to response headers
+    http_decode_seconds{endpoint}                      histogram, JSON decoding
+    http_coalesced_total{endpoint}                     counter, fetches that shared an in-flight request
+    report_phase_seconds{function,phase}               histogram, fetch/aggregate/export
+    ratelimit_rate                                     gauge, requests/s allowed (measured while unthrottled)
+    ratelimit_concurrency                              gauge, requests allowed in flight
+    ratelimit_throttled_total                          counter, 429/503 responses
+
+Reports that stream rows straight to disk compute them while writing, so
+their export phase includes the aggregation.
+"""
+
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "http_requests_total": "HTTP requests by endpoint and status code",
+    "http_response_bytes_total": "HTTP response body bytes by endpoint",
+    "http_request_duration_seconds": "Time from sending a request to its response headers",
+    "http_decode_seconds": "Time spent decoding JSON response bodies",
+    "http_coalesced_total": "Fetches answered by an identical request already in flight",
+    "report_phase_seconds": "Time spent per phase of analyzer and dashboard functions",
+    "ratelimit_rate": "Requests per second allowed by the adaptive limiter, measured throughput until throttled",
+    "ratelimit_concurrency": "Requests allowed in flight by the adaptive limiter",
+    "ratelimit_throttled_total": "Responses that asked the client to slow down (429/503)"
+}
+
+_registry = None
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observed values"""
+
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """Record one value"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, other: "Histogram"):
+        """Add another histogram's counts; both must use the same buckets"""
+        if tuple(other.buckets) != tuple(self.buckets):
+            raise ValueError("Cannot merge histograms with different buckets")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Return (upper bound, count of values <= bound) pairs, ending with +Inf"""
+        pairs, total = [], 0
+        for bound, count in zip(list(self.buckets) + [float("inf")], self.counts):
+            total += count
+            pairs.append(("+Inf" if bound == float("inf") else repr(bound), total))
+        return pairs
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of labelled counters, gauges and histograms
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+
+    def increment(self, name: str, amount: float = 1, **labels: Any):
+        """
+        Add to a counter
+
+        Args:
+            name: Metric name
+            amount: Amount to add
+            **labels: Label values identifying the series
+        """
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels: Any):
+        """
+        Set a gauge to its current value
+
+        Args:
+            name: Metric name
+            value: Current value
+            **labels: Label values identifying the series
+        """
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels: Any):
+        """
+        Record a value in a histogram
+
+        Args:
+            name: Metric name
+            value: Observed value, in seconds for durations
+            **labels: Label values identifying the series
+        """
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def value(self, name: str, **labels: Any) -> float:
+        """Return a counter's or gauge's value, 0 if it was never recorded"""
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._counters.get(name) or self._gauges.get(name, {})
+            return series.get(key, 0)
+
+    def histogram(self, name: str, **labels: Any) -> Optional[Histogram]:
+        """Return a histogram series, or None if nothing was observed"""
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            return self._histograms.get(name, {}).get(key)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Snapshot every series
+
+        Returns:
+            {"counters": {name: [series]}, "gauges": {name: [series]},
+            "histograms": {name: [series]}} where each series holds its
+            labels and values
+        """
+        with self._lock:
+            return {
+                "counters": {
+                    name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                    for name, series in self._counters.items()
+                },
+                "gauges": {
+                    name: [{"labels": dict(key), "value": value} for key, value in series.items()]
+                    for name, series in self._gauges.items()
+                },
+                "histograms": {
+                    name: [
+                        {
+                            "labels": dict(key),
+                            "count": h.count,
+                            "sum": h.sum,
+                            "buckets": h.cumulative()
+                        }
+                        for key, h in series.items()
+                    ]
+                    for name, series in self._histograms.items()
+                }
+            }
+
+    def to_json(self) -> str:
+        """Render the snapshot as JSON"""
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Render every series in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.extend(_prometheus_header(name, "counter"))
+                for key, value in series.items():
+                    lines.append(f"{name}{_prometheus_labels(key)} {_prometheus_number(value)}")
+            for name, series in sorted(self._gauges.items()):
+                lines.extend(_prometheus_header(name, "gauge"))
+                for key, value in series.items():
+                    lines.append(f"{name}{_prometheus_labels(key)} {_prometheus_number(value)}")
+            for name, series in sorted(self._histograms.items()):
+                lines.extend(_prometheus_header(name, "histogram"))
+                for key, h in series.items():
+                    for bound, count in h.cumulative():
+                        lines.append(f"{name}_bucket{_prometheus_labels(key + (('le', bound),))} {count}")
+                    lines.append(f"{name}_sum{_prometheus_labels(key)} {_prometheus_number(h.sum)}")
+                    lines.append(f"{name}_count{_prometheus_labels(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _prometheus_header(name: str, kind: str) -> List[str]:
+    """HELP and TYPE lines of a metric family"""
+    lines = [f"# HELP {name} {HELP[name]}"] if name in HELP else []
+    lines.append(f"# TYPE {name} {kind}")
+    return lines
+
+
+def _prometheus_labels(key: LabelKey) -> str:
+    """Format a label set, escaping values"""
+    if not key:
+        return ""
+    escaped = (
+        (k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in key
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+def _prometheus_number(value: float) -> str:
+    """Format a sample value"""
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def enable_metrics(buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> MetricsRegistry:
+    """
+    Start recording metrics into a new registry
+
+    Args:
+        buckets: Histogram bucket upper bounds in seconds
+
+    Returns:
+        The active registry
+    """
+    global _registry
+    _registry = MetricsRegistry(buckets)
+    return _registry
+
+
+def disable_metrics():
+    """Stop recording metrics"""
+    global _registry
+    _registry = None
+
+
+def get_registry() -> Optional[MetricsRegistry]:
+    """Return the active registry, or None when metrics are disabled"""
+    return _registry
+
+
+def enabled() -> bool:
+    """Return whether metrics are being recorded"""
+    return _registry is not None
+
+
+def increment(name: str, amount: float = 1, **labels: Any):
+    """Add to a counter of the active registry, if any"""
+    registry = _registry
+    if registry is not None:
+        registry.increment(name, amount, **labels)
+
+
+def set_gauge(name: str, value: float, **labels: Any):
+    """Set a gauge of the active registry, if any"""
+    registry = _registry
+    if registry is not None:
+        registry.set_gauge(name, value, **labels)
+
+
+def observe(name: str, value: float, **labels: Any):
+    """Record a histogram value in the active registry, if any"""
+    registry = _registry
+    if registry is not None:
+        registry.observe(name, value, **labels)
+
+
+@contextmanager
+def timed(function: str, phase: str) -> Iterator[None]:
+    """
+    Record the duration of one phase of a report function
+
+    Args:
+        function: Function name, e.g. "analyze_user_activity"
+        phase: "fetch", "aggregate" or "export"
+    """
+    registry = _registry
+    if registry is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe("report_phase_seconds", time.perf_counter() - started, function=function, phase=phase)
+
+
+def endpoint(url: str) -> str:
+    """
+    Reduce a request URL to its route, so IDs don't create new series
+
+    Args:
+        url: Request URL, e.g. "http://localhost:3000/posts/7/comments?x=1"
+
+    Returns:
+        Route with IDs replaced, e.g. "/posts/{id}/comments"
+    """
+    path = url.split("://", 1)[-1]
+    path = path[path.find("/"):] if "/" in path else "/"
+    segments = path.split("?", 1)[0].strip("/").split("/")
+    return "/" + "/".join("{id}" if i % 2 else s for i, s in enumerate(segments))
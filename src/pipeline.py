@@ -0,0 +1,155 @@
+"""
+Pipeline module that runs dependent stages concurrently in a thread pool
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Any, Callable, Iterable, List, Optional
+
+
+class Stage:
+    """
+    A named unit of work and the stages whose results it consumes
+
+    The stage function is called with one keyword argument per dependency,
+    holding that dependency's result.
+    """
+
+    def __init__(self, name: str, func: Callable[..., Any], deps: Iterable[str] = ()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+
+
+class PipelineResult:
+    """
+    Results and per-stage wall times of a pipeline run
+    """
+
+    def __init__(self, results: Dict[str, Any], timings: Dict[str, float], wall_time: float):
+        self.results = results
+        self.timings = timings
+        self.wall_time = wall_time
+
+    def __getitem__(self, name: str) -> Any:
+        return self.results[name]
+
+    def critical_path(self, stages: Dict[str, Stage]) -> List[str]:
+        """
+        Return the chain of stages with the largest summed wall time
+
+        Args:
+            stages: The pipeline's stages by name
+
+        Returns:
+            Stage names from first to last
+        """
+        best = {}
+
+        def longest(name: str):
+            if name not in best:
+                chains = [longest(dep) for dep in stages[name].deps]
+                cost, chain = max(chains, key=lambda c: c[0], default=(0.0, []))
+                best[name] = (cost + self.timings[name], chain + [name])
+            return best[name]
+
+        return max((longest(name) for name in stages), key=lambda c: c[0], default=(0.0, []))[1]
+
+
+class Pipeline:
+    """
+    DAG of stages; each stage starts as soon as its dependencies finish
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self.stages: Dict[str, Stage] = {}
+
+    def stage(self, name: str, func: Callable[..., Any], deps: Iterable[str] = ()) -> "Pipeline":
+        """
+        Add a stage
+
+        Args:
+            name: Unique stage name, also the keyword its result is passed as
+            func: Stage function
+            deps: Names of stages whose results func needs
+
+        Returns:
+            The pipeline, for chaining
+        """
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        self.stages[name] = Stage(name, func, deps)
+        return self
+
+    def _validate(self):
+        """Reject unknown dependencies and cycles"""
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dep}")
+
+        visiting, done = set(), set()
+
+        def visit(name: str):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through stage {name}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def run(self, wrap: Optional[Callable[[str, Callable[[], Any]], Any]] = None) -> PipelineResult:
+        """
+        Run every stage, independent stages concurrently
+
+        Args:
+            wrap: Optional hook called as wrap(name, call) to run each stage,
+                e.g. for profiling; must return call()'s result
+
+        Returns:
+            Results and wall times per stage
+
+        Raises:
+            Exception: The first stage failure; stages not yet started are
+                skipped
+        """
+        self._validate()
+        results: Dict[str, Any] = {}
+        timings: Dict[str, float] = {}
+        pending = dict(self.stages)
+        running = {}
+
+        def execute(stage: Stage) -> Any:
+            kwargs = {dep: results[dep] for dep in stage.deps}
+            started = time.perf_counter()
+            try:
+                if wrap is not None:
+                    return wrap(stage.name, lambda: stage.func(**kwargs))
+                return stage.func(**kwargs)
+            finally:
+                timings[stage.name] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                for name in [n for n, s in pending.items() if all(d in results for d in s.deps)]:
+                    running[executor.submit(execute, pending.pop(name))] = name
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        for other in running:
+                            other.cancel()
+                        raise error
+                    results[name] = future.result()
+
+        return PipelineResult(results, timings, time.perf_counter() - started)
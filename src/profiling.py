@@ -0,0 +1,154 @@
+"""
+Profiling module that runs pipeline stages under cProfile and tracemalloc
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Dict, Any, Callable, List
+
+PROFILE_DIR = "data/profiles"
+TOP_N = 15
+TRACE_FRAMES = 1
+
+
+def _short_path(path: str) -> str:
+    """Show paths below the working directory relative to it"""
+    cwd = os.getcwd() + os.sep
+    return path[len(cwd):] if path.startswith(cwd) else path
+
+
+def _profile_thread(profiles: List[cProfile.Profile]):
+    """
+    threading.setprofile() hook: on a new thread's first event, replace
+    itself with a cProfile profiler for that thread
+    """
+    sys.setprofile(None)
+    profile = cProfile.Profile()
+    profiles.append(profile)
+    profile.enable()
+
+
+class StageProfiler:
+    """
+    Pipeline.run() wrap hook that profiles each stage separately
+
+    Every stage writes a <stage>.prof file readable by pstats or snakeviz.
+    Hot functions (by own time) and the allocation sites still holding
+    memory when the stage ends are collected for summary(). Threads the
+    stage starts, e.g. iter_posts(prefetch=True) page fetches, get a
+    profiler of their own, merged into the stage's profile; threads that
+    outlive the stage keep profiling until they exit. Stages are profiled
+    one at a time; run the pipeline with max_workers=1 so their
+    allocations don't overlap.
+    """
+
+    def __init__(self, directory: str = PROFILE_DIR, top: int = TOP_N):
+        self.directory = directory
+        self.top = top
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, name: str, call: Callable[[], Any]) -> Any:
+        """
+        Run one stage under the profilers
+
+        Args:
+            name: Stage name, used for the profile file
+            call: Runs the stage
+
+        Returns:
+            The stage's result
+        """
+        with self._lock:
+            started_tracing = not tracemalloc.is_tracing()
+            if started_tracing:
+                tracemalloc.start(TRACE_FRAMES)
+            tracemalloc.clear_traces()
+            tracemalloc.reset_peak()
+
+            profile = cProfile.Profile()
+            thread_profiles: List[cProfile.Profile] = []
+            threading.setprofile(lambda *_: _profile_thread(thread_profiles))
+            started = time.perf_counter()
+            try:
+                return profile.runcall(call)
+            finally:
+                wall_time = time.perf_counter() - started
+                threading.setprofile(None)
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                if started_tracing:
+                    tracemalloc.stop()
+                self._record(name, pstats.Stats(profile, *thread_profiles), snapshot, peak, wall_time)
+
+    def _record(self, name: str, stats: pstats.Stats, snapshot, peak: int, wall_time: float):
+        """Save a stage's profile and keep its top functions and allocation sites"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{name}.prof")
+        stats.dump_stats(path)
+
+        stats = stats.stats
+        hot = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top]
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__)
+        ])
+        self.stages[name] = {
+            "path": path,
+            "wall_time": wall_time,
+            "peak_memory": peak,
+            "functions": [
+                {
+                    "function": f"{_short_path(file)}:{line}({func})",
+                    "calls": calls,
+                    "own_time": own_time,
+                    "cumulative_time": cumulative
+                }
+                for (file, line, func), (_, calls, own_time, cumulative, _) in hot
+            ],
+            "allocations": [
+                {
+                    "site": f"{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                    "size": stat.size,
+                    "count": stat.count
+                }
+                for stat in snapshot.statistics("lineno")[:self.top]
+            ]
+        }
+
+    def summary(self) -> str:
+        """Render the per-stage hot functions and allocation sites as text"""
+        lines: List[str] = []
+        for name, stage in self.stages.items():
+            lines.append(
+                f"== {name}: {stage['wall_time'] * 1000:.1f} ms, "
+                f"peak {stage['peak_memory'] / 1024:.0f} KiB ({stage['path']})"
+            )
+            lines.append(f"{'own ms':>10} {'cum ms':>10} {'calls':>9}  function")
+            for f in stage["functions"]:
+                lines.append(
+                    f"{f['own_time'] * 1000:10.2f} {f['cumulative_time'] * 1000:10.2f} {f['calls']:9d}  {f['function']}"
+                )
+            lines.append(f"{'KiB':>10} {'blocks':>10}  allocation site")
+            for a in stage["allocations"]:
+                lines.append(f"{a['size'] / 1024:10.1f} {a['count']:10d}  {a['site']}")
+            lines.append("")
+        return "\n".join(lines)
+
+    def save_summary(self) -> str:
+        """
+        Write summary() next to the profile files
+
+        Returns:
+            Path to the summary file
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, "summary.txt")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.summary())
+        return path
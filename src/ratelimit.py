@@ -0,0 +1,274 @@
+"""
+Rate limiting module with an adaptive client-side limiter for src.http_client
+
+The limiter stays out of the way until the API pushes back. Once a
+response is throttled (429 or 503), requests are paced by a token bucket
+whose rate starts at half the throughput measured so far, and the number
+of requests in flight is halved. Every successful response then raises
+the rate by about RATE_INCREASE requests/s per second and the concurrency
+limit by about one per round trip (AIMD), so the harvest settles just
+below the highest rate the API sustains. Retry-After pauses every request,
+not only the one that received it.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from src import metrics
+
+THROTTLE_STATUSES = (429, 503)
+MAX_CONCURRENCY = 20
+MIN_RATE = 1.0
+RATE_INCREASE = 1.0
+DECREASE = 0.5
+BURST = 10
+MAX_RETRY_AFTER = 60.0
+# Seconds over which throughput is measured
+THROUGHPUT_WINDOW = 1.0
+
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """
+    Parse a Retry-After header
+
+    Args:
+        value: Header value, either delay seconds or an HTTP date
+
+    Returns:
+        Seconds to wait, capped at MAX_RETRY_AFTER, or None if absent or
+        unparseable
+    """
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+def backoff_delay(attempt: int, backoff: float, cap: float = MAX_RETRY_AFTER) -> float:
+    """
+    Jittered exponential backoff before a retry ("full jitter")
+
+    Args:
+        attempt: Number of the failed attempt, starting at 0
+        backoff: Base delay in seconds
+        cap: Maximum delay in seconds
+
+    Returns:
+        Random delay between 0 and backoff * 2**attempt, at most cap
+    """
+    return random.uniform(0, min(cap, backoff * 2 ** attempt))
+
+
+def _wake(waiter: asyncio.Future):
+    """Resolve a waiter of acquire_async(), unless it gave up already"""
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class AdaptiveLimiter:
+    """
+    Token bucket plus AIMD concurrency limit shared by every request
+
+    Wrap each request in acquire(), or acquire_async() in a coroutine,
+    and release(). Acquiring waits while the concurrency limit is reached,
+    the bucket is empty or a Retry-After pause is running. Throttled
+    responses from requests started before the last decrease don't
+    decrease again, so one burst of 429s halves the limits once. Threads
+    and event loops can share one limiter.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = MAX_CONCURRENCY,
+        rate: Optional[float] = None,
+        min_rate: float = MIN_RATE,
+        max_rate: Optional[float] = None,
+        burst: int = BURST,
+        increase: float = RATE_INCREASE,
+        decrease: float = DECREASE
+    ):
+        """
+        Args:
+            max_concurrency: Upper bound of requests in flight
+            rate: Initial requests per second; None for unlimited until
+                the first throttled response
+            min_rate: Rate never decreased below
+            max_rate: Rate never increased above; None for no cap
+            burst: Token bucket capacity
+            increase: Requests/s added to the rate per second of successes
+            decrease: Factor applied to rate and concurrency on throttling
+        """
+        self.max_concurrency = max_concurrency
+        self.concurrency = float(max_concurrency)
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.throttled = 0
+
+        now = time.monotonic()
+        self._cond = threading.Condition()
+        self._tokens = float(burst)
+        self._updated = now
+        self._in_flight = 0
+        self._blocked_until = 0.0
+        self._decreased_at = float("-inf")
+        self._throughput = 0.0
+        self._window_start = now
+        self._window_count = 0
+        # Coroutines waiting in acquire_async(), woken by release()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def _try_acquire(self) -> Tuple[Optional[float], Optional[float]]:
+        """
+        Take a permit if one is free; call with the lock held
+
+        Returns:
+            (start time, None) on success, else (None, seconds until a
+            permit may be free, or None to wait for a release)
+        """
+        now = time.monotonic()
+        self._refill(now)
+        if now < self._blocked_until:
+            return None, self._blocked_until - now
+        if self._in_flight >= max(1, int(self.concurrency)):
+            return None, None
+        if self.rate is not None and self._tokens < 1:
+            return None, (1 - self._tokens) / self.rate
+        if self.rate is not None:
+            self._tokens -= 1
+        self._in_flight += 1
+        return now, None
+
+    def acquire(self) -> float:
+        """
+        Wait until a request may be sent
+
+        Returns:
+            Start time of the request, to pass to release()
+        """
+        with self._cond:
+            while True:
+                started, timeout = self._try_acquire()
+                if started is not None:
+                    return started
+                self._cond.wait(timeout)
+
+    async def acquire_async(self) -> float:
+        """
+        Wait until a request may be sent, without blocking the event loop
+
+        Returns:
+            Start time of the request, to pass to release()
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                started, timeout = self._try_acquire()
+                if started is not None:
+                    return started
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            try:
+                await asyncio.wait((waiter,), timeout=timeout)
+            finally:
+                with self._cond:
+                    if (loop, waiter) in self._waiters:
+                        self._waiters.remove((loop, waiter))
+
+    def release(self, started: float, throttled: bool = False, retry_after: Optional[float] = None):
+        """
+        Report that a request acquired at started has finished, i.e. its
+        response, or for a streamed one its body, has been read
+
+        Args:
+            started: Value returned by acquire()
+            throttled: The response asked the client to slow down, e.g. a
+                status in THROTTLE_STATUSES
+            retry_after: Seconds every request should wait, from the
+                response's Retry-After header
+        """
+        with self._cond:
+            now = time.monotonic()
+            self._in_flight -= 1
+            self._window_count += 1
+            if now - self._window_start >= THROUGHPUT_WINDOW:
+                self._throughput = self._window_count / (now - self._window_start)
+                self._window_start, self._window_count = now, 0
+
+            if retry_after:
+                self._blocked_until = max(self._blocked_until, now + min(retry_after, MAX_RETRY_AFTER))
+            if throttled:
+                self.throttled += 1
+                if started >= self._decreased_at:
+                    self._decrease(now)
+            else:
+                self._increase()
+            self._cond.notify_all()
+            waiters, self._waiters = self._waiters, []
+            rate, concurrency = self.current_rate(), self.concurrency
+
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # The waiter's event loop is closed
+                pass
+
+        if metrics.enabled():
+            metrics.set_gauge("ratelimit_rate", rate)
+            metrics.set_gauge("ratelimit_concurrency", concurrency)
+            if throttled:
+                metrics.increment("ratelimit_throttled_total")
+
+    def _decrease(self, now: float):
+        """Multiplicative decrease of the rate and concurrency limits"""
+        if self.rate is None:
+            measured = self._throughput or self._window_count / max(now - self._window_start, 1e-3)
+            self.rate = measured
+            self._tokens = 0.0
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self.concurrency = max(1.0, self.concurrency * self.decrease)
+        self._decreased_at = now
+
+    def _increase(self):
+        """Additive increase of the rate and concurrency limits"""
+        self.concurrency = min(float(self.max_concurrency), self.concurrency + 1 / self.concurrency)
+        if self.rate is not None:
+            self.rate += self.increase / self.rate
+            if self.max_rate is not None:
+                self.rate = min(self.rate, self.max_rate)
+
+    def _refill(self, now: float):
+        """Add the tokens earned since the last refill"""
+        if self.rate is not None:
+            self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def current_rate(self) -> float:
+        """Requests per second allowed, or measured while still unlimited"""
+        return self.rate if self.rate is not None else self._throughput
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current limits, requests in flight and throttled responses"""
+        with self._cond:
+            return {
+                "rate": self.rate,
+                "throughput": self._throughput,
+                "concurrency": int(self.concurrency),
+                "in_flight": self._in_flight,
+                "throttled": self.throttled
+            }
@@ -0,0 +1,210 @@
+"""
+Sketches module with mergeable, fixed-memory distribution summaries
+
+A QuantileSketch answers median/p90/p99 queries over a numeric series
+without keeping the series, and a Distribution pairs one with a
+fixed-bucket histogram. Both merge, so summaries of separate batches can be
+combined into the summary of their union.
+"""
+
+import math
+from typing import Dict, Any, List, Optional, Sequence, Tuple, Union
+
+from src.metrics import Histogram
+
+Number = Union[int, float]
+
+SKETCH_K = 200
+# Each level below the top keeps this fraction of the next one's capacity
+LEVEL_SHRINK = 2 / 3
+QUANTILES = (0.5, 0.9, 0.99)
+# 0, then 1-2-5 steps up to a million; larger values land in +Inf
+DISTRIBUTION_BUCKETS = (0,) + tuple(m * 10 ** e for e in range(7) for m in (1, 2, 5))[:-2]
+
+
+class QuantileSketch:
+    """
+    KLL quantile sketch of a numeric series
+
+    Values are kept in levels, where a value on level h stands for 2**h
+    added values. A full level is sorted and every other value is promoted
+    to the next level, halving its size. At most about 3 * k values are
+    held however many are added, and quantiles are exact until k values
+    have been added. With the default k=200 the rank error is typically
+    well under 1%. The promoted half alternates deterministically, so the
+    same input always gives the same answers.
+    """
+
+    __slots__ = ("k", "count", "levels", "_offset", "_size", "_max_size")
+
+    def __init__(self, k: int = SKETCH_K):
+        if k < 8:
+            raise ValueError("QuantileSketch needs k >= 8")
+        self.k = k
+        self.count = 0
+        self.levels: List[List[Number]] = [[]]
+        self._offset = 0
+        self._size = 0
+        self._max_size = k
+
+    def _capacity(self, level: int) -> int:
+        """Number of values a level holds before it is compacted"""
+        return max(2, math.ceil(self.k * LEVEL_SHRINK ** (len(self.levels) - level - 1)))
+
+    def _grow(self):
+        """Add a level on top, which shrinks the capacity of the ones below"""
+        self.levels.append([])
+        self._max_size = sum(self._capacity(level) for level in range(len(self.levels)))
+
+    def _compact(self, level: int):
+        """Promote every other value of a sorted level; an odd one out stays"""
+        items = self.levels[level]
+        items.sort()
+        leftover = [items.pop()] if len(items) % 2 else []
+        self.levels[level + 1].extend(items[self._offset::2])
+        self._offset ^= 1
+        self._size -= len(items) // 2
+        self.levels[level] = leftover
+
+    def _compress(self):
+        """Compact the lowest full levels until the sketch fits again"""
+        while self._size >= self._max_size:
+            for level in range(len(self.levels)):
+                if len(self.levels[level]) >= self._capacity(level):
+                    if level + 1 == len(self.levels):
+                        self._grow()
+                    self._compact(level)
+                    break
+
+    def add(self, value: Number):
+        """Fold one value into the sketch"""
+        self.levels[0].append(value)
+        self.count += 1
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def merge(self, other: "QuantileSketch"):
+        """Fold another sketch, e.g. from a separate batch, into this one"""
+        if other.k != self.k:
+            raise ValueError(f"Cannot merge sketches with k={other.k} into k={self.k}")
+        while len(self.levels) < len(other.levels):
+            self._grow()
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.count += other.count
+        self._size += other._size
+        self._compress()
+
+    def quantiles(self, fractions: Sequence[float] = QUANTILES) -> List[Optional[Number]]:
+        """
+        Estimate several quantiles at once
+
+        Args:
+            fractions: Quantiles between 0 and 1, e.g. 0.5 for the median
+
+        Returns:
+            For each fraction, the nearest-rank value, i.e. the smallest
+            added value with at least that fraction of the series at or
+            below it; None for an empty sketch
+        """
+        if any(not 0 <= q <= 1 for q in fractions):
+            raise ValueError("Quantiles must be between 0 and 1")
+        if not self.count:
+            return [None] * len(fractions)
+        weighted = sorted((value, 1 << level) for level, items in enumerate(self.levels) for value in items)
+        results = []
+        for q in fractions:
+            target = max(1, math.ceil(q * self.count))
+            cumulative = 0
+            for value, weight in weighted:
+                cumulative += weight
+                if cumulative >= target:
+                    break
+            results.append(value)
+        return results
+
+    def quantile(self, fraction: float) -> Optional[Number]:
+        """Estimate one quantile, see quantiles()"""
+        return self.quantiles((fraction,))[0]
+
+    def to_list(self) -> List[Any]:
+        """Serialize as [k, count, offset, levels]"""
+        return [self.k, self.count, self._offset, [list(items) for items in self.levels]]
+
+    @classmethod
+    def from_list(cls, values: List[Any]) -> "QuantileSketch":
+        """Restore a sketch serialized with to_list()"""
+        k, count, offset, levels = values
+        sketch = cls(k)
+        sketch.count, sketch._offset = count, offset
+        sketch.levels = [list(items) for items in levels]
+        sketch._size = sum(len(items) for items in sketch.levels)
+        sketch._max_size = sum(sketch._capacity(level) for level in range(len(sketch.levels)))
+        return sketch
+
+
+class Distribution:
+    """
+    Quantile sketch and fixed-bucket histogram of one numeric series
+
+    Memory is fixed by k and the number of buckets, not by the number of
+    values added.
+    """
+
+    __slots__ = ("sketch", "histogram")
+
+    def __init__(self, k: int = SKETCH_K, buckets: Tuple[Number, ...] = DISTRIBUTION_BUCKETS):
+        self.sketch = QuantileSketch(k)
+        self.histogram = Histogram(tuple(buckets))
+
+    def add(self, value: Number):
+        """Fold one value into the sketch and the histogram"""
+        self.sketch.add(value)
+        self.histogram.observe(value)
+
+    def merge(self, other: "Distribution"):
+        """Fold another distribution with the same k and buckets into this one"""
+        self.sketch.merge(other.sketch)
+        self.histogram.merge(other.histogram)
+
+    def to_list(self) -> List[Any]:
+        """Serialize as [sketch, buckets, bucket counts, histogram sum]"""
+        h = self.histogram
+        return [self.sketch.to_list(), list(h.buckets), list(h.counts), h.sum]
+
+    @classmethod
+    def from_list(cls, values: List[Any]) -> "Distribution":
+        """Restore a distribution serialized with to_list()"""
+        sketch, buckets, counts, total = values
+        distribution = cls(buckets=tuple(buckets))
+        distribution.sketch = QuantileSketch.from_list(sketch)
+        distribution.histogram.counts = list(counts)
+        distribution.histogram.count = sum(counts)
+        distribution.histogram.sum = total
+        return distribution
+
+    def summary(self, fractions: Sequence[float] = QUANTILES) -> Dict[str, Any]:
+        """
+        Summarize the distribution in the shape used by the reports
+
+        Args:
+            fractions: Quantiles to report
+
+        Returns:
+            Dictionary with one "p<N>" key per quantile, e.g. "p50", and a
+            "histogram" list of {"le": upper bound, "count": values in the
+            bucket}, ending with the "+Inf" bucket
+        """
+        summary: Dict[str, Any] = {
+            _quantile_name(q): value
+            for q, value in zip(fractions, self.sketch.quantiles(fractions))
+        }
+        bounds = list(self.histogram.buckets) + ["+Inf"]
+        summary["histogram"] = [{"le": le, "count": count} for le, count in zip(bounds, self.histogram.counts)]
+        return summary
+
+
+def _quantile_name(fraction: float) -> str:
+    """Report key of a quantile, e.g. 0.5 -> "p50", 0.999 -> "p99.9" """
+    return f"p{fraction * 100:g}"
@@ -0,0 +1,229 @@
+"""
+Snapshot store module that persists harvested API data to a local SQLite file
+
+A SnapshotStore offers the same fetch functions as src.api_client, so it can
+be passed as the `source` of analyzer and dashboard functions to run reports
+offline against one harvest.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Any, List, Iterable, Iterator, Optional
+
+from src import api_client
+
+SNAPSHOT_PATH = "data/snapshot.sqlite"
+HARVEST_BATCH_SIZE = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    seq INTEGER PRIMARY KEY, id TEXT UNIQUE, data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS posts (
+    seq INTEGER PRIMARY KEY, id TEXT UNIQUE, user_id TEXT, category TEXT, data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS categories (
+    seq INTEGER PRIMARY KEY, id TEXT UNIQUE, data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS comments (
+    seq INTEGER PRIMARY KEY, id TEXT UNIQUE, post_id TEXT, data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS posts_user_id ON posts (user_id);
+CREATE INDEX IF NOT EXISTS posts_category ON posts (category);
+CREATE INDEX IF NOT EXISTS comments_post_id ON comments (post_id);
+"""
+
+
+def _key(value: Any) -> Optional[str]:
+    """Normalize an ID for indexing"""
+    return None if value is None else str(value)
+
+
+class SnapshotStore:
+    """
+    Local indexed copy of users, posts, categories and comments
+
+    Records are stored as their original JSON, in API order, with indexes
+    on post ID, user_id, category and comment post_id.
+    """
+
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+
+    def harvest(self, include_comments: bool = True, page_size: int = api_client.POSTS_PAGE_SIZE) -> Dict[str, int]:
+        """
+        Replace the snapshot with a fresh copy of the API data
+
+        Posts and comments are streamed page by page and written in
+        batches, so memory stays flat for large collections.
+
+        Args:
+            include_comments: Also harvest the /comments collection
+            page_size: Page size for the streamed collections
+
+        Returns:
+            Number of records stored per table
+        """
+        users = api_client.fetch_all_users()
+        categories = api_client.fetch_categories()
+
+        with self._lock, self._db:
+            for table in ("users", "posts", "categories", "comments"):
+                self._db.execute(f"DELETE FROM {table}")
+
+            self._db.executemany(
+                "INSERT OR REPLACE INTO users (id, data) VALUES (?, ?)",
+                ((_key(u.get("id")), json.dumps(u)) for u in users)
+            )
+            self._db.executemany(
+                "INSERT OR REPLACE INTO categories (id, data) VALUES (?, ?)",
+                ((_key(c.get("id")), json.dumps(c)) for c in categories)
+            )
+            self._insert_batches(
+                "INSERT OR REPLACE INTO posts (id, user_id, category, data) VALUES (?, ?, ?, ?)",
+                (
+                    (_key(p.get("id")), _key(p.get("user_id")), p.get("category", "Uncategorized"), json.dumps(p))
+                    for p in api_client.iter_posts(page_size=page_size, prefetch=True)
+                )
+            )
+            if include_comments:
+                self._insert_batches(
+                    "INSERT OR REPLACE INTO comments (id, post_id, data) VALUES (?, ?, ?)",
+                    (
+                        (_key(c.get("id")), _key(c.get("post_id")), json.dumps(c))
+                        for c in api_client.iter_collection("/comments", page_size=page_size, prefetch=True)
+                    )
+                )
+
+        return self.counts()
+
+    def _insert_batches(self, sql: str, rows: Iterable[tuple]):
+        """Insert rows in fixed-size batches"""
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= HARVEST_BATCH_SIZE:
+                self._db.executemany(sql, batch)
+                batch = []
+        if batch:
+            self._db.executemany(sql, batch)
+
+    def _query(self, sql: str, params: tuple = ()) -> Iterator[Dict[str, Any]]:
+        """Yield decoded records for a query selecting the data column"""
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def counts(self) -> Dict[str, int]:
+        """Return the number of stored records per table"""
+        with self._lock:
+            return {
+                table: self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ("users", "posts", "categories", "comments")
+            }
+
+    def fetch_all_users(self) -> List[Dict[str, Any]]:
+        """Return all stored users"""
+        return list(self._query("SELECT data FROM users ORDER BY seq"))
+
+    def fetch_user(self, user_id: str) -> Dict[str, Any]:
+        """
+        Return one stored user
+
+        Raises:
+            KeyError: If the user is not in the snapshot
+        """
+        for user in self._query("SELECT data FROM users WHERE id = ?", (_key(user_id),)):
+            return user
+        raise KeyError(f"User {user_id} not in snapshot")
+
+    def fetch_all_posts(self) -> List[Dict[str, Any]]:
+        """Return all stored posts"""
+        return list(self.iter_posts())
+
+    def iter_posts(self, batch_size: int = HARVEST_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Stream stored posts in batches of rows
+
+        Args:
+            batch_size: Rows read from SQLite per batch
+
+        Yields:
+            Post dictionaries
+        """
+        last_seq = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT seq, data FROM posts WHERE seq > ? ORDER BY seq LIMIT ?", (last_seq, batch_size)
+                ).fetchall()
+            for last_seq, data in rows:
+                yield json.loads(data)
+            if len(rows) < batch_size:
+                return
+
+    def fetch_posts_by_user(self, user_id: str) -> List[Dict[str, Any]]:
+        """Return one user's stored posts, using the user_id index"""
+        return list(self._query("SELECT data FROM posts WHERE user_id = ? ORDER BY seq", (_key(user_id),)))
+
+    def fetch_posts_by_category(self, category: str) -> List[Dict[str, Any]]:
+        """Return the stored posts in one category, using the category index"""
+        return list(self._query("SELECT data FROM posts WHERE category = ? ORDER BY seq", (category,)))
+
+    def fetch_post(self, post_id: str) -> Dict[str, Any]:
+        """
+        Return one stored post
+
+        Raises:
+            KeyError: If the post is not in the snapshot
+        """
+        for post in self._query("SELECT data FROM posts WHERE id = ?", (_key(post_id),)):
+            return post
+        raise KeyError(f"Post {post_id} not in snapshot")
+
+    def fetch_categories(self) -> List[Dict[str, Any]]:
+        """Return all stored categories"""
+        return list(self._query("SELECT data FROM categories ORDER BY seq"))
+
+    def fetch_comments(self, post_id: str) -> Iterator[Dict[str, Any]]:
+        """Yield the stored comments of one post, using the post_id index"""
+        return self._query("SELECT data FROM comments WHERE post_id = ? ORDER BY seq", (_key(post_id),))
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._db.close()
+
+
+def harvest(path: str = SNAPSHOT_PATH, include_comments: bool = True) -> Dict[str, int]:
+    """
+    Harvest the API into a snapshot file
+
+    Args:
+        path: SQLite snapshot file
+        include_comments: Also harvest comments
+
+    Returns:
+        Number of records stored per table
+    """
+    store = SnapshotStore(path)
+    try:
+        return store.harvest(include_comments=include_comments)
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    counts = harvest()
+    print(f"Snapshot saved: {SNAPSHOT_PATH}")
+    for table, count in counts.items():
+        print(f"   - {table}: {count}")
@@ -0,0 +1,173 @@
+"""
+Tests for the aggregation module
+"""
+
+import json
+import statistics
+import pytest
+from src.aggregation import RunningStats, PostAggregates, aggregate_posts, engagement_ratio
+
+
+def test_running_stats():
+    """Test running accumulators against the statistics module"""
+    values = [45, 67, 34, 52, 41]
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+
+    assert stats.count == 5
+    assert stats.total == sum(values)
+    assert stats.minimum == 34
+    assert stats.maximum == 67
+    assert stats.mean == statistics.mean(values)
+    assert type(stats.mean) is type(statistics.mean(values))
+    assert RunningStats().mean == 0
+
+    other = RunningStats()
+    other.add(1)
+    stats.merge(other)
+    assert stats.count == 6
+    assert stats.minimum == 1
+    assert stats.mean == pytest.approx(statistics.mean(values + [1]))
+
+
+
+def test_running_stats_float_mean():
+    """Test that float means match statistics.mean() exactly, through merge, removal and serialization"""
+    values = [0.948, 4.113, 4.374]
+    assert round(sum(values) / 3, 2) != round(statistics.mean(values), 2)
+    stats = RunningStats()
+    for value in values:
+        stats.add(value)
+    assert stats.total == sum(values)
+    assert stats.mean == statistics.mean(values)
+    assert round(stats.mean, 2) == 3.15
+
+    other = RunningStats()
+    for value in (2, 0.1, 0.2):
+        other.add(value)
+    other.merge(stats)
+    other.remove(2)
+    assert other.mean == statistics.mean(values + [0.1, 0.2])
+    restored = RunningStats.from_list(json.loads(json.dumps(other.to_list())))
+    assert restored.mean == other.mean
+
+    mixed = RunningStats()
+    for value in (3, 0.5, 4):
+        mixed.add(value)
+    mixed.remove(0.5)
+    assert mixed.mean == 3.5
+    mixed.add(2 ** 80 + 1)
+    assert mixed.mean == statistics.mean([3, 4, 2 ** 80 + 1])
+    assert type(mixed.mean) is int
+
+    special = RunningStats()
+    for value in (1.5, float("inf")):
+        special.add(value)
+    assert special.mean == float("inf")
+    assert RunningStats.from_list(special.to_list()).mean == float("inf")
+
+def test_aggregate_posts(sample_posts):
+    """Test per-user, per-category and overall aggregates in one pass"""
+    aggregates = aggregate_posts(iter(sample_posts), engagement=True)
+
+    assert aggregates.post_count == 5
+    assert aggregates.overall.likes.total == 239
+    assert list(aggregates.categories) == ["Technology", "Health", "Education"]
+    assert aggregates.categories["Technology"].summary() == {
+        "post_count": 2,
+        "avg_likes": 56,
+        "avg_views": 271,
+        "total_likes": 112,
+        "total_views": 542
+    }
+    assert aggregates.users["2"].views.maximum == 276
+    assert aggregates.engagement.maximum == pytest.approx(67 / 312)
+
+
+
+def test_optional_groups(sample_posts):
+    """Test that per-user groups and the engagement series are only kept on request"""
+    aggregates = aggregate_posts(sample_posts, users=False)
+    assert aggregates.users == {} and aggregates.engagement is None
+    assert aggregates.post_count == 5
+    assert aggregates.overall.summary() == aggregate_posts(sample_posts).overall.summary()
+
+    aggregates.remove(sample_posts[0])
+    assert aggregates.categories["Technology"].post_count == 1
+    restored = PostAggregates.from_dict(aggregates.to_dict())
+    assert restored.to_dict() == aggregates.to_dict()
+    assert not restored.per_user and restored.engagement is None
+
+    with pytest.raises(ValueError):
+        aggregate_posts(sample_posts).merge(aggregates)
+    with pytest.raises(ValueError):
+        aggregate_posts(sample_posts, engagement=True).merge(aggregate_posts(sample_posts))
+
+def test_merge_batches(sample_posts):
+    """Test that aggregates over separate batches merge to the full result"""
+    merged = aggregate_posts(sample_posts[:2])
+    merged.merge(aggregate_posts(sample_posts[2:]))
+    full = aggregate_posts(sample_posts)
+
+    assert merged.post_count == full.post_count
+    for category, group in full.categories.items():
+        assert merged.categories[category].summary() == group.summary()
+    assert merged.users["1"].likes.total == full.users["1"].likes.total
+
+
+def test_engagement_ratio(sample_post):
+    """Test likes-per-view calculation"""
+    assert engagement_ratio(sample_post) == pytest.approx(45 / 230)
+    assert engagement_ratio({"likes": 5, "views": 0}) == 0
+    assert engagement_ratio({}) == 0
+
+
+def test_remove_retracts(sample_posts):
+    """Test that removing a post restores the aggregates without it"""
+    aggregates = aggregate_posts(sample_posts)
+    aggregates.remove(sample_posts[4])
+
+    expected = aggregate_posts(sample_posts[:4])
+    assert aggregates.post_count == 4
+    assert "Education" not in aggregates.categories
+    assert "3" not in aggregates.users
+    assert aggregates.categories["Health"].summary() == expected.categories["Health"].summary()
+
+    stats = RunningStats()
+    for value in (1, 5, 3):
+        stats.add(value)
+    stats.remove(3)
+    assert (stats.minimum, stats.maximum) == (1, 5)
+    stats.remove(5)
+    assert stats.maximum is None
+    assert stats.mean == 1
+
+
+def test_serialization_round_trip(sample_posts):
+    """Test to_dict()/from_dict() keeps every accumulator"""
+    aggregates = aggregate_posts(sample_posts + [{"id": "6", "likes": 1, "views": 2}])
+    restored = PostAggregates.from_dict(aggregates.to_dict())
+
+    assert restored.to_dict() == aggregates.to_dict()
+    assert None in restored.users
+
+
+def test_distributions(sample_posts):
+    """Test per-group distributions, merging and their serialization"""
+    aggregates = aggregate_posts(sample_posts[:2], distributions=True)
+    aggregate_posts(sample_posts[2:], aggregates)
+    batch = aggregate_posts(sample_posts, distributions=True)
+    batch.merge(PostAggregates.from_dict(aggregates.to_dict()))
+
+    health = batch.categories["Health"].summary()
+    assert health["post_count"] == 4
+    assert health["likes_distribution"]["p50"] == 34
+    assert health["views_distribution"]["p99"] == 276
+    assert sum(b["count"] for b in health["likes_distribution"]["histogram"]) == 4
+    assert "likes_distribution" not in aggregate_posts(sample_posts).categories["Health"].summary()
+
+    with pytest.raises(ValueError):
+        batch.remove(sample_posts[0])
+    with pytest.raises(ValueError):
+        batch.merge(aggregate_posts(sample_posts))
@@ -3,21 +3,28 @@ Tests for the analyzer module
 """
 
 import csv
+import gzip
 import os
 import pytest
 from unittest.mock import patch
-from src.analyzer import analyze_user_activity, analyze_engagement_trends
+from src.analyzer import (
+    analyze_user_activity,
+    analyze_all_users,
+    analyze_engagement_trends,
+    index_posts_by_user
+)
 
 
 def test_analyze_user_activity(sample_user, sample_posts):
     """Test analyzing user activity with data fetching and plotting"""    
     with patch('src.analyzer.fetch_user') as mock_fetch_user, \
-         patch('src.analyzer.fetch_all_posts') as mock_fetch_posts:
+         patch('src.analyzer.fetch_posts_by_user') as mock_fetch_posts:
         
         mock_fetch_user.return_value = sample_user
-        mock_fetch_posts.return_value = sample_posts
+        mock_fetch_posts.return_value = [p for p in sample_posts if p["user_id"] == "1"]
 
         analysis = analyze_user_activity("1")
+        mock_fetch_posts.assert_called_once_with("1")
         
         assert analysis["user"] == "Alice Johnson"
         assert analysis["total_posts"] == 2
@@ -44,6 +51,47 @@ def test_analyze_user_activity(sample_user, sample_posts):
             assert rows[1]['category'] == 'Technology'
 
 
+def test_analyze_user_activity_with_index(sample_users, sample_posts):
+    """Test analyzing many users from one prebuilt user_id index"""
+    index = index_posts_by_user(sample_posts)
+    assert [p["id"] for p in index["2"]] == ["3", "4"]
+
+    with patch('src.analyzer.fetch_user') as mock_fetch_user, \
+         patch('src.analyzer.fetch_posts_by_user') as mock_fetch_posts:
+        for user in sample_users:
+            mock_fetch_user.return_value = user
+            analysis = analyze_user_activity(user["id"], index.get(user["id"], []))
+            assert analysis["total_posts"] == len(index[user["id"]])
+
+        mock_fetch_posts.assert_not_called()
+        assert analyze_user_activity("99", index.get("99", [])) == {"error": "No posts found"}
+
+
+@pytest.mark.parametrize("use_processes", [False, True])
+def test_analyze_all_users(sample_users, sample_posts, use_processes):
+    """Test bulk per-user analysis with pooled CSV generation"""
+    users = sample_users + [{'id': '4', 'name': 'Dan Quiet', 'email': 'dan@example.com'}]
+
+    with patch('src.analyzer.fetch_all_users') as mock_fetch_users, \
+         patch('src.analyzer.fetch_all_posts') as mock_fetch_posts, \
+         patch('src.analyzer.fetch_user') as mock_fetch_user:
+        mock_fetch_users.return_value = users
+        mock_fetch_posts.return_value = sample_posts
+
+        summary = analyze_all_users(max_workers=2, use_processes=use_processes)
+
+        mock_fetch_user.assert_not_called()
+        assert list(summary) == ['1', '2', '3', '4']
+        assert summary['1']['total_likes'] == 112
+        assert summary['2']['user'] == 'Bob Smith'
+        assert summary['3']['path'] == 'data/user_3_posts.csv'
+        assert summary['4'] == {'user': 'Dan Quiet', 'total_posts': 0}
+
+        with open('data/user_2_posts.csv', 'r', encoding='utf-8') as csvfile:
+            rows = list(csv.DictReader(csvfile))
+            assert [row['title'] for row in rows] == ['Exercise Routines', 'Healthy Living']
+
+
 def test_analyze_engagement_trends(sample_posts):
     """Test that engagement scatter plot is created correctly"""
     with patch('src.analyzer.fetch_all_posts') as mock_fetch_posts:
@@ -68,6 +116,43 @@ def test_analyze_engagement_trends(sample_posts):
             assert float(rows[0]['engagement_ratio']) == pytest.approx(0.1957, abs=0.01)
 
 
+def test_analyze_engagement_trends_stream(sample_posts):
+    """Test that engagement trends can consume a lazy post stream"""
+    with patch('src.analyzer.fetch_all_posts') as mock_fetch_posts:
+        csv_path = analyze_engagement_trends(posts=iter(sample_posts))
+
+        mock_fetch_posts.assert_not_called()
+        with open(csv_path, 'r', encoding='utf-8') as csvfile:
+            rows = list(csv.DictReader(csvfile))
+            assert len(rows) == 5
+            assert rows[4]['post_id'] == '5'
+
+
+def test_analyze_engagement_trends_compressed(sample_posts):
+    """Test gzip-compressed engagement trends export"""
+    csv_path = analyze_engagement_trends(posts=sample_posts, compress=True)
+
+    assert csv_path == 'data/engagement_trends.csv.gz'
+    with gzip.open(csv_path, 'rt', encoding='utf-8') as csvfile:
+        rows = list(csv.DictReader(csvfile))
+        assert len(rows) == 5
+        assert rows[1]['title'] == 'Data Science Tips'
+
+
+@pytest.mark.parametrize("backend", ["python", "pandas"])
+def test_analyze_engagement_trends_parquet(sample_posts, backend):
+    """Test typed Parquet export of engagement trends"""
+    pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    path = analyze_engagement_trends(posts=sample_posts, backend=backend, export_format='parquet')
+
+    assert path == 'data/engagement_trends.parquet'
+    table = pq.read_table(path, columns=['post_id', 'likes'])
+    assert table.column('post_id').to_pylist() == ['1', '2', '3', '4', '5']
+    assert table.column('likes').to_pylist() == [45, 67, 34, 52, 41]
+
+
 def test_calculate_average_title_length(sample_posts):
     """Test calculating average post title length"""
     # TODO: Implement this test (Hint: the expected average is 18.8)
@@ -2,14 +2,33 @@
 Tests for the api_client module
 """
 
+import pytest
 import requests
 import json
-from unittest.mock import patch, Mock, MagicMock
+import threading
+from unittest.mock import patch, Mock
 from src.api_client import (
     fetch_all_users,
+    fetch_all_posts,
     fetch_comments,
+    fetch_posts_by_user,
+    iter_posts,
+    iter_json_array,
+    JsonArrayParser,
+    configure_json_decoder,
+    get_json_decoder,
+    decode_json,
     post_comment,
-    check_api_status
+    post_comments,
+    check_api_status,
+    cache_scope,
+    invalidate_cache,
+    get_cache_stats,
+    enable_http_cache,
+    disable_http_cache,
+    fetch_user,
+    get_single_flight,
+    SingleFlight
 )
 
 
@@ -17,6 +36,7 @@ def mock_response(return_value, status_code=200):
     """Helper to create a mocked GET response"""
     mock_resp = Mock()
     mock_resp.json.return_value = return_value
+    mock_resp.content = json.dumps(return_value).encode('utf-8')
     mock_resp.status_code = status_code
     mock_resp.raise_for_status.return_value = None
     mock_resp.text = str(return_value)
@@ -25,10 +45,8 @@ def mock_response(return_value, status_code=200):
 
 def test_fetch_users(sample_users):
     """Test fetching all users"""
-    with patch('src.api_client.get_session') as mock_get_session:
-        mock_session = MagicMock()
-        mock_session.get.return_value = mock_response(sample_users)
-        mock_get_session.return_value = mock_session
+    with patch('requests.Session.get') as mock_get:
+        mock_get.return_value = mock_response(sample_users)
 
         users = fetch_all_users()
         assert len(users) == 3
@@ -37,7 +55,7 @@ def test_fetch_users(sample_users):
 
 def test_fetch_comments(sample_comments):
     """Test fetching comments for a post"""
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
         # Mock streaming response
         mock_resp = Mock()
         mock_resp.raise_for_status.return_value = None
@@ -50,11 +68,142 @@ def test_fetch_comments(sample_comments):
         assert comments[0]["content"] == "Great introduction!"
 
 
+def test_fetch_comments_incremental(sample_comments):
+    """Test that comments are yielded before the whole body has arrived"""
+    content_bytes = json.dumps(sample_comments, ensure_ascii=False).encode('utf-8')
+    chunks = [content_bytes[i:i + 3] for i in range(0, len(content_bytes), 3)]
+    consumed = []
+
+    def iter_content(chunk_size):
+        for chunk in chunks:
+            consumed.append(chunk)
+            yield chunk
+
+    with patch('requests.Session.get') as mock_get:
+        mock_resp = Mock()
+        mock_resp.raise_for_status.return_value = None
+        mock_resp.iter_content.side_effect = iter_content
+        mock_get.return_value = mock_resp
+
+        comments = fetch_comments("1")
+        assert next(comments) == sample_comments[0]
+        assert len(consumed) < len(chunks)
+        assert list(comments) == sample_comments[1:]
+        mock_resp.close.assert_called_once()
+
+
+def test_iter_json_array():
+    """Test incremental parsing across chunk boundaries"""
+    data = [{"text": "caf\u00e9 \u20ac"}, [1, 2], 3.25, None, True, "a,]"]
+    encoded = json.dumps(data, ensure_ascii=False).encode('utf-8')
+    for size in (1, 2, 5, len(encoded)):
+        chunks = [encoded[i:i + size] for i in range(0, len(encoded), size)]
+        assert list(iter_json_array(chunks)) == data
+
+    assert list(iter_json_array([b" [ ] "])) == []
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'[{"id": 1}, {"id"']))
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'["' + b'x' * 100, b'"]'], max_buffer=50))
+
+
+def test_json_array_parser_large_element():
+    """Test that a large element is decoded once its end arrives, not per chunk"""
+    data = [{"text": 'a\\"]}[{' * 5000, "nested": [[1, {"b": "]"}]] * 500}, "x" * 20000, 12345, []]
+    encoded = json.dumps(data).encode('utf-8')
+    parser = JsonArrayParser()
+    with patch.object(parser, '_decoder', wraps=parser._decoder) as decoder:
+        values = []
+        for i in range(0, len(encoded), 64):
+            values.extend(parser.feed(encoded[i:i + 64]))
+        values.extend(parser.close())
+    assert values == data
+    assert parser.done
+    assert decoder.raw_decode.call_count < 300
+
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'[{"a": "' + b'x' * 10000, b'" 1}]']))
+
+
+def test_fetch_posts_by_user(sample_posts):
+    """Test that per-user posts are filtered by the API"""
+    user_posts = [p for p in sample_posts if p["user_id"] == "2"]
+    with patch('requests.Session.get') as mock_get:
+        mock_get.return_value = mock_response(user_posts)
+
+        posts = fetch_posts_by_user("2")
+        assert posts == user_posts
+        assert mock_get.call_args.kwargs["params"] == {"user_id": "2"}
+
+
+def test_iter_posts(sample_posts):
+    """Test streaming posts page by page"""
+    def paged_get(url, params=None, **kwargs):
+        start = (params["_page"] - 1) * params["_limit"]
+        return mock_response(sample_posts[start:start + params["_limit"]])
+
+    for prefetch in (False, True):
+        with patch('requests.Session.get', side_effect=paged_get) as mock_get:
+            posts = list(iter_posts(page_size=2, prefetch=prefetch))
+            assert posts == sample_posts
+            assert mock_get.call_count == 3
+            assert [c.kwargs["params"]["_page"] for c in mock_get.call_args_list] == [1, 2, 3]
+
+    def offset_get(url, params=None, **kwargs):
+        return mock_response(sample_posts[params["_start"]:params["_start"] + params["_limit"]])
+
+    with patch('requests.Session.get', side_effect=offset_get) as mock_get:
+        assert list(iter_posts(page_size=2, start=3)) == sample_posts[3:]
+        assert [c.kwargs["params"]["_start"] for c in mock_get.call_args_list] == [3, 5]
+
+
+@pytest.fixture
+def json_decoder():
+    """Restore the selected JSON decoder after a test"""
+    selected = get_json_decoder()
+    yield
+    configure_json_decoder(selected)
+
+
+@pytest.mark.parametrize("name", ["orjson", "msgspec", "json"])
+def test_json_decoders(json_decoder, name):
+    """Test that every decoder returns what the stdlib would"""
+    pytest.importorskip(name)
+    assert configure_json_decoder(name) == name
+    body = '[{"id": "1", "title": "Caf\u00e9 ☕", "likes": 12345678901234567890123, "views": 1.5e3, "x": null}]'.encode('utf-8')
+    assert decode_json(body) == json.loads(body)
+    assert decode_json(b'{"score": NaN}')["score"] != decode_json(b'{"score": NaN}')["score"]
+    with pytest.raises(ValueError):
+        decode_json(b'[1, 2')
+
+
+def test_json_decoder_selection(json_decoder):
+    """Test the default choice and unknown decoder names"""
+    assert configure_json_decoder() in ("orjson", "msgspec", "json")
+    with pytest.raises(ValueError):
+        configure_json_decoder("yaml")
+
+
+def test_iter_posts_fields(json_decoder, sample_posts):
+    """Test that posts are decoded with only the requested fields"""
+    posts = [dict(post, body="x" * 100) for post in sample_posts]
+    fields = ("id", "likes", "category")
+    for name in ("orjson", "msgspec", "json"):
+        try:
+            configure_json_decoder(name)
+        except ImportError:
+            continue
+        with patch('requests.Session.get', return_value=mock_response(posts)):
+            assert list(iter_posts(fields=fields)) == [
+                {key: post[key] for key in fields} for post in sample_posts
+            ]
+
+
 def test_post_comment():
     """Test posting a new comment"""
     expected = {"id": "10", "post_id": "1", "author": "TestUser", "content": "Test comment"}
     
-    with patch('requests.post') as mock_post:
+    with patch('requests.Session.post') as mock_post:
         mock_post.return_value = mock_response(expected)
 
         comment = post_comment("1", "TestUser", "Test comment")
@@ -63,9 +212,60 @@ def test_post_comment():
         assert comment["content"] == "Test comment"
 
 
+def test_post_comments():
+    """Test bulk posting reports every item and reuses the pooled session"""
+    items = [("1", "Alice", "First"), ("2", "Bob", "Second"), ("3", "Carol", "Third")]
+
+    with patch('requests.Session.post') as mock_post:
+        mock_post.side_effect = lambda url, json, **kwargs: mock_response(json, 201)
+
+        results = sorted(post_comments(iter(items), concurrency=2), key=lambda r: r["index"])
+
+    assert [r["post_id"] for r in results] == ["1", "2", "3"]
+    assert all(r["ok"] and r["attempts"] == 1 for r in results)
+    assert results[1]["comment"]["author"] == "Bob"
+    assert len({r["id"] for r in results}) == 3
+    assert mock_post.call_count == 3
+
+
+def test_post_comments_retry_is_idempotent():
+    """Test a retry after an ambiguous failure does not post the comment twice"""
+    with patch('requests.Session.post') as mock_post, \
+            patch('requests.Session.get') as mock_get, \
+            patch('src.api_client.time.sleep') as mock_sleep:
+        mock_post.side_effect = requests.exceptions.ConnectionError("reset")
+        stored = {"id": "x", "post_id": "1", "author": "Alice", "content": "Hi"}
+        mock_get.return_value = mock_response(stored)
+
+        [result] = post_comments([("1", "Alice", "Hi")], retries=2)
+
+    assert result["ok"] is True
+    assert result["comment"] == stored
+    assert mock_post.call_count == 1
+    mock_sleep.assert_called_once()
+
+
+def test_post_comments_failures():
+    """Test retryable statuses are retried and client errors are reported"""
+    with patch('requests.Session.post') as mock_post, \
+            patch('requests.Session.get') as mock_get, \
+            patch('src.api_client.time.sleep'):
+        mock_get.return_value = mock_response(None, 404)
+        busy = mock_response(None, 503)
+        rejected = mock_response(None, 400)
+        rejected.raise_for_status.side_effect = requests.exceptions.HTTPError("400 Bad Request")
+        mock_post.side_effect = [busy, busy, rejected]
+
+        [result] = post_comments([("1", "Alice", "Hi")], retries=3)
+
+    assert result["ok"] is False
+    assert result["attempts"] == 3
+    assert "400" in result["error"]
+
+
 def test_check_api_status():
     """Test API status check"""
-    with patch('requests.get') as mock_get:
+    with patch('requests.Session.get') as mock_get:
         # Test success
         mock_get.return_value.status_code = 200
         assert check_api_status() is True
@@ -73,3 +273,170 @@ def test_check_api_status():
         # Test failure
         mock_get.side_effect = requests.exceptions.RequestException("Connection failed")
         assert check_api_status() is False
+
+
+def test_cache_scope(sample_users, sample_posts):
+    """Test that fetches inside a cache scope share one request per resource"""
+    def get(url, **kwargs):
+        return mock_response(sample_users if url.endswith("/users") else sample_posts)
+
+    with patch('requests.Session.get', side_effect=get) as mock_get:
+        def posts_requests():
+            return sum(1 for c in mock_get.call_args_list if c.args[0].endswith("/posts"))
+
+        with cache_scope(maxsize=1) as cache:
+            assert fetch_all_posts() == sample_posts
+            assert fetch_all_posts() == sample_posts
+            assert posts_requests() == 1
+            assert get_cache_stats() == {"hits": 1, "misses": 1, "size": 1}
+
+            # LRU eviction drops /posts once /users is cached
+            fetch_all_users()
+            fetch_all_posts()
+            assert posts_requests() == 2
+
+            assert invalidate_cache("/posts") == 1
+            fetch_all_posts()
+            assert posts_requests() == 3
+            assert cache.stats()["hits"] == 1
+
+        # Outside a scope every call goes to the API
+        fetch_all_posts()
+        assert posts_requests() == 4
+        assert get_cache_stats()["misses"] == 0
+
+
+def test_single_flight(sample_users):
+    """Test that concurrent identical fetches share one request and its errors"""
+    release = threading.Event()
+
+    def get(url, **kwargs):
+        release.wait(5)
+        if url.endswith("/users/9"):
+            response = mock_response({}, status_code=404)
+            response.raise_for_status.side_effect = requests.exceptions.HTTPError("404")
+            return response
+        return mock_response(sample_users[0])
+
+    def call(function, *args):
+        try:
+            results.append(function(*args))
+        except requests.exceptions.HTTPError as error:
+            results.append(error)
+
+    with patch('requests.Session.get', side_effect=get) as mock_get:
+        for user_id in ("1", "9"):
+            results = []
+            coalesced = get_single_flight().coalesced
+            threads = [threading.Thread(target=call, args=(fetch_user, user_id)) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            while get_single_flight().coalesced - coalesced < 4:
+                threading.Event().wait(0.01)
+            release.set()
+            for thread in threads:
+                thread.join()
+            release.clear()
+            assert len(results) == 5
+            assert len({id(result) for result in results}) == 1
+        assert mock_get.call_count == 2
+        assert isinstance(results[0], requests.exceptions.HTTPError)
+
+        # Finished fetches aren't reused
+        release.set()
+        fetch_user("1")
+        assert mock_get.call_count == 3
+
+
+def test_single_flight_keys():
+    """Test that different keys load separately and failures reach the leader"""
+    flights = SingleFlight()
+    assert flights.do("a", lambda: 1) == 1
+    assert flights.do("b", lambda: 2) == 2
+    with pytest.raises(ValueError):
+        flights.do("a", lambda: int("x"))
+    assert flights.do("a", lambda: 3) == 3
+    assert flights.coalesced == 0
+
+
+def test_cache_scope_ttl(sample_posts):
+    """Test that cached resources expire after the TTL"""
+    with patch('requests.Session.get') as mock_get:
+        mock_get.return_value = mock_response(sample_posts)
+
+        with cache_scope(ttl=0):
+            fetch_all_posts()
+            fetch_all_posts()
+            assert mock_get.call_count == 2
+
+
+def cacheable_response(return_value, etag):
+    """Helper to create a 200 response carrying an ETag"""
+    mock_resp = mock_response(return_value)
+    body = json.dumps(return_value).encode('utf-8')
+    mock_resp.content = body
+    mock_resp.headers = {"ETag": etag}
+    mock_resp.iter_content.side_effect = lambda chunk_size: iter([body])
+    return mock_resp
+
+
+def not_modified_response():
+    """Helper to create a 304 Not Modified response"""
+    mock_resp = Mock()
+    mock_resp.status_code = 304
+    mock_resp.headers = {}
+    return mock_resp
+
+
+@pytest.fixture
+def http_cache(tmp_path):
+    """Enable the on-disk HTTP cache for one test"""
+    yield enable_http_cache(str(tmp_path / 'http_cache.sqlite'))
+    disable_http_cache()
+
+
+def test_conditional_fetch(http_cache, sample_posts):
+    """Test that a 304 reuses the cached posts without decoding them again"""
+    with patch('requests.Session.get') as mock_get:
+        mock_get.return_value = cacheable_response(sample_posts, '"posts-v1"')
+        assert fetch_all_posts() == sample_posts
+        assert "If-None-Match" not in mock_get.call_args.kwargs["headers"]
+
+        mock_get.return_value = not_modified_response()
+        with patch('src.http_cache.json.loads') as mock_loads:
+            assert fetch_all_posts() == sample_posts
+            mock_loads.assert_not_called()
+
+        headers = mock_get.call_args.kwargs["headers"]
+        assert headers["If-None-Match"] == '"posts-v1"'
+        assert headers["User-Agent"] == "DataHarvester/1.0"
+        assert http_cache.stats()["not_modified"] == 1
+
+
+def test_conditional_fetch_comments(http_cache, sample_comments):
+    """Test that streamed comments are cached and revalidated"""
+    with patch('requests.Session.get') as mock_get:
+        mock_get.return_value = cacheable_response(sample_comments, '"c1"')
+        assert list(fetch_comments("1")) == sample_comments
+
+        mock_get.return_value = not_modified_response()
+        assert list(fetch_comments("1")) == sample_comments
+        assert mock_get.call_args.kwargs["headers"]["If-None-Match"] == '"c1"'
+
+
+def test_conditional_fetch_after_eviction(http_cache, sample_posts):
+    """Test that a 304 for a body evicted since the lookup falls back to a plain GET"""
+    with patch('requests.Session.get') as mock_get:
+        mock_get.return_value = cacheable_response(sample_posts, '"posts-v1"')
+        fetch_all_posts()
+
+        responses = iter([not_modified_response(), cacheable_response(sample_posts, '"posts-v2"')])
+
+        def evict_then_respond(*args, **kwargs):
+            http_cache.clear()
+            return next(responses)
+
+        mock_get.side_effect = evict_then_respond
+        assert fetch_all_posts() == sample_posts
+        assert "If-None-Match" not in mock_get.call_args.kwargs["headers"]
+        assert http_cache.stats()["entries"] == 1
@@ -0,0 +1,186 @@
+"""
+Tests for the async_client module
+"""
+
+import asyncio
+import json
+import httpx
+from unittest.mock import patch
+from benchmarks.server import StubServer
+from src.http_client import HttpClient
+from src.ratelimit import AdaptiveLimiter
+from src.async_client import (
+    get_async_client,
+    close_async_client,
+    fetch_all_users,
+    fetch_user,
+    fetch_comments,
+    post_comment,
+    gather_limited,
+    fetch_users,
+    fetch_comments_for_posts
+)
+
+
+def mock_client(handler):
+    """Helper to create an AsyncClient backed by a request handler"""
+    return httpx.AsyncClient(base_url="http://testserver", transport=httpx.MockTransport(handler))
+
+
+def test_fetch_users(sample_users):
+    """Test fetching all users"""
+    client = mock_client(lambda request: httpx.Response(200, json=sample_users))
+
+    with patch('src.async_client.get_async_client', return_value=client):
+        users = asyncio.run(fetch_all_users())
+        assert len(users) == 3
+        assert users[0]["name"] == "Alice Johnson"
+
+
+def test_fetch_user_single_flight(sample_users):
+    """Test that concurrent fetches of one user share a request, even if a caller is cancelled"""
+    paths = []
+
+    async def handler(request):
+        paths.append(request.url.path)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=sample_users[0])
+
+    async def fetch():
+        first = asyncio.ensure_future(fetch_user("1"))
+        others = [asyncio.ensure_future(fetch_user("1")) for _ in range(4)]
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await asyncio.gather(*others, fetch_user("2"))
+
+    with patch('src.async_client.get_async_client', return_value=mock_client(handler)):
+        users = asyncio.run(fetch())
+    assert sorted(paths) == ["/users/1", "/users/2"]
+    assert all(user is users[0] for user in users[:4])
+
+
+def test_client_per_event_loop(sample_users):
+    """Test that each asyncio.run() gets its own client, reused within the loop"""
+    async def fetch():
+        client = get_async_client()
+        assert get_async_client() is client
+        return client, await fetch_all_users()
+
+    with StubServer({"users": sample_users}) as server, patch('src.async_client.BASE_URL', server.url):
+        first, users = asyncio.run(fetch())
+        assert users == sample_users
+        # The first loop is closed; its pooled connections must not be reused
+        second, users = asyncio.run(fetch())
+        assert users == sample_users
+        assert second is not first
+
+    async def close():
+        client = get_async_client()
+        await close_async_client()
+        assert client.is_closed and get_async_client() is not client
+
+    asyncio.run(close())
+
+
+def test_fetch_comments_streams(sample_comments):
+    """Test that comments are yielded before the whole body has arrived"""
+    encoded = json.dumps(sample_comments).encode('utf-8')
+    sent = []
+
+    async def body():
+        for i in range(0, len(encoded), 16):
+            sent.append(i)
+            yield encoded[i:i + 16]
+
+    async def first():
+        async for comment in fetch_comments("1"):
+            return comment, len(sent)
+
+    client = mock_client(lambda request: httpx.Response(200, content=body()))
+    with patch('src.async_client.get_async_client', return_value=client), \
+            patch('src.async_client.STREAM_CHUNK_SIZE', 16):
+        comment, chunks_read = asyncio.run(first())
+    assert comment == sample_comments[0]
+    assert chunks_read < len(encoded) // 16
+
+
+def test_requests_share_the_limiter(sample_users):
+    """Test that async requests are paced, retried and counted by the shared limiter"""
+    limiter = AdaptiveLimiter(max_concurrency=4)
+    shared = HttpClient(retries=2, backoff_factor=0, limiter=limiter)
+    statuses = iter([429, 200])
+
+    def handler(request):
+        status = next(statuses)
+        return httpx.Response(status, json=sample_users if status == 200 else {}, headers={"Retry-After": "0"})
+
+    with patch('src.async_client.get_async_client', return_value=mock_client(handler)), \
+            patch('src.async_client.get_client', return_value=shared):
+        assert asyncio.run(fetch_all_users()) == sample_users
+    assert limiter.stats()["throttled"] == 1
+    assert limiter.stats()["in_flight"] == 0
+    assert limiter.rate is not None and limiter.concurrency < 4
+
+
+def test_fetch_comments(sample_comments):
+    """Test fetching comments for a post"""
+    def handler(request):
+        assert request.url.path == "/posts/1/comments"
+        return httpx.Response(200, content=json.dumps(sample_comments).encode('utf-8'))
+
+    async def collect():
+        return [comment async for comment in fetch_comments("1")]
+
+    with patch('src.async_client.get_async_client', return_value=mock_client(handler)):
+        comments = asyncio.run(collect())
+        assert len(comments) == 2
+        assert comments[0]["content"] == "Great introduction!"
+
+
+def test_post_comment():
+    """Test posting a new comment"""
+    def handler(request):
+        body = json.loads(request.content)
+        return httpx.Response(201, json={"id": "10", **body})
+
+    with patch('src.async_client.get_async_client', return_value=mock_client(handler)):
+        comment = asyncio.run(post_comment("1", "TestUser", "Test comment"))
+        assert comment["post_id"] == "1"
+        assert comment["author"] == "TestUser"
+
+
+def test_gather_limited():
+    """Test that fan-out keeps order and respects the concurrency limit"""
+    in_flight = 0
+    peak = 0
+
+    async def work(item):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return item * 2
+
+    results = asyncio.run(gather_limited(work, range(50), concurrency=4))
+    assert results == [i * 2 for i in range(50)]
+    assert peak == 4
+
+
+def test_fetch_users_and_comments(sample_users, sample_comments):
+    """Test bulk helpers for users and per-post comments"""
+    by_id = {user["id"]: user for user in sample_users}
+
+    def handler(request):
+        if request.url.path.startswith("/users/"):
+            return httpx.Response(200, json=by_id[request.url.path.rsplit("/", 1)[1]])
+        post_id = request.url.path.split("/")[2]
+        return httpx.Response(200, json=[c for c in sample_comments if c["post_id"] == post_id])
+
+    with patch('src.async_client.get_async_client', return_value=mock_client(handler)):
+        users = asyncio.run(fetch_users(["3", "1"], concurrency=2))
+        assert [u["name"] for u in users] == ["Carol White", "Alice Johnson"]
+
+        comments = asyncio.run(fetch_comments_for_posts(["1", "2"], concurrency=2))
+        assert len(comments["1"]) == 2
+        assert comments["2"] == []
@@ -0,0 +1,75 @@
+"""
+Tests for the benchmark data generator, json-server stand-in and runner
+"""
+
+import json
+import requests
+from collections import Counter
+from benchmarks.generate import generate_db, write_db
+from benchmarks.server import StubServer
+from benchmarks.run import Benchmark, measure, compare, percentile
+
+
+def test_generate_db_is_skewed_and_deterministic():
+    """Test that generated data has db.json's shape and skewed authorship"""
+    db = generate_db(posts=2000, users=50, seed=3)
+    assert db == generate_db(posts=2000, users=50, seed=3)
+    assert set(db) == {"users", "posts", "categories", "comments"}
+    assert len(db["posts"]) == 2000 and len(db["users"]) == 50
+    assert set(db["posts"][0]) == {"id", "user_id", "title", "likes", "views", "category"}
+
+    authors = Counter(p["user_id"] for p in db["posts"])
+    assert authors["1"] > 10 * authors.get("50", 1)
+    names = {c["name"] for c in db["categories"]}
+    assert all(p["category"] in names for p in db["posts"])
+
+
+def test_write_db_matches_generate_db(tmp_path):
+    """Test that the streaming writer produces the in-memory dataset"""
+    path = tmp_path / 'db.json'
+    write_db(str(path), posts=300, comments=40)
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == generate_db(posts=300, comments=40)
+
+
+def test_stub_server_routes():
+    """Test json-server routes, pagination, filters, ETags and POST"""
+    db = generate_db(posts=50, users=10, comments=20)
+    with StubServer(db) as server:
+        page = requests.get(f"{server.url}/posts", params={"_page": 2, "_limit": 20})
+        assert page.json() == db["posts"][20:40]
+        assert page.headers["X-Total-Count"] == "50"
+
+        window = requests.get(f"{server.url}/posts", params={"_start": 45, "_limit": 20}).json()
+        assert window == db["posts"][45:]
+
+        mine = requests.get(f"{server.url}/posts", params={"user_id": "1"}).json()
+        assert mine == [p for p in db["posts"] if p["user_id"] == "1"]
+
+        assert requests.get(f"{server.url}/users/3").json() == db["users"][2]
+        assert requests.get(f"{server.url}/users/999").status_code == 404
+
+        comments = requests.get(f"{server.url}/posts/1/comments").json()
+        assert comments == [c for c in db["comments"] if c["post_id"] == "1"]
+
+        etag = requests.get(f"{server.url}/users").headers["ETag"]
+        assert requests.get(f"{server.url}/users", headers={"If-None-Match": etag}).status_code == 304
+
+        created = requests.post(f"{server.url}/comments", json={"id": "c1", "post_id": "1"})
+        assert created.status_code == 201
+        assert requests.post(f"{server.url}/comments", json={"id": "c1"}).status_code == 500
+        assert requests.get(f"{server.url}/comments/c1").json()["post_id"] == "1"
+        assert len(requests.get(f"{server.url}/posts/1/comments").json()) == len(comments) + 1
+
+
+def test_measure_and_compare():
+    """Test that results carry percentiles, throughput and peak memory"""
+    result = measure(Benchmark("alloc", lambda: [0] * 100000, items=10), repeat=3, warmup=0)
+    assert result["runs"] == 3
+    assert result["p50_ms"] <= result["p99_ms"]
+    assert result["throughput"] > 0
+    assert result["peak_memory_bytes"] >= 100000 * 8
+
+    assert percentile([1.0, 2.0, 3.0, 4.0], 50) == 2.0
+    baseline = {"benchmarks": {"alloc": dict(result, p50_ms=result["p50_ms"] * 2)}}
+    assert compare(baseline, {"benchmarks": {"alloc": result}})["alloc"]["p50"] == 0.5
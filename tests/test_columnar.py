@@ -0,0 +1,115 @@
+"""
+Tests for the columnar module
+"""
+
+import pytest
+from unittest.mock import patch
+from src.analyzer import analyze_user_activity, analyze_engagement_trends
+from src.dashboard import generate_category_report
+from src.records import PostTable
+
+
+@pytest.fixture
+def edge_posts(sample_posts):
+    """Sample posts plus ties, missing fields and posts without views"""
+    return sample_posts + [
+        {'id': '6', 'user_id': '1', 'title': 'Tied Post', 'likes': 67, 'views': 0, 'category': 'Technology'},
+        {'id': '7', 'user_id': '1', 'likes': 12, 'views': 37},
+        {'id': '8', 'user_id': '1', 'title': 'Rounding, "quoted"', 'likes': 1, 'views': 8, 'category': 'Health'},
+    ]
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_engagement_trends_matches_python_backend(edge_posts):
+    """Test that the pandas backend writes the same engagement CSV bytes"""
+    expected = read_bytes(analyze_engagement_trends(posts=edge_posts))
+    assert read_bytes(analyze_engagement_trends(posts=iter(edge_posts), backend="pandas")) == expected
+
+
+def test_user_activity_matches_python_backend(sample_user, edge_posts):
+    """Test that the pandas backend writes the same per-user CSV and stats"""
+    user_posts = [p for p in edge_posts if p["user_id"] == "1"]
+    with patch('src.analyzer.fetch_user', return_value=sample_user):
+        expected = analyze_user_activity("1", user_posts)
+        expected_csv = read_bytes(expected["path"])
+
+        analysis = analyze_user_activity("1", user_posts, backend="pandas")
+
+    assert analysis == expected
+    assert read_bytes(analysis["path"]) == expected_csv
+
+
+def test_category_report_matches_python_backend(edge_posts):
+    """Test that the pandas backend writes the same category CSV and stats"""
+    expected = generate_category_report(posts=edge_posts)
+    expected_csv = read_bytes(expected["path"])
+
+    report = generate_category_report(posts=edge_posts, backend="pandas")
+    assert report == expected
+    assert read_bytes(report["path"]) == expected_csv
+
+
+def test_wide_integers_match_python_backend(sample_posts):
+    """Test that ints beyond int64, and sums that would overflow it, stay exact"""
+    wide_posts = sample_posts + [
+        {'id': '6', 'user_id': '1', 'title': 'Viral', 'likes': 2 ** 63 + 5, 'views': 2 ** 70, 'category': 'Technology'},
+    ]
+    near_limit = [
+        {'id': str(i), 'user_id': '1', 'title': 'Big', 'likes': 2 ** 62, 'views': 2 ** 62, 'category': 'Health'}
+        for i in range(3)
+    ]
+    for posts in (wide_posts, near_limit, PostTable(near_limit)):
+        expected = generate_category_report(posts=posts)
+        expected_csv = read_bytes(expected["path"])
+        report = generate_category_report(posts=posts, backend="pandas")
+        assert report == expected
+        assert read_bytes(report["path"]) == expected_csv
+
+        expected_csv = read_bytes(analyze_engagement_trends(posts=posts))
+        assert read_bytes(analyze_engagement_trends(posts=posts, backend="pandas")) == expected_csv
+    assert report["categories"]["Health"]["total_likes"] == 3 * 2 ** 62
+
+
+
+@pytest.mark.parametrize("likes", [
+    [(i * 7919 % 1000) / 7 for i in range(1000)],
+    [1.5, float("nan"), 2.25],
+    [True],
+])
+def test_non_integer_likes_match_python_backend(sample_user, likes):
+    """Test that float, NaN and bool totals are computed like the row-wise path"""
+    posts = [
+        {'id': str(i), 'user_id': '1', 'title': f'Post {i}', 'likes': value, 'views': 10, 'category': 'Health'}
+        for i, value in enumerate(likes)
+    ]
+    expected = generate_category_report(posts=posts)
+    expected_csv = read_bytes(expected["path"])
+    report = generate_category_report(posts=posts, backend="pandas")
+    assert repr(report) == repr(expected)
+    assert read_bytes(report["path"]) == expected_csv
+
+    with patch('src.analyzer.fetch_user', return_value=sample_user):
+        expected = analyze_user_activity("1", posts)
+        expected_csv = read_bytes(expected["path"])
+        analysis = analyze_user_activity("1", posts, backend="pandas")
+    assert repr(analysis) == repr(expected)
+    assert read_bytes(analysis["path"]) == expected_csv
+
+
+def test_none_category_matches_python_backend(edge_posts):
+    """Test that a None category stays None instead of becoming NaN"""
+    posts = edge_posts + [{'id': '9', 'user_id': '2', 'title': 'Loose', 'likes': 3, 'views': 9, 'category': None}]
+    expected = generate_category_report(posts=posts)
+    report = generate_category_report(posts=posts, backend="pandas")
+    assert list(report["categories"]) == list(expected["categories"])
+    assert report == expected
+    assert read_bytes(report["path"]) == read_bytes(expected["path"])
+
+def test_unknown_backend():
+    """Test that an unknown backend name is rejected"""
+    with pytest.raises(ValueError):
+        analyze_engagement_trends(posts=[], backend="polars")
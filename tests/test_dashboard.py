@@ -3,10 +3,18 @@ Tests for the dashboard module
 """
 
 import csv
+import json
 import os
 import pytest
 from unittest.mock import patch
-from src.dashboard import generate_overview_dashboard, generate_category_report, generate_user_report
+from src.aggregation import aggregate_posts
+from src.dashboard import (
+    generate_overview_dashboard,
+    generate_category_report,
+    generate_user_report,
+    save_report_json,
+    save_reports_ndjson
+)
 
 
 def test_generate_overview_dashboard(sample_users, sample_posts):
@@ -74,17 +82,59 @@ def test_generate_category_report(sample_posts):
             assert float(tech_row['total_views']) == pytest.approx(542)
 
 
+def test_generate_category_report_stream(sample_posts):
+    """Test that the category report can consume a lazy post stream"""
+    with patch('src.dashboard.fetch_all_posts') as mock_fetch_posts:
+        report = generate_category_report(posts=iter(sample_posts))
+
+        mock_fetch_posts.assert_not_called()
+        assert report["categories"]["Health"]["post_count"] == 2
+        assert report["categories"]["Education"]["total_views"] == 198
+
+
+def test_generate_reports_from_shared_aggregates(sample_users, sample_posts):
+    """Test that dashboard reports can share one aggregation pass"""
+    aggregates = aggregate_posts(sample_posts)
+
+    with patch('src.dashboard.fetch_all_users') as mock_fetch_all_users, \
+         patch('src.dashboard.fetch_all_posts') as mock_fetch_posts:
+        mock_fetch_all_users.return_value = sample_users
+
+        dashboard = generate_overview_dashboard(aggregates)
+        report = generate_category_report(aggregates=aggregates)
+
+        mock_fetch_posts.assert_not_called()
+        assert dashboard["total_posts"] == 5
+        assert report["categories"]["Technology"]["avg_likes"] == 56
+
+
+def test_generate_category_report_distribution(sample_posts):
+    """Test per-category quantile columns and histograms"""
+    report = generate_category_report(posts=sample_posts, backend="pandas", distribution=True)
+
+    tech = report["categories"]["Technology"]
+    assert tech["likes_distribution"]["p50"] == 45
+    assert tech["views_distribution"]["p90"] == 312
+    with open(report['path'], 'r', encoding='utf-8') as csvfile:
+        rows = {row['category']: row for row in csv.DictReader(csvfile)}
+    assert rows['Technology']['p50_likes'] == '45'
+    assert rows['Technology']['p99_views'] == '312'
+
+    with pytest.raises(ValueError):
+        generate_category_report(aggregates=aggregate_posts(sample_posts), distribution=True)
+
+
 def test_generate_user_report(sample_user, sample_posts):
     """Test generating user-specific report"""
     user_posts = [p for p in sample_posts if p["user_id"] == "1"]
 
     with patch('src.dashboard.fetch_user') as mock_fetch_user, \
          patch('src.analyzer.fetch_user') as mock_analyzer_user, \
-         patch('src.analyzer.fetch_all_posts') as mock_analyzer_posts:
+         patch('src.analyzer.fetch_posts_by_user') as mock_analyzer_posts:
         
         mock_fetch_user.return_value = sample_user
         mock_analyzer_user.return_value = sample_user
-        mock_analyzer_posts.return_value = sample_posts
+        mock_analyzer_posts.return_value = user_posts
         
         report = generate_user_report("1")
         
@@ -114,3 +164,38 @@ def test_generate_user_report(sample_user, sample_posts):
             expected_views = [float(p["views"]) for p in user_posts]
             assert sorted(likes_from_csv) == sorted(expected_likes)
             assert sorted(views_from_csv) == sorted(expected_views)
+
+
+def test_generate_user_report_distribution(sample_user, sample_posts):
+    """Test that the user report adds likes and views distributions"""
+    user_posts = [p for p in sample_posts if p["user_id"] == "2"]
+
+    with patch('src.dashboard.fetch_user', return_value=sample_user), \
+         patch('src.analyzer.fetch_user', return_value=sample_user), \
+         patch('src.dashboard.fetch_posts_by_user', return_value=user_posts) as mock_posts:
+        report = generate_user_report("2", distribution=True)
+
+    mock_posts.assert_called_once_with("2")
+    assert report["likes_distribution"]["p50"] == 34
+    assert report["likes_distribution"]["p90"] == 52
+    assert report["views_distribution"]["p50"] == 189
+
+
+def test_save_report_json(tmp_path, monkeypatch):
+    """Test report files in each mode, and many reports in one NDJSON file"""
+    monkeypatch.chdir(tmp_path)
+    report = {"user": {"name": "Alice Johnson"}, "post_count": 2}
+
+    path = save_report_json(report, "user_1_report.json")
+    assert path == 'reports/user_1_report.json'
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == json.dumps(report, indent=2)
+
+    path = save_report_json(report, "user_1_report.json", mode="compact")
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == '{"user":{"name":"Alice Johnson"},"post_count":2}\n'
+
+    path = save_reports_ndjson((dict(report, post_count=i) for i in range(3)), "user_reports.ndjson")
+    with open(path, encoding='utf-8') as f:
+        assert [json.loads(line)["post_count"] for line in f] == [0, 1, 2]
+    assert sorted(os.listdir('reports')) == ['user_1_report.json', 'user_reports.ndjson']
@@ -0,0 +1,161 @@
+"""
+Tests for the export module
+"""
+
+import gzip
+import json
+import os
+import pytest
+import tablib
+from unittest.mock import patch
+from src import export
+from src.export import write_csv, write_table, atomic_open, columnar_path, dumps_json, write_json, ReportWriter
+
+
+def test_write_csv_matches_tablib(tmp_path):
+    """Test that streamed CSV output is byte-identical to tablib's export"""
+    headers = ['post_id', 'title', 'ratio']
+    rows = [['1', 'Plain', 0.1957], ['2', 'Comma, "quotes"', 0], ['3', 'Café', 1.5]]
+
+    dataset = tablib.Dataset(headers=headers)
+    for row in rows:
+        dataset.append(row)
+
+    path = write_csv(str(tmp_path / 'out.csv'), headers, iter(rows))
+    with open(path, 'rb') as f:
+        assert f.read() == dataset.export('csv').encode('utf-8')
+
+
+def test_write_csv_gzip(tmp_path):
+    """Test compressed output and the .gz suffix"""
+    rows = ([i, i * 2] for i in range(1000))
+
+    path = write_csv(str(tmp_path / 'out.csv'), ['a', 'b'], rows, compress=True, buffer_size=1024)
+    assert path.endswith('out.csv.gz')
+    with gzip.open(path, 'rt', encoding='utf-8', newline='') as f:
+        lines = f.read().split('\r\n')
+    assert lines[0] == 'a,b'
+    assert lines[1000] == '999,1998'
+
+
+def test_atomic_open_failure_keeps_previous_file(tmp_path):
+    """Test that a failed write leaves the old file and no temp files behind"""
+    path = str(tmp_path / 'report.csv')
+    write_csv(path, ['a'], [[1]])
+
+    def rows():
+        yield [2]
+        raise RuntimeError("source failed")
+
+    with pytest.raises(RuntimeError):
+        write_csv(path, ['a'], rows())
+
+    with open(path, encoding='utf-8', newline='') as f:
+        assert f.read() == 'a\r\n1\r\n'
+    assert os.listdir(tmp_path) == ['report.csv']
+
+
+def test_atomic_open_creates_directories(tmp_path):
+    """Test that missing parent directories are created"""
+    path = str(tmp_path / 'nested' / 'dir' / 'file.txt')
+    with atomic_open(path) as f:
+        f.write('done')
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == 'done'
+
+
+def test_write_table_formats(tmp_path):
+    """Test format dispatch and the extension of columnar exports"""
+    path = str(tmp_path / 'report.csv')
+    assert write_table(path, ['a'], [[1]]) == path
+    assert columnar_path(path, 'parquet') == str(tmp_path / 'report.parquet')
+    assert columnar_path('data/report.csv', 'arrow') == 'data/report.arrow'
+    with pytest.raises(ValueError):
+        write_table(path, ['a'], [[1]], export_format='xlsx')
+
+
+@pytest.mark.parametrize("export_format", ["parquet", "arrow"])
+def test_write_table_columnar(tmp_path, export_format):
+    """Test typed Parquet and Arrow IPC output across row batches"""
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    rows = ([str(i), f'Post {i}', i, i / 4 if i % 2 else i] for i in range(100))
+    with patch('src.export.ARROW_BATCH_SIZE', 30):
+        path = write_table(str(tmp_path / 'report.csv'), ['id', 'title', 'likes', 'ratio'], rows,
+                           export_format=export_format)
+
+    assert path == columnar_path(str(tmp_path / 'report.csv'), export_format)
+    table = pq.read_table(path) if export_format == 'parquet' else feather.read_table(path, memory_map=True)
+    assert table.schema.types == [pa.string(), pa.string(), pa.int64(), pa.float64()]
+    assert table.num_rows == 100
+    assert table.column('ratio').to_pylist()[:4] == [0.0, 0.25, 2.0, 0.75]
+    assert os.listdir(tmp_path) == [os.path.basename(path)]
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_json_modes(use_orjson):
+    """Test that both serializers match json.dumps in every mode"""
+    if use_orjson:
+        pytest.importorskip("orjson")
+    report = {"user": {"name": "Zoë"}, "counts": {1: [1, 2.5], None: []}, "big": 2 ** 70, "ok": True}
+
+    with patch('src.export.orjson', export.orjson if use_orjson else None):
+        assert dumps_json(report, "pretty") == json.dumps(report, indent=2).encode('utf-8')
+        compact = json.dumps(report, separators=(",", ":"), ensure_ascii=False).encode('utf-8')
+        assert dumps_json(report, "compact") == compact
+        assert dumps_json(report, "ndjson") == compact
+        with pytest.raises(ValueError):
+            dumps_json(report, "yaml")
+
+
+@pytest.mark.parametrize("use_orjson", [True, False])
+def test_dumps_json_non_finite(use_orjson):
+    """Test that NaN and Infinity are written like json.dumps, not as null"""
+    if use_orjson:
+        pytest.importorskip("orjson")
+    report = {"avg": float("nan"), "stats": [{"max": float("inf"), "min": None}], "floats": [1e16, 2.5e-05]}
+
+    with patch('src.export.orjson', export.orjson if use_orjson else None):
+        assert dumps_json(report, "compact") == b'{"avg":NaN,"stats":[{"max":Infinity,"min":null}],"floats":[1e+16,2.5e-05]}'
+        assert dumps_json(report, "pretty") == json.dumps(report, indent=2).encode('utf-8')
+        assert json.loads(dumps_json({"min": None, "floats": [1e16, 2.5e-05]})) == {"min": None, "floats": [1e16, 2.5e-05]}
+
+
+def test_write_json_atomic(tmp_path):
+    """Test single report files, compressed output and failed writes"""
+    path = write_json(str(tmp_path / 'report.json'), {"a": 1, "name": "Zoë"})
+    with open(path, 'rb') as f:
+        assert f.read() == b'{\n  "a": 1,\n  "name": "Zo\\u00eb"\n}'
+
+    gz_path = write_json(str(tmp_path / 'report.json'), {"a": 2}, mode="compact", compress=True)
+    assert gz_path == path + '.gz'
+    with gzip.open(gz_path, 'rb') as f:
+        assert f.read() == b'{"a":2}\n'
+
+    with pytest.raises(TypeError):
+        write_json(path, {"a": object()})
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == {"a": 1, "name": "Zoë"}
+    assert sorted(os.listdir(tmp_path)) == ['report.json', 'report.json.gz']
+
+
+def test_report_writer(tmp_path):
+    """Test that many reports land in one NDJSON file only when closed"""
+    path = str(tmp_path / 'reports.ndjson')
+    with ReportWriter(path, compress=True) as writer:
+        for i in range(1000):
+            writer.write({"id": i, "name": f"user {i}"})
+        assert not os.path.exists(writer.path)
+    assert writer.count == 1000
+    with gzip.open(writer.path, 'rt', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 1000
+    assert json.loads(lines[-1]) == {"id": 999, "name": "user 999"}
+
+    with pytest.raises(RuntimeError):
+        with ReportWriter(str(tmp_path / 'failed.ndjson')) as writer:
+            writer.write({"id": 1})
+            raise RuntimeError("report failed")
+    assert os.listdir(tmp_path) == ['reports.ndjson.gz']
@@ -0,0 +1,107 @@
+"""
+Tests for the http_cache module
+"""
+
+import pytest
+from src.http_cache import HttpCache
+
+
+def test_store_and_lookup(tmp_path):
+    """Test storing responses and reading them back after reopening"""
+    path = str(tmp_path / 'cache.sqlite')
+    cache = HttpCache(path)
+    cache.store('http://api/users', '"v1"', None, b'[{"id": "1"}]')
+    cache.close()
+
+    cache = HttpCache(path)
+    cached = cache.lookup('http://api/users')
+    assert cached.etag == '"v1"'
+    assert cache.load('http://api/users') == b'[{"id": "1"}]'
+    assert cache.lookup('http://api/posts') is None
+    assert cache.load('http://api/posts') is None
+
+
+def test_lookup_reads_only_validators(tmp_path):
+    """Test that lookups neither read bodies nor write, and access times are batched"""
+    cache = HttpCache(str(tmp_path / 'cache.sqlite'))
+    cache.store('u', '"v1"', 'Wed, 21 Oct 2015 07:28:00 GMT', b'[1, 2]')
+    statements = []
+    cache._db.set_trace_callback(statements.append)
+
+    assert cache.lookup('u') == ('"v1"', 'Wed, 21 Oct 2015 07:28:00 GMT')
+    assert statements == ["SELECT etag, last_modified FROM responses WHERE url = 'u'"]
+
+    statements.clear()
+    for _ in range(3):
+        assert cache.decoded('u', cache.lookup('u')) == [1, 2]
+    assert not any(statement.startswith(('UPDATE', 'COMMIT')) for statement in statements)
+    assert sum('SELECT body' in statement for statement in statements) == 1
+
+    cache.close()
+    assert any(statement.startswith('UPDATE') for statement in statements)
+
+
+def test_decoded_after_eviction(tmp_path):
+    """Test that decoded() raises KeyError once the body is gone"""
+    cache = HttpCache(str(tmp_path / 'cache.sqlite'))
+    cache.store('u', '"v1"', None, b'[1]')
+    cached = cache.lookup('u')
+    cache.clear()
+    with pytest.raises(KeyError):
+        cache.decoded('u', cached)
+
+
+def test_decoded_once_per_version(tmp_path):
+    """Test that a cached body is decoded once per stored version"""
+    cache = HttpCache(str(tmp_path / 'cache.sqlite'))
+    cache.store('u', '"v1"', None, b'[1, 2]')
+    cached = cache.lookup('u')
+    calls = []
+
+    def decode(body):
+        calls.append(body)
+        return [1, 2]
+
+    assert cache.decoded('u', cached, decode) == [1, 2]
+    assert cache.decoded('u', cached, decode) == [1, 2]
+    assert len(calls) == 1
+    assert cache.stats()['not_modified'] == 2
+
+
+def test_decoded_memo_bounded_by_size(tmp_path):
+    """Test that the decoded-body memo keeps at most decoded_max_bytes of bodies"""
+    cache = HttpCache(str(tmp_path / 'cache.sqlite'), decoded_max_bytes=20)
+    for url in 'abc':
+        cache.store(url, '"v1"', None, b'[' + b' ' * 8 + b']')
+        cache.remember(url, '"v1"', None, [url], 10)
+    cache.remember('huge', '"v1"', None, ['huge'], 21)
+    assert list(cache._decoded) == ['b', 'c']
+    assert cache._decoded_bytes == 20
+
+    calls = []
+
+    def decode(body):
+        calls.append(body)
+        return []
+
+    assert cache.decoded('c', cache.lookup('c'), decode) == ['c']
+    assert cache.decoded('a', cache.lookup('a'), decode) == []
+    assert len(calls) == 1
+    assert list(cache._decoded) == ['c', 'a']
+
+
+def test_size_bounded_eviction(tmp_path):
+    """Test that least recently used responses are evicted beyond max_bytes"""
+    cache = HttpCache(str(tmp_path / 'cache.sqlite'), max_bytes=25)
+    cache.store('a', '"a"', None, b'x' * 10)
+    cache.store('b', '"b"', None, b'x' * 10)
+    cache.load('a')
+    cache.store('c', '"c"', None, b'x' * 10)
+
+    assert cache.lookup('b') is None
+    assert cache.lookup('a') is not None
+    assert cache.lookup('c') is not None
+    assert cache.stats()['bytes'] == 20
+
+    cache.store('huge', '"h"', None, b'x' * 100)
+    assert cache.lookup('huge') is None
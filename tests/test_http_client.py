@@ -0,0 +1,127 @@
+"""
+Tests for the http_client module
+"""
+
+import gc
+import pytest
+import requests
+from unittest.mock import patch, Mock
+from src import api_client
+from src.http_client import HttpClient
+from src.ratelimit import AdaptiveLimiter
+
+
+def test_pooled_session_configuration():
+    """Test that pool size, retry policy and default headers reach the session"""
+    client = HttpClient(pool_maxsize=5, retries=2, headers={"Accept": "application/json"})
+    adapter = client._transport.get_adapter("http://localhost:3000")
+    assert adapter._pool_maxsize == 5
+    assert adapter.max_retries.total == 2
+    assert client._transport.headers["Accept"] == "application/json"
+    assert client._transport.headers["User-Agent"] == "DataHarvester/1.0"
+    assert client._transport.headers["Connection"] == "keep-alive"
+
+    client = HttpClient(keep_alive=False)
+    assert client._transport.headers["Connection"] == "close"
+
+
+def test_requests_share_one_session():
+    """Test that requests use the client timeout and stream through iter_content"""
+    client = HttpClient(timeout=7)
+    with patch('requests.Session.get') as mock_get:
+        mock_resp = Mock()
+        mock_resp.iter_content.return_value = iter([b'[]'])
+        mock_get.return_value = mock_resp
+
+        response = client.get("http://api/users", stream=True)
+        assert list(client.iter_bytes(response, 16)) == [b'[]']
+        mock_resp.iter_content.assert_called_once_with(chunk_size=16)
+        assert mock_get.call_args.kwargs["timeout"] == 7
+
+        client.get("http://api/users", timeout=1)
+        assert mock_get.call_args.kwargs["timeout"] == 1
+    assert client.errors == (requests.exceptions.RequestException,)
+
+
+def test_http2_client():
+    """Test that http2 switches the transport to httpx"""
+    pytest.importorskip("h2")
+    import httpx
+
+    client = HttpClient(http2=True)
+    assert isinstance(client._transport, httpx.Client)
+    assert client.errors == (httpx.HTTPError,)
+    client.close()
+
+
+def test_configure_client():
+    """Test that reconfiguring replaces and closes the shared client"""
+    previous = api_client.get_client()
+    assert api_client.get_client() is previous
+
+    with patch.object(previous, 'close') as mock_close:
+        client = api_client.configure_client(pool_maxsize=4)
+        mock_close.assert_called_once()
+    assert api_client.get_client() is client
+    assert client.timeout == api_client.TIMEOUT
+    assert client.limiter.max_concurrency == 4
+    assert api_client.configure_client(limiter=None).limiter is None
+
+    api_client.close_client()
+    assert api_client.get_client() is not client
+
+
+def test_deprecated_session_helpers():
+    """Test that get_session() and close_session() still work on the shared client"""
+    client = api_client.get_client()
+    session = api_client.get_session()
+    assert isinstance(session, requests.Session)
+    assert session is client.transport
+
+    with patch.object(client, 'close') as mock_close:
+        api_client.close_session()
+        mock_close.assert_called_once()
+    assert api_client.get_session() is not session
+    api_client.close_client()
+
+
+def test_limited_client_retries_throttled_get():
+    """Test that a limited client retries 429s itself and honours Retry-After"""
+    limiter = AdaptiveLimiter(max_concurrency=4)
+    client = HttpClient(retries=2, limiter=limiter)
+    assert client._transport.get_adapter("http://api").max_retries.status_forcelist == set()
+
+    throttled = Mock(status_code=429, headers={"Retry-After": "0"})
+    ok = Mock(status_code=200, headers={})
+    with patch('requests.Session.get', side_effect=[throttled, ok]) as mock_get, \
+            patch('src.http_client.time.sleep') as mock_sleep:
+        assert client.get("http://api/users") is ok
+    assert mock_get.call_count == 2
+    mock_sleep.assert_called_once()
+    throttled.close.assert_called_once()
+    assert limiter.stats()["throttled"] == 1
+    assert limiter.stats()["in_flight"] == 0
+    assert limiter.rate is not None and limiter.concurrency < 4
+
+    with patch('requests.Session.post', return_value=Mock(status_code=503, headers={})) as mock_post:
+        assert client.post("http://api/comments", json={}).status_code == 503
+    mock_post.assert_called_once()
+
+
+def test_limited_client_holds_permit_while_streaming():
+    """Test that a streamed response keeps its permit until its body is read"""
+    limiter = AdaptiveLimiter()
+    client = HttpClient(limiter=limiter)
+    response = Mock(status_code=200, headers={})
+    response.iter_content.return_value = iter([b'[1,', b'2]'])
+    with patch('requests.Session.get', return_value=response):
+        streamed = client.get("http://api/comments", stream=True)
+        assert limiter.stats()["in_flight"] == 1
+        assert b"".join(client.iter_bytes(streamed, 2)) == b'[1,2]'
+        assert limiter.stats()["in_flight"] == 0
+
+    # A body that is never read gives its permit back once collected
+    with patch('requests.Session.get', side_effect=lambda *args, **kwargs: Mock(status_code=200, headers={})):
+        client.get("http://api/comments", stream=True)
+    gc.collect()
+    assert limiter.stats()["in_flight"] == 0
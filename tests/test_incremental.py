@@ -0,0 +1,133 @@
+"""
+Tests for the incremental module
+"""
+
+from unittest.mock import patch
+from src.aggregation import aggregate_posts
+from src.incremental import IncrementalAggregates, refresh_aggregates
+
+
+def summaries(aggregates):
+    """Helper to compare aggregates by their report-facing values"""
+    return (
+        aggregates.post_count,
+        {key: group.summary() for key, group in aggregates.categories.items()},
+        {key: group.summary() for key, group in aggregates.users.items()}
+    )
+
+
+def collection(posts):
+    """Helper to serve posts like iter_posts(), honouring start"""
+    return lambda page_size=None, start=0: iter(posts[start:])
+
+
+def test_refresh_fetches_only_new_posts(tmp_path, sample_posts):
+    """Test that later runs fetch from the watermark and match a full recompute"""
+    path = str(tmp_path / 'state.sqlite')
+
+    with patch('src.api_client.iter_posts', side_effect=collection(sample_posts[:3])) as mock_iter:
+        aggregates = refresh_aggregates(path)
+        assert [call.kwargs["start"] for call in mock_iter.call_args_list] == [0]
+    assert summaries(aggregates) == summaries(aggregate_posts(sample_posts[:3]))
+
+    with patch('src.api_client.iter_posts', side_effect=collection(sample_posts)) as mock_iter:
+        aggregates = refresh_aggregates(path)
+        # The post before the watermark is checked, then the new ones fetched
+        assert [call.kwargs["start"] for call in mock_iter.call_args_list] == [2, 3]
+    assert summaries(aggregates) == summaries(aggregate_posts(sample_posts))
+
+    state = IncrementalAggregates.load(path)
+    assert state.offset == 5
+    assert state.last_post_id == '5'
+    assert list(state.aggregates.categories) == list(aggregate_posts(sample_posts).categories)
+    state.close()
+
+
+def test_edited_posts_are_retracted(sample_posts):
+    """Test that an edited post replaces its old contribution"""
+    incremental = IncrementalAggregates()
+    with patch('src.api_client.iter_posts', side_effect=collection(sample_posts)):
+        incremental.refresh()
+
+    edited = dict(sample_posts[0], likes=100, category='Health')
+    moved = dict(sample_posts[4], user_id='1')
+    with patch('src.api_client.iter_posts', side_effect=collection(sample_posts)):
+        counts = incremental.refresh(changed_posts=[edited, moved, sample_posts[1]])
+    assert counts == {"new": 0, "changed": 2, "unchanged": 1, "deleted": 0}
+
+    expected = [edited, sample_posts[1], sample_posts[2], sample_posts[3], moved]
+    assert summaries(incremental.aggregates) == summaries(aggregate_posts(expected))
+    assert 'Education' in incremental.aggregates.categories
+    assert '3' not in incremental.aggregates.users
+
+
+def test_full_scan_detects_changes(sample_posts):
+    """Test that a full scan only re-aggregates posts whose hash changed"""
+    incremental = IncrementalAggregates()
+    with patch('src.api_client.iter_posts', side_effect=collection(sample_posts)):
+        incremental.refresh()
+
+    current = list(sample_posts)
+    current[2] = dict(current[2], views=1000)
+    with patch('src.api_client.iter_posts', side_effect=collection(current)) as mock_iter:
+        counts = incremental.refresh(full_scan=True)
+        assert mock_iter.call_args.kwargs.get("start", 0) == 0
+
+    assert counts == {"new": 0, "changed": 1, "unchanged": 4, "deleted": 0}
+    assert summaries(incremental.aggregates) == summaries(aggregate_posts(current))
+
+
+def test_shifted_watermark_falls_back_to_full_scan(tmp_path, sample_posts):
+    """Test that deleting an earlier post and appending new ones is not missed"""
+    path = str(tmp_path / 'state.sqlite')
+    with patch('src.api_client.iter_posts', side_effect=collection(sample_posts[:4])):
+        refresh_aggregates(path)
+
+    current = [sample_posts[0]] + sample_posts[2:] + [dict(sample_posts[1], id='6')]
+    incremental = IncrementalAggregates.load(path)
+    with patch('src.api_client.iter_posts', side_effect=collection(current)):
+        counts = incremental.refresh()
+    assert counts == {"new": 2, "changed": 0, "unchanged": 3, "deleted": 1}
+    assert summaries(incremental.aggregates) == summaries(aggregate_posts(current))
+    assert (incremental.offset, incremental.last_post_id) == (5, '6')
+    incremental.save()
+    incremental.close()
+
+    with patch('src.api_client.iter_posts', side_effect=collection(current)) as mock_iter:
+        aggregates = refresh_aggregates(path)
+        assert [call.kwargs["start"] for call in mock_iter.call_args_list] == [4, 5]
+    assert summaries(aggregates) == summaries(aggregate_posts(current))
+    assert list(aggregates.categories) == list(aggregate_posts(current).categories)
+
+
+def test_save_writes_only_changed_rows(tmp_path, sample_posts):
+    """Test that a run only reads and writes the rows of posts and groups that changed"""
+    path = str(tmp_path / 'state.sqlite')
+    with patch('src.api_client.iter_posts', side_effect=collection(sample_posts)):
+        refresh_aggregates(path)
+
+    incremental = IncrementalAggregates.load(path)
+    statements = []
+    incremental._db.set_trace_callback(statements.append)
+    with patch('src.api_client.iter_posts', side_effect=collection(sample_posts)):
+        incremental.refresh()
+    incremental.save()
+    assert not any('posts' in statement or 'groups' in statement for statement in statements)
+
+    statements.clear()
+    edited = dict(sample_posts[4], likes=1, category='Health')
+    with patch('src.api_client.iter_posts', side_effect=collection(sample_posts)):
+        incremental.refresh(changed_posts=[edited, sample_posts[0]])
+    incremental.save()
+    writes = [statement for statement in statements if statement.startswith(('INSERT', 'DELETE'))]
+    assert sum('INTO posts' in statement for statement in writes) == 1
+    assert {tuple(statement.split("'")[1:4:2]) for statement in writes if 'groups' in statement} == {
+        ('categories', '"Education"'), ('categories', '"Health"'), ('users', '"3"')
+    }
+    incremental.close()
+
+    expected = sample_posts[:4] + [edited]
+    with patch('src.api_client.iter_posts', side_effect=collection(sample_posts)):
+        aggregates = refresh_aggregates(path)
+    assert summaries(aggregates) == summaries(aggregate_posts(expected))
+    assert list(aggregates.categories) == list(aggregate_posts(expected).categories)
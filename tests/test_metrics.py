@@ -0,0 +1,110 @@
+"""
+Tests for the metrics module
+"""
+
+import pytest
+from unittest.mock import patch, Mock
+from src import metrics
+from src.analyzer import analyze_engagement_trends
+from src.api_client import fetch_all_posts, fetch_comments
+from src.dashboard import generate_category_report
+
+
+@pytest.fixture
+def registry():
+    """Record metrics for one test"""
+    yield metrics.enable_metrics()
+    metrics.disable_metrics()
+
+
+def http_response(body, status_code=200, url="http://localhost:3000/posts"):
+    """Helper to create a response with a body and URL"""
+    mock_resp = Mock()
+    mock_resp.status_code = status_code
+    mock_resp.content = body
+    mock_resp.url = url
+    mock_resp.raise_for_status.return_value = None
+    mock_resp.json.return_value = []
+    return mock_resp
+
+
+def test_disabled_metrics_record_nothing():
+    """Test that recording without a registry is a no-op"""
+    assert metrics.get_registry() is None
+    metrics.increment("http_requests_total", endpoint="/posts")
+    metrics.observe("http_decode_seconds", 0.1, endpoint="/posts")
+    with metrics.timed("analyze_all_users", "fetch"):
+        pass
+    assert metrics.get_registry() is None
+
+
+def test_registry_json_and_prometheus(registry):
+    """Test counters and histograms in both output formats"""
+    registry.increment("http_requests_total", method="GET", endpoint="/posts", status=200)
+    registry.increment("http_requests_total", method="GET", endpoint="/posts", status=200)
+    registry.observe("http_decode_seconds", 0.003, endpoint="/posts")
+    registry.observe("http_decode_seconds", 0.2, endpoint="/posts")
+
+    assert registry.value("http_requests_total", method="GET", endpoint="/posts", status=200) == 2
+    histogram = registry.histogram("http_decode_seconds", endpoint="/posts")
+    assert histogram.count == 2 and histogram.sum == pytest.approx(0.203)
+
+    snapshot = registry.to_dict()
+    [series] = snapshot["histograms"]["http_decode_seconds"]
+    assert dict(series["buckets"])["0.005"] == 1
+    assert dict(series["buckets"])["+Inf"] == 2
+
+    text = registry.to_prometheus()
+    assert "# TYPE http_requests_total counter" in text
+    assert 'http_requests_total{endpoint="/posts",method="GET",status="200"} 2' in text
+    assert 'http_decode_seconds_bucket{endpoint="/posts",le="0.25"} 2' in text
+    assert 'http_decode_seconds_count{endpoint="/posts"} 2' in text
+
+
+def test_registry_gauges(registry):
+    """Test that gauges keep their last value and render as gauges"""
+    registry.set_gauge("ratelimit_rate", 40)
+    registry.set_gauge("ratelimit_rate", 12.5)
+
+    assert registry.value("ratelimit_rate") == 12.5
+    assert registry.to_dict()["gauges"]["ratelimit_rate"] == [{"labels": {}, "value": 12.5}]
+    text = registry.to_prometheus()
+    assert "# TYPE ratelimit_rate gauge" in text
+    assert "ratelimit_rate 12.5" in text
+
+
+def test_endpoint_labels():
+    """Test that IDs are folded out of endpoint labels"""
+    assert metrics.endpoint("http://localhost:3000/posts?_page=2") == "/posts"
+    assert metrics.endpoint("http://localhost:3000/users/42") == "/users/{id}"
+    assert metrics.endpoint("http://localhost:3000/posts/7/comments") == "/posts/{id}/comments"
+
+
+def test_http_metrics(registry):
+    """Test that requests record count, status, bytes, latency and decode time"""
+    with patch('requests.Session.get') as mock_get:
+        mock_get.return_value = http_response(b'[]')
+        fetch_all_posts()
+
+        stream = http_response(None, url="http://localhost:3000/posts/1/comments")
+        stream.iter_content.return_value = iter([b'[{"id": "1"},', b' {"id": "2"}]'])
+        mock_get.return_value = stream
+        assert len(list(fetch_comments("1"))) == 2
+
+    assert registry.value("http_requests_total", method="GET", endpoint="/posts", status=200) == 1
+    assert registry.value("http_response_bytes_total", method="GET", endpoint="/posts") == 2
+    assert registry.value("http_response_bytes_total", method="GET", endpoint="/posts/{id}/comments") == 26
+    assert registry.histogram("http_request_duration_seconds", method="GET", endpoint="/posts").count == 1
+    assert registry.histogram("http_decode_seconds", endpoint="/posts").count == 1
+
+
+def test_report_phase_metrics(registry, sample_posts, tmp_path, monkeypatch):
+    """Test that report functions time their fetch, aggregate and export phases"""
+    monkeypatch.chdir(tmp_path)
+    with patch('src.dashboard.fetch_all_posts', return_value=sample_posts):
+        generate_category_report()
+    analyze_engagement_trends(sample_posts)
+
+    for phase in ("fetch", "aggregate", "export"):
+        assert registry.histogram("report_phase_seconds", function="generate_category_report", phase=phase).count == 1
+    assert registry.histogram("report_phase_seconds", function="analyze_engagement_trends", phase="export").count == 1
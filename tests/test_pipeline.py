@@ -0,0 +1,73 @@
+"""
+Tests for the pipeline module
+"""
+
+import threading
+import pytest
+from src.pipeline import Pipeline
+
+
+def test_run_passes_dependency_results():
+    """Test that stages receive their dependencies' results by name"""
+    pipeline = Pipeline(max_workers=2)
+    pipeline.stage("posts", lambda: [1, 2, 3])
+    pipeline.stage("total", lambda posts: sum(posts), deps=["posts"])
+    pipeline.stage("report", lambda posts, total: f"{len(posts)} posts, {total} likes", deps=["posts", "total"])
+
+    result = pipeline.run()
+    assert result["report"] == "3 posts, 6 likes"
+    assert set(result.timings) == {"posts", "total", "report"}
+    assert result.critical_path(pipeline.stages) == ["posts", "total", "report"]
+
+
+def test_independent_stages_run_concurrently():
+    """Test that stages with satisfied dependencies overlap"""
+    barrier = threading.Barrier(3, timeout=5)
+
+    pipeline = Pipeline(max_workers=3)
+    pipeline.stage("data", lambda: "shared")
+    for name in ("a", "b", "c"):
+        pipeline.stage(name, lambda data: barrier.wait() is not None, deps=["data"])
+
+    result = pipeline.run()
+    assert result["a"] and result["b"] and result["c"]
+
+
+def test_wrap_hook():
+    """Test that the wrap hook runs every stage"""
+    wrapped = []
+
+    def wrap(name, call):
+        wrapped.append(name)
+        return call()
+
+    pipeline = Pipeline()
+    pipeline.stage("one", lambda: 1)
+    pipeline.stage("two", lambda one: one + 1, deps=["one"])
+    assert pipeline.run(wrap)["two"] == 2
+    assert wrapped == ["one", "two"]
+
+
+def test_failures_and_invalid_graphs():
+    """Test error propagation, unknown dependencies and cycles"""
+    ran = []
+    pipeline = Pipeline()
+    pipeline.stage("fetch", lambda: 1 / 0)
+    pipeline.stage("report", lambda fetch: ran.append(fetch), deps=["fetch"])
+    with pytest.raises(ZeroDivisionError):
+        pipeline.run()
+    assert ran == []
+
+    pipeline = Pipeline()
+    pipeline.stage("report", lambda posts: posts, deps=["posts"])
+    with pytest.raises(ValueError):
+        pipeline.run()
+
+    pipeline = Pipeline()
+    pipeline.stage("a", lambda b: b, deps=["b"])
+    pipeline.stage("b", lambda a: a, deps=["a"])
+    with pytest.raises(ValueError):
+        pipeline.run()
+
+    with pytest.raises(ValueError):
+        pipeline.stage("a", lambda: None)
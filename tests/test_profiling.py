@@ -0,0 +1,57 @@
+"""
+Tests for the profiling module
+"""
+
+import os
+import pstats
+from concurrent.futures import ThreadPoolExecutor
+from src.pipeline import Pipeline
+from src.profiling import StageProfiler
+
+
+def build_rows(count):
+    """Allocate some rows for the profiler to find"""
+    return [[i, str(i)] for i in range(count)]
+
+
+def test_stage_profiler(tmp_path):
+    """Test that each stage gets a profile file and a top-N summary"""
+    profiler = StageProfiler(str(tmp_path / 'profiles'), top=3)
+    pipeline = Pipeline(max_workers=1)
+    pipeline.stage("rows", lambda: build_rows(20000))
+    pipeline.stage("total", lambda rows: sum(r[0] for r in rows), deps=["rows"])
+
+    result = pipeline.run(wrap=profiler)
+    assert result["total"] == sum(range(20000))
+
+    for name in ("rows", "total"):
+        stage = profiler.stages[name]
+        assert os.path.exists(stage["path"])
+        assert pstats.Stats(stage["path"]).total_calls > 0
+        assert len(stage["functions"]) <= 3
+    rows = profiler.stages["rows"]
+    assert "test_profiling.py" in rows["functions"][0]["function"]
+    assert any(func == "build_rows" for _, _, func in pstats.Stats(rows["path"]).stats)
+    assert rows["peak_memory"] > 20000 * 50
+    assert "test_profiling.py" in rows["allocations"][0]["site"]
+
+    summary_path = profiler.save_summary()
+    with open(summary_path, encoding='utf-8') as f:
+        summary = f.read()
+    assert "== rows:" in summary and "== total:" in summary
+
+
+def test_stage_profiler_threads(tmp_path):
+    """Test that work in threads a stage starts is part of its profile"""
+    def fetch_in_thread():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(build_rows, 5000).result()
+
+    profiler = StageProfiler(str(tmp_path / 'profiles'))
+    pipeline = Pipeline(max_workers=1)
+    pipeline.stage("rows", fetch_in_thread)
+    assert len(pipeline.run(wrap=profiler)["rows"]) == 5000
+
+    stats = pstats.Stats(profiler.stages["rows"]["path"]).stats
+    assert any(func == "build_rows" for _, _, func in stats)
+    assert any(func == "fetch_in_thread" for _, _, func in stats)
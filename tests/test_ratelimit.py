@@ -0,0 +1,126 @@
+"""
+Tests for the ratelimit module
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+from src.ratelimit import AdaptiveLimiter, backoff_delay, parse_retry_after
+
+
+def test_parse_retry_after():
+    """Test delay-seconds and HTTP-date values, and anything unparseable"""
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(" 1.5 ") == 1.5
+    assert parse_retry_after("3600") == 60.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+    assert parse_retry_after(Mock()) is None
+
+
+def test_backoff_delay():
+    """Test that the jittered backoff stays within its exponential bound"""
+    delays = [backoff_delay(3, 0.5) for _ in range(100)]
+    assert all(0 <= delay <= 4.0 for delay in delays)
+    assert len(set(delays)) > 1
+    assert backoff_delay(20, 1.0, cap=2.0) <= 2.0
+
+
+def test_aimd():
+    """Test unlimited start, multiplicative decrease and additive increase"""
+    limiter = AdaptiveLimiter(max_concurrency=8, min_rate=2.0)
+    for _ in range(5):
+        limiter.release(limiter.acquire())
+    assert limiter.rate is None and limiter.concurrency == 8
+
+    started = limiter.acquire()
+    stale = limiter.acquire()
+    limiter.release(started, throttled=True)
+    assert limiter.rate >= 2.0
+    assert limiter.concurrency == 4
+
+    rate = limiter.rate
+    limiter.release(stale, throttled=True)
+    assert limiter.rate == rate and limiter.concurrency == 4
+    assert limiter.throttled == 2
+
+    limiter.release(limiter.acquire())
+    assert limiter.rate == pytest.approx(rate + 1 / rate)
+    assert limiter.concurrency == pytest.approx(4.25)
+
+
+def test_token_bucket_rate():
+    """Test that a limited rate paces acquisitions once the burst is spent"""
+    limiter = AdaptiveLimiter(rate=50, burst=1)
+    started = time.monotonic()
+    for _ in range(6):
+        limiter.release(limiter.acquire())
+    assert time.monotonic() - started >= 0.09
+
+
+def test_retry_after_pauses_every_request():
+    """Test that a Retry-After from one response delays the next acquisitions"""
+    limiter = AdaptiveLimiter()
+    limiter.release(limiter.acquire(), throttled=True, retry_after=0.2)
+    started = time.monotonic()
+    limiter.release(limiter.acquire())
+    assert time.monotonic() - started >= 0.15
+
+
+def test_concurrency_limit():
+    """Test that no more than the concurrency limit run at once"""
+    limiter = AdaptiveLimiter(max_concurrency=2)
+    lock = threading.Lock()
+    running, peak = [0], [0]
+
+    def request():
+        started = limiter.acquire()
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        time.sleep(0.01)
+        with lock:
+            running[0] -= 1
+        limiter.release(started)
+
+    threads = [threading.Thread(target=request) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_acquire_async():
+    """Test that coroutines share the concurrency limit and are woken by thread releases"""
+    limiter = AdaptiveLimiter(max_concurrency=2)
+    running, peak = [0], [0]
+
+    async def request():
+        started = await limiter.acquire_async()
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.01)
+        running[0] -= 1
+        limiter.release(started)
+
+    async def main():
+        await asyncio.gather(*(request() for _ in range(8)))
+
+        held = [limiter.acquire(), limiter.acquire()]
+        timer = threading.Timer(0.05, limiter.release, args=(held[0],))
+        timer.start()
+        started = time.monotonic()
+        limiter.release(await limiter.acquire_async())
+        limiter.release(held[1])
+        return time.monotonic() - started
+
+    waited = asyncio.run(main())
+    assert peak[0] == 2
+    assert waited >= 0.04
+    assert limiter.stats()["in_flight"] == 0
+    assert limiter._waiters == []
@@ -0,0 +1,111 @@
+"""
+Tests for the records module
+"""
+
+import json
+import pickle
+import tracemalloc
+from array import array
+from unittest.mock import patch
+from benchmarks.generate import generate_db
+from src.analyzer import analyze_user_activity, analyze_engagement_trends, index_posts_by_user, analyze_all_users
+from src.dashboard import generate_category_report
+from src.records import MISSING, PostTable
+
+
+def mixed_posts(sample_posts):
+    """Sample posts plus missing fields, nulls, floats and extra fields"""
+    return sample_posts + [
+        {'id': '6', 'user_id': '1', 'likes': 12, 'views': 37},
+        {'id': '7', 'user_id': '2', 'title': None, 'likes': 2.5, 'views': 10, 'category': 'Health'},
+        {'id': '8', 'user_id': '3', 'title': 'Extra', 'likes': 1, 'views': 2, 'category': 'Health', 'tags': ['a']},
+    ]
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def test_round_trip(sample_posts):
+    """Test that posts come back exactly as they went in"""
+    posts = mixed_posts(sample_posts)
+    table = PostTable.from_posts(iter(posts))
+    assert len(table) == len(posts)
+    assert list(table) == posts
+    assert table[6] == posts[6] and table[-1] == posts[-1]
+    assert "title" not in table[5]
+
+
+def test_compact_columns(sample_posts):
+    """Test that integer fields use arrays and repeated strings are shared"""
+    table = PostTable(sample_posts)
+    assert isinstance(table.likes, array) and isinstance(table.views, array)
+    assert table.user_ids[0] is table.user_ids[1]
+    assert table.categories[2] is table.categories[3]
+
+    table.append({'id': '9', 'user_id': '1', 'likes': 1.5, 'views': 1, 'category': 'Health'})
+    assert table.likes == [45, 67, 34, 52, 41, 1.5]
+
+
+def test_group_by_matches_index(sample_posts):
+    """Test that partitioning a table matches indexing the dicts"""
+    posts = mixed_posts(sample_posts)
+    groups = index_posts_by_user(PostTable(posts))
+    assert all(isinstance(group, PostTable) for group in groups.values())
+    assert {user: list(group) for user, group in groups.items()} == index_posts_by_user(posts)
+
+
+def test_reports_match_dicts(sample_user, sample_posts):
+    """Test that reports from a table write the same files as from dicts"""
+    posts = mixed_posts(sample_posts)[:7]
+    table = PostTable(posts)
+    for backend in ("python", "pandas"):
+        expected = read_bytes(analyze_engagement_trends(posts, backend=backend))
+        assert read_bytes(analyze_engagement_trends(table, backend=backend)) == expected
+
+        expected = generate_category_report(posts, backend=backend)
+        expected_csv = read_bytes(expected["path"])
+        assert generate_category_report(table, backend=backend)["categories"] == expected["categories"]
+        assert read_bytes(expected["path"]) == expected_csv
+
+    with patch('src.analyzer.fetch_user', return_value=sample_user):
+        user_posts = index_posts_by_user(table)["1"]
+        expected = analyze_user_activity("1", [p for p in posts if p["user_id"] == "1"])
+        expected_csv = read_bytes(expected["path"])
+        assert analyze_user_activity("1", user_posts) == expected
+        assert read_bytes(expected["path"]) == expected_csv
+
+
+def test_missing_fields_survive_processes(sample_users, sample_posts):
+    """Test that absent fields stay absent in process pool workers"""
+    assert pickle.loads(pickle.dumps(MISSING)) is MISSING
+    posts = mixed_posts(sample_posts) + [{'id': '9', 'user_id': '2', 'title': 'No likes', 'category': 'Health'}]
+    table = PostTable(posts)
+    assert pickle.loads(pickle.dumps(table)).to_dicts() == posts
+
+    outputs = []
+    for use_processes in (False, True):
+        summary = analyze_all_users(sample_users, posts=table, max_workers=2, use_processes=use_processes)
+        outputs.append((summary, [read_bytes(summary[user["id"]]["path"]) for user in sample_users]))
+    assert outputs[0] == outputs[1]
+    assert b"object at 0x" not in b"".join(outputs[1][1])
+
+
+def test_table_uses_less_memory():
+    """Test that a table holds posts in well under half the memory of dicts"""
+    body = json.dumps(generate_db(posts=5000)["posts"])
+
+    tracemalloc.start()
+    posts = json.loads(body)
+    dicts_size = tracemalloc.get_traced_memory()[0]
+    del posts
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    table = PostTable(json.loads(body))
+    table_size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert len(table) == 5000
+    assert table_size < dicts_size / 2
@@ -0,0 +1,76 @@
+"""
+Tests for the sketches module
+"""
+
+import random
+import pytest
+from src.sketches import QuantileSketch, Distribution, DISTRIBUTION_BUCKETS
+
+
+def rank_error(values, estimate, fraction):
+    """Distance between a quantile's rank and the nearest rank of the estimate"""
+    below = sum(1 for v in values if v < estimate) / len(values)
+    at_most = sum(1 for v in values if v <= estimate) / len(values)
+    return 0 if below <= fraction <= at_most else min(abs(below - fraction), abs(at_most - fraction))
+
+
+def test_small_series_is_exact():
+    """Test nearest-rank quantiles while fewer than k values were added"""
+    sketch = QuantileSketch()
+    for value in [5, 1, 4, 2, 3]:
+        sketch.add(value)
+
+    assert sketch.quantiles([0, 0.5, 0.9, 1]) == [1, 3, 5, 5]
+    assert QuantileSketch().quantile(0.5) is None
+    with pytest.raises(ValueError):
+        sketch.quantile(1.5)
+
+
+def test_large_series_bounded_and_accurate():
+    """Test that memory stays fixed while quantiles stay within 1% rank"""
+    rng = random.Random(7)
+    values = [int(rng.paretovariate(1.2) * 10) for _ in range(50000)]
+    sketch = QuantileSketch()
+    for value in values:
+        sketch.add(value)
+
+    assert sketch.count == len(values)
+    assert sum(len(level) for level in sketch.levels) < 3 * sketch.k
+    for fraction in (0.5, 0.9, 0.99):
+        assert rank_error(values, sketch.quantile(fraction), fraction) < 0.01
+
+
+def test_merge_batches():
+    """Test that sketches of separate batches merge into one of the union"""
+    rng = random.Random(3)
+    values = [rng.random() for _ in range(20000)]
+    batches = [QuantileSketch() for _ in range(4)]
+    for i, value in enumerate(values):
+        batches[i % 4].add(value)
+
+    merged = QuantileSketch()
+    for batch in batches:
+        merged.merge(QuantileSketch.from_list(batch.to_list()))
+
+    assert merged.count == len(values)
+    assert sum(len(level) for level in merged.levels) < 3 * merged.k
+    for fraction in (0.5, 0.9, 0.99):
+        assert rank_error(values, merged.quantile(fraction), fraction) < 0.01
+    with pytest.raises(ValueError):
+        merged.merge(QuantileSketch(k=100))
+
+
+def test_distribution_summary():
+    """Test quantiles and histogram buckets of a distribution"""
+    first, second = Distribution(), Distribution()
+    for value in [0, 3, 7, 12]:
+        first.add(value)
+    second.add(2_000_000)
+    first.merge(Distribution.from_list(second.to_list()))
+
+    summary = first.summary()
+    assert (summary["p50"], summary["p90"], summary["p99"]) == (7, 2_000_000, 2_000_000)
+    histogram = summary["histogram"]
+    assert len(histogram) == len(DISTRIBUTION_BUCKETS) + 1
+    counts = {bucket["le"]: bucket["count"] for bucket in histogram if bucket["count"]}
+    assert counts == {0: 1, 5: 1, 10: 1, 20: 1, "+Inf": 1}
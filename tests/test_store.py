@@ -0,0 +1,71 @@
+"""
+Tests for the store module
+"""
+
+import pytest
+from unittest.mock import patch
+from src.store import SnapshotStore
+from src.analyzer import analyze_user_activity, analyze_engagement_trends
+from src.dashboard import generate_overview_dashboard, generate_category_report, generate_user_report
+
+
+@pytest.fixture
+def store(tmp_path, sample_users, sample_posts, sample_comments):
+    """Snapshot store harvested from mocked API responses"""
+    categories = [{'id': '1', 'name': 'Technology'}, {'id': '2', 'name': 'Health'}]
+    with patch('src.api_client.fetch_all_users', return_value=sample_users), \
+         patch('src.api_client.fetch_categories', return_value=categories), \
+         patch('src.api_client.iter_posts', return_value=iter(sample_posts)), \
+         patch('src.api_client.iter_collection', return_value=iter(sample_comments)):
+        snapshot = SnapshotStore(str(tmp_path / 'snapshot.sqlite'))
+        counts = snapshot.harvest()
+
+    assert counts == {"users": 3, "posts": 5, "categories": 2, "comments": 2}
+    yield snapshot
+    snapshot.close()
+
+
+def test_indexed_queries(store, sample_users, sample_posts):
+    """Test lookups by user, category and post"""
+    assert store.fetch_all_users() == sample_users
+    assert store.fetch_user("2")["name"] == "Bob Smith"
+    assert list(store.iter_posts(batch_size=2)) == sample_posts
+    assert [p["id"] for p in store.fetch_posts_by_user("1")] == ["1", "2"]
+    assert [p["id"] for p in store.fetch_posts_by_category("Health")] == ["3", "4"]
+    assert store.fetch_post("5")["title"] == "Learning Strategies"
+    assert [c["author"] for c in store.fetch_comments("1")] == ["Mike", "Sarah"]
+    assert list(store.fetch_comments("2")) == []
+
+    with pytest.raises(KeyError):
+        store.fetch_user("99")
+
+
+def test_reports_run_offline(store):
+    """Test that analyzer and dashboard functions run against the snapshot"""
+    with patch('src.analyzer.fetch_user') as mock_analyzer_user, \
+         patch('src.analyzer.fetch_posts_by_user') as mock_analyzer_posts, \
+         patch('src.analyzer.fetch_all_posts') as mock_analyzer_all_posts, \
+         patch('src.dashboard.fetch_user') as mock_dashboard_user, \
+         patch('src.dashboard.fetch_all_users') as mock_dashboard_users, \
+         patch('src.dashboard.fetch_all_posts') as mock_dashboard_posts:
+
+        activity = analyze_user_activity("1", source=store)
+        assert activity["user"] == "Alice Johnson"
+        assert activity["total_likes"] == 112
+
+        assert analyze_engagement_trends(source=store) == 'data/engagement_trends.csv'
+
+        dashboard = generate_overview_dashboard(source=store)
+        assert dashboard["total_users"] == 3
+        assert dashboard["total_posts"] == 5
+
+        report = generate_category_report(source=store)
+        assert report["categories"]["Health"]["total_likes"] == 86
+
+        user_report = generate_user_report("2", source=store)
+        assert user_report["user"]["name"] == "Bob Smith"
+        assert user_report["post_count"] == 2
+
+        for mock in (mock_analyzer_user, mock_analyzer_posts, mock_analyzer_all_posts,
+                     mock_dashboard_user, mock_dashboard_users, mock_dashboard_posts):
+            mock.assert_not_called()